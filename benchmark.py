@@ -1,20 +1,38 @@
 import os
+import sys
 import csv
+import json
 import time
+import tempfile
+import importlib
 import statistics
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 
 # --- IMPORTAÇÕES ---
 try:
-    # Apenas importamos o ACO Puro e o Solver Gurobi
-    from main import ACO as ACO_Puro, ler_e_converter_dados
-    from solver_gurobi import resolver_gurobi
+    # Apenas importamos o ACO Puro; os solvers de referencia (gurobipy) so sao importados quando alguma referencia precisa ser resolvida
+    from main import ACO as ACO_Puro, ler_e_converter_dados, carregarParametros
+    from instancia import hashDoArquivo
+    from estatisticas import FASES
 except ImportError as e:
-    print(f"ERRO CRÍTICO: Faltam arquivos necessários (main.py ou solver_gurobi.py). {e}")
+    print(f"ERRO CRÍTICO: Faltam arquivos necessários (main.py). {e}")
     exit()
 
 # Parâmetros Globais
 N_ITERACOES_MEDIA = 5
 TEMPO_LIMITE_POR_EXECUCAO = 300  # 10 Minutos
+ARQUIVO_LOG_PADRAO = 'execucoes_benchmark.jsonl' # Log append-only: uma linha por execução concluída
+ARQUIVO_REFERENCIAS = 'referencias_otimas.json' # Resultados do solver exato por (hash da instância, tempo limite)
+THREADS_GUROBI = 4 # Mesmo valor de solver_gurobi.THREADS_GUROBI, repetido para não importar o gurobipy à toa
+
+# Solvers exatos de referência: nome -> (módulo, função com (caminho, time_limit), núcleos ocupados, rótulo no CSV)
+SOLVERS_REFERENCIA = {
+    'gurobi': ('solver_gurobi', 'resolver_gurobi', THREADS_GUROBI, 'Gurobi'),
+    'gurobi_aco': ('solver_gurobi', 'resolver_gurobi_aquecido', THREADS_GUROBI, 'GurobiACO'), # Modelo clássico com MIP start e Cutoff do ACO
+    'bb': ('solver_bb', 'resolver_bb', 1, 'BB'), # Branch-and-bound próprio, sem licença
+    'highs': ('solver_mip', 'resolver_highs', THREADS_GUROBI, 'HiGHS'), # Mesmo modelo do Gurobi em backends sem licença
+    'cbc': ('solver_mip', 'resolver_cbc', THREADS_GUROBI, 'CBC'),
+}
 
 def extrair_numero_instancia(nome_arquivo):
     try:
@@ -72,102 +90,391 @@ def calcular_estatisticas(resultados_runs, otimo_referencia):
 
     return s_si, s_sf, s_imp, s_gap, s_time
 
-def rodar_benchmark_comparativo(pasta_raiz='instancias', arquivo_saida='resultado_comparativo_puro.csv'):
-    
-    diretorio_script = os.path.dirname(os.path.abspath(__file__))
-    caminho_raiz = os.path.join(diretorio_script, pasta_raiz)
-    
-    if not os.path.exists(caminho_raiz):
-        print(f"Erro: Pasta '{caminho_raiz}' não encontrada.")
-        return
+def media_das_fases(resultados_runs):
+    # Tempo médio de cada fase do ACO (segundos); '-' se alguma run veio de um log sem tempos por fase
+    if any(not r.get('fases') for r in resultados_runs):
+        return ['-'] * len(FASES)
+    return [f"{statistics.mean(r['fases'][fase] for r in resultados_runs):.3f}" for fase in FASES]
 
+def parametros_da_classe(pasta, arquivo_parametros=None):
+    # Params (valores dos testes manuais); arquivo_parametros (saída do calibracao.py) sobrescreve o que tiver para a classe
+    if pasta == 'hes': alpha, beta = 0.0, 2.5
+    elif pasta == 'ros': alpha, beta = 0.5, 3.0
+    else: alpha, beta = 1.0, 3.0
+    parametros = {'alpha_trab': alpha, 'beta_trab': beta, 'alpha_tar': 1.0, 'beta_tar': 2.0, 'numeroFormigas': 100, 'nIteracoesSemMelhoria': 150}
+    if arquivo_parametros:
+        parametros.update(carregarParametros(arquivo_parametros, pasta))
+    return parametros
+
+def listar_instancias(caminho_raiz):
+    """
+    Retorna [(classe, nome_instancia, caminho)] na ordem do relatório (classe, depois número da instância).
+    """
     subpastas = [f for f in os.listdir(caminho_raiz) if os.path.isdir(os.path.join(caminho_raiz, f))]
     subpastas.sort()
+    instancias = []
+    for pasta in subpastas:
+        if pasta == 'geral': continue
+        caminho_completo_pasta = os.path.join(caminho_raiz, pasta)
+        arquivos = [f for f in os.listdir(caminho_completo_pasta)
+                    if os.path.isfile(os.path.join(caminho_completo_pasta, f))
+                    and not f.startswith('.')]
+        arquivos.sort(key=extrair_numero_instancia)
+        instancias.extend((pasta, nome, os.path.join(caminho_completo_pasta, nome)) for nome in arquivos)
+    return instancias
 
-    print(f"--- INICIANDO BENCHMARK (ACO PURO vs GUROBI) ---")
-    print(f"--- Média de {N_ITERACOES_MEDIA} execuções por instância ---")
-    
+def chave_do_job(job):
+    return (job['classe'], job['instancia'], job['tipo'], job['repeticao'])
+
+def executar_job(job):
+    """
+    Executa um job do benchmark num processo do pool.
+    tipo 'gurobi'/'bb' (ver SOLVERS_REFERENCIA): resolução de referência; tipo 'aco': uma repetição do ACO Puro.
+    Retorna o registro que vai para o log.
+    """
+    registro = dict(job)
+    if job['tipo'] in SOLVERS_REFERENCIA:
+        modulo, funcao, _, _ = SOLVERS_REFERENCIA[job['tipo']]
+        resolver = getattr(importlib.import_module(modulo), funcao)
+        gur_ciclo, gur_tempo, status, gap = resolver(job['caminho'], time_limit=TEMPO_LIMITE_POR_EXECUCAO)
+        registro.update({'obj': gur_ciclo, 'tempo': gur_tempo, 'status': status, 'gap': gap})
+        return registro
+
+    dados = ler_e_converter_dados(job['caminho'])
+    if not dados:
+        registro.update({'sf': float('inf'), 'si': float('inf'), 'time': 0.0, 'erro': 'leitura'})
+        return registro
+    t_tar_trab, grafo, precedencia, lb_calc, c_alvo, t_med_trab, fatiadas, grafoR, os_val, cache_heur = dados
+    parametros = job.get('parametros') or parametros_da_classe(job['classe']) # Jobs de logs antigos não trazem os parâmetros
+
+    start = time.time()
+    fases = contadores = None
+    try:
+        # Certifique-se que o main.py retorna (SF, SI) e aceita tempo_limite
+        val_sf, val_si, estatisticas = ACO_Puro(
+            t_tar_trab, grafo, precedencia, lb_calc, c_alvo, t_med_trab, 
+            fatiadas, grafoR, os_val,
+            **parametros,
+            tempoLimite=TEMPO_LIMITE_POR_EXECUCAO, # Verifique se no seu main.py é tempo_limite ou tempoLimite
+            cacheHeuristico=cache_heur,
+            estatisticas=True, arquivoPerfil=job.get('perfil'), # Tempo por fase no log; perfil do cProfile se o job pedir
+            arquivoTraco=job.get('traco'), # Uma linha por iteração, para as curvas de qualidade x tempo
+            tamanhoCacheShift=job.get('cache_shift', 0)
+        )
+        fases = estatisticas.tempos
+        contadores = estatisticas.contadores
+    except ValueError:
+        # Caso o main.py ainda retorne apenas um valor
+        val_sf = float('inf')
+        val_si = float('inf')
+    except TypeError:
+         # Caso o nome do argumento de tempo esteja diferente
+         print("[Aviso: Verifique o nome do parâmetro de tempo no main.py]")
+         val_sf, val_si = float('inf'), float('inf')
+
+    end = time.time()
+    registro.update({'sf': val_sf, 'si': val_si, 'time': end - start, 'fases': fases, 'contadores': contadores})
+    return registro
+
+def chave_da_referencia(caminho_instancia, time_limit, solver='gurobi'):
+    chave = f"{hashDoArquivo(caminho_instancia)}:{time_limit}"
+    return chave if solver == 'gurobi' else f"{chave}:{solver}"
+
+def carregar_referencias(arquivo_referencias=ARQUIVO_REFERENCIAS):
+    """
+    Lê o arquivo de referências: {"<sha1 da instância>:<tempo limite>": {'obj', 'tempo', 'status', 'gap', 'instancia'}}
+    """
+    if not os.path.exists(arquivo_referencias):
+        return {}
+    with open(arquivo_referencias, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def salvar_referencia(referencias, chave, registro, arquivo_referencias=ARQUIVO_REFERENCIAS):
+    # Só guarda resolução que terminou com solução (ótimo ou limite de tempo); erro do solver é tentado de novo
+    if registro['status'] not in ('OTIMO', 'LIMIT_TEMPO'): return
+    referencias[chave] = {campo: registro[campo] for campo in ('obj', 'tempo', 'status', 'gap', 'instancia')}
+    # Grava num temporário e troca de nome: uma queda no meio não corrompe o arquivo
+    pasta = os.path.dirname(os.path.abspath(arquivo_referencias))
+    descritor, temporario = tempfile.mkstemp(dir=pasta, suffix='.tmp')
+    with os.fdopen(descritor, 'w', encoding='utf-8') as f:
+        json.dump(referencias, f, indent=1, sort_keys=True)
+    os.replace(temporario, arquivo_referencias)
+
+def ler_log(arquivo_log):
+    """
+    Lê o log de execuções. Uma linha incompleta (processo morto no meio da escrita) é ignorada.
+    Retorna: {chave_do_job: registro}
+    """
+    registros = {}
+    if not os.path.exists(arquivo_log):
+        return registros
+    with open(arquivo_log, 'r', encoding='utf-8') as f:
+        for linha in f:
+            try:
+                registro = json.loads(linha)
+            except json.JSONDecodeError:
+                continue
+            registros[chave_do_job(registro)] = registro
+    return registros
+
+def gravar_no_log(arquivo_log, registro):
+    # Append + fsync: o que já terminou sobrevive a uma queda do benchmark
+    with open(arquivo_log, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(registro) + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+
+def gerar_csv_do_log(arquivo_log, arquivo_saida, instancias=None, n_repeticoes=None, exigir_referencia=True, solver='gurobi'):
+    """
+    Reconstrói o CSV agregado a partir do log. Só entram instâncias com a referência e todas as repetições concluídas
+    (com exigir_referencia=False, instância sem referência entra com '-' no lugar do solver).
+    solver: qual referência (SOLVERS_REFERENCIA) vai para as colunas do ótimo.
+    instancias: lista de listar_instancias (define a ordem); sem ela, usa a ordem de classe/número do próprio log.
+    """
+    n_repeticoes = n_repeticoes or N_ITERACOES_MEDIA
+    registros = ler_log(arquivo_log)
+    if instancias is None:
+        vistas = {(r['classe'], r['instancia']) for r in registros.values()}
+        instancias = [(classe, nome, None) for classe, nome in sorted(vistas, key=lambda x: (x[0], extrair_numero_instancia(x[1])))]
+
+    linhas = 0
     with open(arquivo_saida, mode='w', newline='', encoding='utf-8') as csvfile:
         writer = csv.writer(csvfile, delimiter=';')
         
         # Cabeçalho Simplificado (Sem Híbrido)
+        rotulo = SOLVERS_REFERENCIA[solver][3]
         header = [
             'Classe', 'Instancia',
-            'Gurobi_Opt', 'Gurobi_Time', # Referência
+            f'{rotulo}_Opt', f'{rotulo}_Time', # Referência
             
             # ACO Puro
             'Puro_SI_Avg', 'Puro_SF_Avg', 
             'Puro_Imp_SI_SF(%)', 'Puro_Gap_Opt(%)', 'Puro_Time'
-        ]
+        ] + [f'Puro_T_{fase}' for fase in FASES] # Tempo médio por fase do ACO (main.ColoniaACO)
         writer.writerow(header)
 
-        for pasta in subpastas:
-            if pasta == 'geral': continue
+        for pasta, nome_instancia, _ in instancias:
+            referencia = registros.get((pasta, nome_instancia, solver, 0))
+            runs_puro = [registros.get((pasta, nome_instancia, 'aco', rep)) for rep in range(n_repeticoes)]
+            if None in runs_puro or (referencia is None and exigir_referencia): continue
 
-            caminho_completo_pasta = os.path.join(caminho_raiz, pasta)
-            
-            # Params
-            if pasta == 'hes': p_alpha, p_beta = 0.0, 2.5
-            elif pasta == 'ros': p_alpha, p_beta = 0.5, 3.0
-            else: p_alpha, p_beta = 1.0, 3.0
-
-            arquivos = [f for f in os.listdir(caminho_completo_pasta) 
-                        if os.path.isfile(os.path.join(caminho_completo_pasta, f)) 
-                        and not f.startswith('.')]
-            arquivos.sort(key=extrair_numero_instancia)
-
-            print(f"\n>>> CLASSE: {pasta.upper()}")
-
-            for nome_instancia in arquivos:
-                caminho_instancia = os.path.join(caminho_completo_pasta, nome_instancia)
-                print(f" > {nome_instancia} | ", end="", flush=True)
-
-                dados = ler_e_converter_dados(caminho_instancia)
-                if not dados: continue
-                t_tar_trab, grafo, precedencia, lb_calc, c_alvo, t_med_trab, fatiadas, grafoR, os_val = dados
-
-                # 1. Gurobi (Referência Ótima)
-                gur_ciclo, gur_tempo, _, _ = resolver_gurobi(caminho_instancia, time_limit=TEMPO_LIMITE_POR_EXECUCAO)
-                print(f"Ref: {gur_ciclo:.1f} | ", end="", flush=True)
-
-                # 2. ACO Puro
-                runs_puro = []
-                for _ in range(N_ITERACOES_MEDIA):
-                    start = time.time()
-                    try:
-                        # Certifique-se que o main.py retorna (SF, SI) e aceita tempo_limite
-                        val_sf, val_si = ACO_Puro(
-                            t_tar_trab, grafo, precedencia, lb_calc, c_alvo, t_med_trab, 
-                            fatiadas, grafoR, os_val,
-                            alpha_trab=p_alpha, beta_trab=p_beta, alpha_tar=1.0, beta_tar=2.0,
-                            numeroFormigas=100, nIteracoesSemMelhoria=150,
-                            tempoLimite=TEMPO_LIMITE_POR_EXECUCAO # Verifique se no seu main.py é tempo_limite ou tempoLimite
-                        )
-                    except ValueError:
-                        # Caso o main.py ainda retorne apenas um valor
-                        val_sf = float('inf')
-                        val_si = float('inf')
-                    except TypeError:
-                         # Caso o nome do argumento de tempo esteja diferente
-                         print("[Aviso: Verifique o nome do parâmetro de tempo no main.py]")
-                         val_sf, val_si = float('inf'), float('inf')
-
-                    end = time.time()
-                    runs_puro.append({'sf': val_sf, 'si': val_si, 'time': end - start})
+            gur_ciclo = referencia['obj'] if referencia else None
+            p_si, p_sf, p_imp, p_gap, p_time = calcular_estatisticas(runs_puro, gur_ciclo)
+
+            # Escreve Linha
+            writer.writerow([
+                pasta, nome_instancia,
+                "-" if referencia is None else (f"{gur_ciclo:.1f}" if gur_ciclo != float('inf') else "INF"), 
+                "-" if referencia is None else f"{referencia['tempo']:.2f}",
                 
-                p_si, p_sf, p_imp, p_gap, p_time = calcular_estatisticas(runs_puro, gur_ciclo)
-                print(f"Puro: {p_sf}")
+                p_si, p_sf, p_imp, p_gap, p_time
+            ] + media_das_fases(runs_puro))
+            linhas += 1
+    return linhas
+
+def custo_do_job(job, n_nucleos):
+    # Núcleos ocupados: o do solver de referência (SOLVERS_REFERENCIA), 1 para o ACO
+    return min(SOLVERS_REFERENCIA[job['tipo']][2], n_nucleos) if job['tipo'] in SOLVERS_REFERENCIA else 1
+
+def executar_pool(pendentes, n_nucleos, arquivo_log, ao_concluir):
+    """
+    Roda os jobs num pool de processos respeitando o orçamento de núcleos (custo_do_job).
+    Cada registro vai para o log assim que termina e depois para ao_concluir(registro).
+    """
+    livres = n_nucleos
+    em_execucao = {} # future -> custo em núcleos
+    with ProcessPoolExecutor(max_workers=n_nucleos) as pool:
+        while pendentes or em_execucao:
+            # Despacha, na ordem, todo job que cabe nos núcleos livres
+            restantes = []
+            bloqueado = False # Referência esperando núcleos: não deixa os jobs do ACO passarem na frente indefinidamente
+            for job in pendentes:
+                custo = custo_do_job(job, n_nucleos)
+                if not bloqueado and custo <= livres:
+                    em_execucao[pool.submit(executar_job, job)] = custo
+                    livres -= custo
+                else:
+                    bloqueado = bloqueado or job['tipo'] in SOLVERS_REFERENCIA
+                    restantes.append(job)
+            pendentes = restantes
+
+            prontos, _ = wait(em_execucao, return_when=FIRST_COMPLETED)
+            for futuro in prontos:
+                livres += em_execucao.pop(futuro)
+                try:
+                    registro = futuro.result()
+                except Exception as e:
+                    print(f"[Erro num job: {e}]")
+                    continue
+                gravar_no_log(arquivo_log, registro)
+                ao_concluir(registro)
+
+def agendar_referencia(job, referencias, concluidos, arquivo_log):
+    """
+    Referência já guardada em referencias entra no log sem chamar o solver.
+    Retorna: chave da referência e se o job ainda precisa rodar
+    """
+    chave = chave_da_referencia(job['caminho'], TEMPO_LIMITE_POR_EXECUCAO, job['tipo'])
+    if chave in referencias:
+        if chave_do_job(job) not in concluidos:
+            registro = dict(job, **{campo: referencias[chave][campo] for campo in ('obj', 'tempo', 'status', 'gap')}, origem='referencias')
+            gravar_no_log(arquivo_log, registro)
+            concluidos[chave_do_job(job)] = registro
+        return chave, False
+    return chave, True
+
+def rodar_benchmark_comparativo(pasta_raiz='instancias', arquivo_saida='resultado_comparativo_puro.csv', arquivo_log=ARQUIVO_LOG_PADRAO, n_nucleos=None,
+                                so_aco=False, arquivo_referencias=ARQUIVO_REFERENCIAS, solver='gurobi', pasta_perfis=None, pasta_tracos=None, tamanho_cache_shift=0,
+                                arquivo_parametros=None):
+    """
+    Benchmark em jobs (instância x repetição) num pool de processos, retomável.
+    Cada job concluído vai para arquivo_log na hora; rodar de novo pula os jobs que já estão no log.
+    n_nucleos: núcleos disponíveis (padrão os.cpu_count()). Um job do Gurobi ocupa THREADS_GUROBI deles, um do ACO ocupa 1.
+    A referência de cada instância vem primeiro de arquivo_referencias (hash do conteúdo + tempo limite); o Gurobi só roda no que faltar.
+    so_aco: nunca chama o Gurobi (nem importa o gurobipy); instância sem referência guardada sai com '-' no CSV.
+    solver: solver exato da referência (chave de SOLVERS_REFERENCIA): 'gurobi', 'gurobi_aco', 'highs', 'cbc' ou 'bb' (branch-and-bound).
+    pasta_perfis: grava o cProfile de cada execução do ACO em <pasta>/<classe>_<instancia>_<repeticao>.prof.
+    tamanho_cache_shift > 0: o ACO usa o main.CacheShift com esse tamanho (acertos e descartes vão para o log, em 'contadores').
+    pasta_tracos: grava o traço por iteração de cada execução do ACO (main.iteracoesACO) em <pasta>/<classe>_<instancia>_<repeticao>.jsonl.
+    arquivo_parametros: parâmetros do ACO por classe gerados pelo calibracao.py (ver parametros_da_classe); vão para o log junto com cada job.
+    Como a chave do job não inclui os parâmetros, trocar de arquivo pede um arquivo_log novo.
+    No fim o CSV é reconstruído a partir do log.
+    """
+    diretorio_script = os.path.dirname(os.path.abspath(__file__))
+    caminho_raiz = os.path.join(diretorio_script, pasta_raiz)
+    
+    if not os.path.exists(caminho_raiz):
+        print(f"Erro: Pasta '{caminho_raiz}' não encontrada.")
+        return
+
+    instancias = listar_instancias(caminho_raiz)
+    concluidos = ler_log(arquivo_log)
+    referencias = carregar_referencias(arquivo_referencias)
+    chaves_referencia = {}
+
+    for pasta_extra in (pasta_perfis, pasta_tracos):
+        if pasta_extra:
+            os.makedirs(pasta_extra, exist_ok=True)
+
+    # Referência primeiro: é o job mais pesado e o que mais ocupa núcleos
+    jobs = []
+    for pasta, nome_instancia, caminho in instancias:
+        job = {'classe': pasta, 'instancia': nome_instancia, 'caminho': caminho, 'tipo': solver, 'repeticao': 0}
+        chaves_referencia[nome_instancia, pasta], falta = agendar_referencia(job, referencias, concluidos, arquivo_log)
+        if falta and not so_aco:
+            jobs.append(job)
+        for rep in range(N_ITERACOES_MEDIA):
+            job = {'classe': pasta, 'instancia': nome_instancia, 'caminho': caminho, 'tipo': 'aco', 'repeticao': rep,
+                   'parametros': parametros_da_classe(pasta, arquivo_parametros)}
+            if pasta_perfis:
+                job['perfil'] = os.path.join(pasta_perfis, f"{pasta}_{nome_instancia}_{rep}.prof")
+            if tamanho_cache_shift:
+                job['cache_shift'] = tamanho_cache_shift
+            if pasta_tracos:
+                job['traco'] = os.path.join(pasta_tracos, f"{pasta}_{nome_instancia}_{rep}.jsonl")
+            jobs.append(job)
+    pendentes = [job for job in jobs if chave_do_job(job) not in concluidos]
+
+    n_nucleos = n_nucleos or os.cpu_count() or 1
+    rotulo = SOLVERS_REFERENCIA[solver][3]
+    custo_referencia = min(SOLVERS_REFERENCIA[solver][2], n_nucleos)
+
+    print(f"--- INICIANDO BENCHMARK (ACO PURO vs {'REFERÊNCIAS GUARDADAS' if so_aco else rotulo.upper()}) ---")
+    print(f"--- Média de {N_ITERACOES_MEDIA} execuções por instância ---")
+    print(f"--- {len(pendentes)} de {len(jobs)} jobs pendentes | {n_nucleos} núcleos ({rotulo} usa {custo_referencia}) ---")
+
+    def ao_concluir(registro):
+        if registro['tipo'] == solver:
+            salvar_referencia(referencias, chaves_referencia[registro['instancia'], registro['classe']], registro, arquivo_referencias)
+            print(f" > {registro['instancia']} | Ref: {registro['obj']:.1f}", flush=True)
+        else:
+            print(f" > {registro['instancia']} | Puro #{registro['repeticao'] + 1}: {registro['sf']}", flush=True)
 
-                # Escreve Linha
-                writer.writerow([
-                    pasta, nome_instancia,
-                    f"{gur_ciclo:.1f}" if gur_ciclo != float('inf') else "INF", 
-                    f"{gur_tempo:.2f}",
-                    
-                    p_si, p_sf, p_imp, p_gap, p_time
-                ])
+    executar_pool(pendentes, n_nucleos, arquivo_log, ao_concluir)
 
-    print(f"\n--- Benchmark Concluído. Dados em '{arquivo_saida}' ---")
+    linhas = gerar_csv_do_log(arquivo_log, arquivo_saida, instancias, N_ITERACOES_MEDIA, exigir_referencia=not so_aco, solver=solver)
+    print(f"\n--- Benchmark Concluído. {linhas} instâncias em '{arquivo_saida}' (log: '{arquivo_log}') ---")
+
+def comparar_backends(pasta_raiz='instancias', backends=('gurobi', 'highs'), arquivo_saida='comparacao_backends.csv', arquivo_log=ARQUIVO_LOG_PADRAO,
+                      n_nucleos=None, arquivo_referencias=ARQUIVO_REFERENCIAS):
+    """
+    Resolve o modelo exato de cada instância em cada backend (chaves de SOLVERS_REFERENCIA) com o mesmo tempo limite
+    e as mesmas threads, no mesmo pool/log/arquivo de referências do benchmark (retomável do mesmo jeito).
+    CSV: por backend, objetivo, tempo, status e gap.
+    """
+    diretorio_script = os.path.dirname(os.path.abspath(__file__))
+    caminho_raiz = os.path.join(diretorio_script, pasta_raiz)
+    if not os.path.exists(caminho_raiz):
+        print(f"Erro: Pasta '{caminho_raiz}' não encontrada.")
+        return
+
+    instancias = listar_instancias(caminho_raiz)
+    concluidos = ler_log(arquivo_log)
+    referencias = carregar_referencias(arquivo_referencias)
+    chaves_referencia = {}
+    jobs = []
+    for pasta, nome_instancia, caminho in instancias:
+        for backend in backends:
+            job = {'classe': pasta, 'instancia': nome_instancia, 'caminho': caminho, 'tipo': backend, 'repeticao': 0}
+            chaves_referencia[nome_instancia, pasta, backend], falta = agendar_referencia(job, referencias, concluidos, arquivo_log)
+            if falta:
+                jobs.append(job)
+    pendentes = [job for job in jobs if chave_do_job(job) not in concluidos]
+
+    n_nucleos = n_nucleos or os.cpu_count() or 1
+    print(f"--- COMPARANDO BACKENDS ({', '.join(SOLVERS_REFERENCIA[b][3] for b in backends)}) | {len(pendentes)} jobs pendentes ---")
+
+    def ao_concluir(registro):
+        salvar_referencia(referencias, chaves_referencia[registro['instancia'], registro['classe'], registro['tipo']], registro, arquivo_referencias)
+        print(f" > {registro['instancia']} | {SOLVERS_REFERENCIA[registro['tipo']][3]}: {registro['obj']:.1f} em {registro['tempo']:.2f}s", flush=True)
+
+    executar_pool(pendentes, n_nucleos, arquivo_log, ao_concluir)
+
+    registros = ler_log(arquivo_log)
+    with open(arquivo_saida, mode='w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile, delimiter=';')
+        header = ['Classe', 'Instancia']
+        for backend in backends:
+            rotulo = SOLVERS_REFERENCIA[backend][3]
+            header += [f'{rotulo}_Obj', f'{rotulo}_Time', f'{rotulo}_Status', f'{rotulo}_Gap(%)']
+        writer.writerow(header)
+        for pasta, nome_instancia, _ in instancias:
+            linha = [pasta, nome_instancia]
+            for backend in backends:
+                registro = registros.get((pasta, nome_instancia, backend, 0))
+                if registro is None:
+                    linha += ['-', '-', '-', '-']
+                    continue
+                linha += [f"{registro['obj']:.1f}" if registro['obj'] != float('inf') else "INF", f"{registro['tempo']:.2f}",
+                          registro['status'], f"{registro['gap']:.2f}"]
+            writer.writerow(linha)
+    print(f"\n--- Comparação Concluída em '{arquivo_saida}' ---")
 
 if __name__ == "__main__":
-    rodar_benchmark_comparativo()
\ No newline at end of file
+    # python benchmark.py --so-aco : roda só o ACO contra as referências já guardadas
+    # python benchmark.py --bb     : referência pelo branch-and-bound (solver_bb.py) em vez do Gurobi
+    # python benchmark.py --solver=gurobi_aco : qualquer solver de SOLVERS_REFERENCIA
+    # python benchmark.py --comparar-backends=gurobi,highs,cbc : tempos do modelo exato em cada backend
+    # python benchmark.py --perfis=pasta : grava o cProfile de cada execução do ACO nessa pasta
+    # python benchmark.py --cache-shift=2000 : liga o cache de soluções na frente do shift do ACO
+    # python benchmark.py --tracos=pasta : grava o traço (melhor por iteração x tempo) de cada execução do ACO nessa pasta
+    # python benchmark.py --parametros=parametros_aco.json : parâmetros do ACO por classe (saída do calibracao.py)
+    solver = 'bb' if '--bb' in sys.argv else 'gurobi'
+    pasta_perfis = pasta_tracos = arquivo_parametros = None
+    tamanho_cache_shift = 0
+    for argumento in sys.argv[1:]:
+        if argumento.startswith('--perfis='):
+            pasta_perfis = argumento.split('=', 1)[1]
+        if argumento.startswith('--tracos='):
+            pasta_tracos = argumento.split('=', 1)[1]
+        if argumento.startswith('--cache-shift='):
+            tamanho_cache_shift = int(argumento.split('=', 1)[1])
+        if argumento.startswith('--parametros='):
+            arquivo_parametros = argumento.split('=', 1)[1]
+        if argumento.startswith('--solver='):
+            solver = argumento.split('=', 1)[1]
+        if argumento.startswith('--comparar-backends='):
+            comparar_backends(backends=tuple(argumento.split('=', 1)[1].split(',')))
+            sys.exit(0)
+    rodar_benchmark_comparativo(so_aco='--so-aco' in sys.argv, solver=solver, pasta_perfis=pasta_perfis, pasta_tracos=pasta_tracos, tamanho_cache_shift=tamanho_cache_shift,
+                                arquivo_parametros=arquivo_parametros)
\ No newline at end of file
@@ -0,0 +1,207 @@
+import os
+import sys
+import json
+import math
+import time
+import random
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+
+from main import ACOInstancia, ler_e_converter_dados, PARAMETROS_ACO
+from benchmark import listar_instancias, parametros_da_classe
+
+# Calibração dos parâmetros do ACO por corrida (F-race, Birattari et al. 2002): todas as configurações vivas rodam
+# no mesmo bloco (instância + semente), e o teste de Friedman com comparações par a par elimina as piores assim que
+# há evidência estatística. O orçamento que sobra vai para as configurações que continuam na corrida.
+
+ARQUIVO_PARAMETROS = 'parametros_aco.json' # {classe: {parametro: valor}}, lido por benchmark.py --parametros= e main.carregarParametros
+TEMPO_POR_EXECUCAO = 30 # Segundos por execução do ACO durante a corrida
+ALFA_FRACE = 0.05 # Nível de significância do teste de Friedman e das comparações par a par
+BLOCOS_ANTES_DE_ELIMINAR = 5 # Primeiro teste só depois desse número de blocos, como no irace
+
+# Valores sorteados para cada parâmetro (PARAMETROS_ACO)
+ESPACO_PARAMETROS = {
+    'alpha_trab': (0.0, 0.5, 1.0, 1.5, 2.0),
+    'beta_trab': (1.0, 1.5, 2.0, 2.5, 3.0, 3.5, 4.0),
+    'alpha_tar': (0.0, 0.5, 1.0, 1.5, 2.0),
+    'beta_tar': (1.0, 1.5, 2.0, 2.5, 3.0, 3.5, 4.0),
+    'numeroFormigas': (50, 100, 150, 200),
+    'nIteracoesSemMelhoria': (50, 100, 150, 200),
+}
+
+def sortear_configuracoes(n_configuracoes, classe, gerador):
+    """
+    Retorna n_configuracoes distintas (dicts com PARAMETROS_ACO). A primeira é a atual da classe
+    (benchmark.parametros_da_classe), então a corrida só troca os parâmetros por algo que bateu os atuais.
+    """
+    configuracoes = [parametros_da_classe(classe)]
+    vistas = {tuple(configuracoes[0][nome] for nome in PARAMETROS_ACO)}
+    total = math.prod(len(valores) for valores in ESPACO_PARAMETROS.values())
+    while len(configuracoes) < min(n_configuracoes, total):
+        configuracao = {nome: gerador.choice(ESPACO_PARAMETROS[nome]) for nome in PARAMETROS_ACO}
+        chave = tuple(configuracao[nome] for nome in PARAMETROS_ACO)
+        if chave not in vistas:
+            vistas.add(chave)
+            configuracoes.append(configuracao)
+    return configuracoes
+
+def quantil_qui_quadrado(p, graus):
+    # Exato para 1 e 2 graus de liberdade; acima disso, aproximação de Wilson-Hilferty (sem scipy)
+    if graus == 1:
+        return statistics.NormalDist().inv_cdf((1 + p) / 2) ** 2
+    if graus == 2:
+        return -2 * math.log(1 - p)
+    z = statistics.NormalDist().inv_cdf(p)
+    return graus * (1 - 2 / (9 * graus) + z * math.sqrt(2 / (9 * graus))) ** 3
+
+def quantil_t(p, graus):
+    # Expansão de Cornish-Fisher do quantil da t de Student em torno da normal
+    z = statistics.NormalDist().inv_cdf(p)
+    return z + (z ** 3 + z) / (4 * graus) + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * graus ** 2)
+
+def postos(valores):
+    # Postos 1..k dentro do bloco; empates recebem o posto médio
+    ordem = sorted(range(len(valores)), key=lambda i: valores[i])
+    resultado = [0.0] * len(valores)
+    i = 0
+    while i < len(ordem):
+        j = i
+        while j + 1 < len(ordem) and valores[ordem[j + 1]] == valores[ordem[i]]:
+            j += 1
+        for posicao in range(i, j + 1):
+            resultado[ordem[posicao]] = (i + j) / 2 + 1
+        i = j + 1
+    return resultado
+
+def teste_friedman(blocos, alfa=ALFA_FRACE):
+    """
+    blocos: [[custo de cada configuração viva no bloco]], todos com as mesmas configurações na mesma ordem.
+    Retorna as posições (na lista de configurações vivas) que sobrevivem: todas se o Friedman não rejeita a igualdade,
+    senão só as que a comparação par a par (Conover) não separa da melhor.
+    """
+    b, k = len(blocos), len(blocos[0])
+    if k < 2 or b < 2:
+        return list(range(k))
+    ranks = [postos(bloco) for bloco in blocos]
+    somas = [sum(rank[j] for rank in ranks) for j in range(k)]
+    a = sum(r * r for rank in ranks for r in rank)
+    c = b * k * (k + 1) ** 2 / 4
+    if a - c <= 1e-12: # Tudo empatado em todos os blocos
+        return list(range(k))
+    t = (k - 1) * sum((soma - b * (k + 1) / 2) ** 2 for soma in somas) / (a - c)
+    if t <= quantil_qui_quadrado(1 - alfa, k - 1):
+        return list(range(k))
+    limiar = quantil_t(1 - alfa / 2, (b - 1) * (k - 1)) * math.sqrt(max(0.0, 2 * b * (a - c) / ((b - 1) * (k - 1)) * (1 - t / (b * (k - 1)))))
+    melhor = min(somas)
+    return [j for j in range(k) if somas[j] - melhor <= limiar]
+
+INSTANCIAS_CARREGADAS = {} # Por processo do pool: a InstanciaACO não é alterada pelo ACO (só o cache de potências cresce), então pode ser reaproveitada entre execuções
+
+def avaliar(tarefa):
+    # Uma execução do ACO num processo do pool. Retorna o melhor ciclo (inf se a instância não pôde ser lida)
+    caminho, parametros, semente, tempo_limite = tarefa
+    if caminho not in INSTANCIAS_CARREGADAS:
+        INSTANCIAS_CARREGADAS[caminho] = ler_e_converter_dados(caminho)
+    dados = INSTANCIAS_CARREGADAS[caminho]
+    if not dados:
+        return float('inf')
+    _, melhor = ACOInstancia(dados, tempoLimite=tempo_limite, semente=semente, **parametros)
+    return melhor
+
+def correr_classe(caminhos, configuracoes, pool, n_nucleos, orcamento, tempo_por_execucao=TEMPO_POR_EXECUCAO, alfa=ALFA_FRACE, semente=0):
+    """
+    F-race de uma classe. Cada bloco é uma instância de caminhos (em ordem embaralhada a cada volta) com uma semente
+    nova, a mesma para todas as configurações vivas. Quando sobram menos configurações vivas que núcleos, vários
+    blocos rodam na mesma rodada para o pool não ficar ocioso.
+    Para quando sobra uma configuração ou quando o orçamento (número de execuções do ACO) acaba.
+    Retorna: (melhor configuração, posições das vivas, número de blocos, execuções gastas)
+    """
+    gerador = random.Random(semente)
+    vivas = list(range(len(configuracoes)))
+    custos = {j: [] for j in vivas} # Configuração -> custo em cada bloco (as vivas têm todos os blocos)
+    fila = []
+    n_blocos = execucoes = 0
+    while len(vivas) > 1 and execucoes + len(vivas) <= orcamento:
+        blocos_na_rodada = min(max(1, n_nucleos // len(vivas)), (orcamento - execucoes) // len(vivas))
+        rodada = []
+        for _ in range(blocos_na_rodada):
+            if not fila:
+                fila = list(caminhos)
+                gerador.shuffle(fila)
+            rodada.append((fila.pop(), semente + n_blocos))
+            n_blocos += 1
+        tarefas = [(caminho, configuracoes[j], semente_bloco, tempo_por_execucao) for caminho, semente_bloco in rodada for j in vivas]
+        resultados = list(pool.map(avaliar, tarefas))
+        execucoes += len(tarefas)
+        for i, resultado in enumerate(resultados):
+            custos[vivas[i % len(vivas)]].append(resultado)
+
+        if n_blocos >= BLOCOS_ANTES_DE_ELIMINAR:
+            blocos = [[custos[j][bloco] for j in vivas] for bloco in range(n_blocos)]
+            sobreviventes = teste_friedman(blocos, alfa)
+            if len(sobreviventes) < len(vivas):
+                vivas = [vivas[posicao] for posicao in sobreviventes]
+                print(f"   bloco {n_blocos}: {len(vivas)} configurações vivas ({execucoes} execuções)", flush=True)
+
+    # Melhor entre as vivas: menor soma de postos nos blocos que todas correram; empate pelo custo médio
+    blocos = [[custos[j][bloco] for j in vivas] for bloco in range(n_blocos)]
+    somas = [sum(rank[posicao] for rank in map(postos, blocos)) for posicao in range(len(vivas))]
+    melhor = min(range(len(vivas)), key=lambda posicao: (somas[posicao], statistics.mean(custos[vivas[posicao]]) if n_blocos else 0))
+    return configuracoes[vivas[melhor]], vivas, n_blocos, execucoes
+
+def calibrar(pasta_raiz='instancias', classes=None, n_configuracoes=30, orcamento_por_classe=300, tempo_por_execucao=TEMPO_POR_EXECUCAO,
+             n_nucleos=None, arquivo_saida=ARQUIVO_PARAMETROS, alfa=ALFA_FRACE, semente=0):
+    """
+    Roda uma F-race por classe de instâncias (subpastas de pasta_raiz, como no benchmark) num pool de processos.
+    classes: só essas subpastas (padrão todas). orcamento_por_classe: execuções do ACO por classe.
+    O resultado de cada classe entra em arquivo_saida assim que a corrida dela termina; as outras classes do arquivo ficam como estavam.
+    """
+    diretorio_script = os.path.dirname(os.path.abspath(__file__))
+    caminho_raiz = os.path.join(diretorio_script, pasta_raiz)
+    if not os.path.exists(caminho_raiz):
+        print(f"Erro: Pasta '{caminho_raiz}' não encontrada.")
+        return
+
+    por_classe = {}
+    for pasta, _, caminho in listar_instancias(caminho_raiz):
+        if classes is None or pasta in classes:
+            por_classe.setdefault(pasta, []).append(caminho)
+
+    parametros = {}
+    if os.path.exists(arquivo_saida):
+        with open(arquivo_saida, encoding='utf-8') as f:
+            parametros = json.load(f)
+
+    n_nucleos = n_nucleos or os.cpu_count() or 1
+    print(f"--- CALIBRAÇÃO F-RACE | {len(por_classe)} classes | {n_configuracoes} configurações | {orcamento_por_classe} execuções por classe | {n_nucleos} núcleos ---")
+    with ProcessPoolExecutor(max_workers=n_nucleos) as pool:
+        for classe, caminhos in sorted(por_classe.items()):
+            inicio = time.time()
+            configuracoes = sortear_configuracoes(n_configuracoes, classe, random.Random(f"{semente}:{classe}"))
+            print(f" > {classe}: {len(caminhos)} instâncias, {len(configuracoes)} configurações", flush=True)
+            melhor, vivas, n_blocos, execucoes = correr_classe(caminhos, configuracoes, pool, n_nucleos, orcamento_por_classe,
+                                                               tempo_por_execucao, alfa, semente)
+            parametros[classe] = melhor
+            with open(arquivo_saida, 'w', encoding='utf-8') as f:
+                json.dump(parametros, f, indent=2)
+            print(f" > {classe}: {melhor} ({len(vivas)} vivas, {n_blocos} blocos, {execucoes} execuções, {time.time() - inicio:.1f}s)", flush=True)
+    print(f"\n--- Calibração Concluída em '{arquivo_saida}' ---")
+
+if __name__ == "__main__":
+    # python calibracao.py --classes=hes,ros --configuracoes=30 --orcamento=300 --tempo=30 --nucleos=8 --saida=parametros_aco.json
+    # Depois: python benchmark.py --parametros=parametros_aco.json
+    opcoes = {}
+    for argumento in sys.argv[1:]:
+        if argumento.startswith('--classes='):
+            opcoes['classes'] = argumento.split('=', 1)[1].split(',')
+        if argumento.startswith('--configuracoes='):
+            opcoes['n_configuracoes'] = int(argumento.split('=', 1)[1])
+        if argumento.startswith('--orcamento='):
+            opcoes['orcamento_por_classe'] = int(argumento.split('=', 1)[1])
+        if argumento.startswith('--tempo='):
+            opcoes['tempo_por_execucao'] = float(argumento.split('=', 1)[1])
+        if argumento.startswith('--nucleos='):
+            opcoes['n_nucleos'] = int(argumento.split('=', 1)[1])
+        if argumento.startswith('--saida='):
+            opcoes['arquivo_saida'] = argumento.split('=', 1)[1]
+    calibrar(**opcoes)
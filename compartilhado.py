@@ -0,0 +1,96 @@
+import struct
+import weakref
+from multiprocessing import shared_memory
+
+# Vetores planos num único segmento de multiprocessing.shared_memory, para os processos do pool (main.ColoniaACO)
+# e as ilhas (ilhas.py) lerem a instância sem receber cópias: quem publica grava uma vez, os outros anexam pelo nome.
+# O descritor (nome do segmento + layout) é pequeno e é a única coisa que passa por pickle.
+
+def _alinhar(posicao):
+    return (posicao + 7) & ~7
+
+class SegmentoCompartilhado:
+    """
+    Segmento com vetores nomeados. Cada vetor tem um formato do struct/array ('i', 'q', 'd', 'B', '?') e uma forma (tupla),
+    e pode ser lido como memoryview (vetor) ou como array do NumPy (arrayNumpy), os dois sem cópia.
+    Quem publica é o dono: liberar() fecha e remove o segmento (também chamado na coleta do objeto e na saída do interpretador;
+    se o processo morrer antes, o resource_tracker do multiprocessing remove o segmento). Quem anexa só fecha.
+    """
+    def __init__(self, memoria, layout, escalares, dono):
+        self._memoria = memoria
+        self.layout = layout # nome -> (posicao, formato, forma)
+        self.escalares = escalares
+        self._visoes = []
+        self._finalizador = weakref.finalize(self, SegmentoCompartilhado._fecharMemoria, memoria, dono)
+
+    @staticmethod
+    def _fecharMemoria(memoria, dono):
+        try:
+            memoria.close()
+        except BufferError: # Ainda há arrays apontando para o segmento; o mapeamento some com o processo
+            pass
+        if dono:
+            try:
+                memoria.unlink()
+            except FileNotFoundError:
+                pass
+
+    @classmethod
+    def publicar(cls, vetores, escalares=None):
+        """
+        vetores: {nome: (formato, forma, dados)}, com dados em qualquer objeto de buffer contíguo (array, bytes, ndarray)
+        no formato e tamanho da forma. escalares: valores pequenos que vão junto no descritor.
+        """
+        layout = {}
+        posicao = 0
+        for nome, (formato, forma, dados) in vetores.items():
+            quantidade = 1
+            for dimensao in forma:
+                quantidade *= dimensao
+            layout[nome] = (posicao, formato, tuple(forma))
+            posicao = _alinhar(posicao + quantidade * struct.calcsize(formato))
+        memoria = shared_memory.SharedMemory(create=True, size=max(posicao, 1))
+        segmento = cls(memoria, layout, dict(escalares or {}), dono=True)
+        for nome, (formato, forma, dados) in vetores.items():
+            inicio = layout[nome][0]
+            bruto = memoryview(dados).cast('B')
+            memoria.buf[inicio:inicio + len(bruto)] = bruto
+            bruto.release()
+        return segmento
+
+    @property
+    def descritor(self):
+        return (self._memoria.name, self.layout, self.escalares)
+
+    @classmethod
+    def anexar(cls, descritor):
+        nome, layout, escalares = descritor
+        return cls(shared_memory.SharedMemory(name=nome), layout, escalares, dono=False)
+
+    def vetor(self, nome):
+        posicao, formato, forma = self.layout[nome]
+        tamanho = struct.calcsize(formato)
+        for dimensao in forma:
+            tamanho *= dimensao
+        visao = self._memoria.buf[posicao:posicao + tamanho].cast(formato, forma)
+        self._visoes.append(visao)
+        return visao
+
+    def arrayNumpy(self, nome):
+        import numpy as np
+        posicao, formato, forma = self.layout[nome]
+        visao = np.ndarray(forma, dtype=np.dtype(formato), buffer=self._memoria.buf, offset=posicao)
+        visao.flags.writeable = False # Outros processos leem o mesmo segmento
+        return visao
+
+    def liberar(self):
+        for visao in self._visoes:
+            visao.release()
+        self._visoes = []
+        self._finalizador()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.liberar()
@@ -0,0 +1,171 @@
+import os
+import sys
+import csv
+import math
+import time
+import multiprocessing
+
+import gerador
+
+try:
+    import resource # Pico de memória do processo (só Unix)
+except ImportError:
+    resource = None
+
+# Curvas de escala do ACO e do modelo exato em instâncias sintéticas (gerador.py): para cada tamanho, um processo
+# novo lê a instância, roda algumas iterações da colônia e monta os modelos MIP, medindo tempo e pico de memória.
+# O processo é novo a cada tamanho (spawn) para o pico de memória de um tamanho não contaminar o próximo.
+
+TAMANHOS_PADRAO = ((100, 10), (250, 15), (500, 20), (1000, 30), (2000, 40), (4000, 60))
+PASTA_SINTETICAS = 'instancias_sinteticas'
+ARQUIVO_SAIDA = 'escalabilidade.csv'
+N_ITERACOES = 5 # Iterações cronometradas da colônia por tamanho
+N_FORMIGAS = 50
+TEMPO_LIMITE_ACO = 300 # Prazo da colônia por tamanho (a iteração em andamento para no prazo, como no ACO)
+MAX_TAREFAS_MODELO = 1000 # Acima disso o modelo não é montado (só o tamanho calculado), o clássico cresce com n * k²
+FORMULACOES = ('classica', 'apertada')
+
+def memoria_pico_mb():
+    if resource is None:
+        return float('nan')
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / 1024 if sys.platform != 'darwin' else pico / (1024 * 1024) # KB no Linux, bytes no macOS
+
+def medir_tamanho(caminho, n_iteracoes=N_ITERACOES, n_formigas=N_FORMIGAS, tempo_limite=TEMPO_LIMITE_ACO, max_tarefas_modelo=MAX_TAREFAS_MODELO, semente=0):
+    """
+    Roda num processo novo. Retorna o registro com os tempos (segundos) e picos de memória (MB) de um tamanho:
+    leitura fria (texto -> cache binário) e quente, iterações da colônia (total e shift por iteração) e montagem de cada formulação.
+    O pico de memória só cresce, então é lido ao fim de cada etapa: base (imports), ACO (até a colônia) e modelo (até os modelos).
+    """
+    import main
+    import instancia
+    from formulacao import ler_instancia_alwabp, montar_modelo, tamanho_formulacao_classica, FormulacaoApertada
+
+    registro = {'memoria_base': memoria_pico_mb()}
+    cache = instancia.caminhoDoCache(caminho) # Sem o cache binário, a primeira leitura é a do texto (leitura fria)
+    if os.path.exists(cache):
+        os.remove(cache)
+    inicio = time.perf_counter()
+    main.ler_e_converter_dados(caminho)
+    registro['leitura_fria'] = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    dados = main.ler_e_converter_dados(caminho)
+    registro['leitura'] = time.perf_counter() - inicio
+    registro['lower_bound'] = dados.lowerBound
+
+    colonia = main.ColoniaACO(*dados[:9], 1, 3, 1, 2, numeroFormigas=n_formigas, cacheHeuristico=dados.cacheHeuristico, semente=semente, estatisticas=True)
+    inicio = time.perf_counter()
+    colonia.prazo = time.time() + tempo_limite
+    try:
+        for _ in range(n_iteracoes):
+            colonia.iterar()
+            if colonia.interrompida:
+                break
+    finally:
+        colonia.fechar()
+    total = time.perf_counter() - inicio
+    est = colonia.estatisticas
+    iteracoes = est.contadores['iteracoes']
+    registro.update({'iteracoes': iteracoes, 'interrompida': colonia.interrompida, 'tempo_iteracao': total / iteracoes if iteracoes else float('nan'),
+                     'shift_iteracao': est.tempos['shift'] / iteracoes if iteracoes else float('nan'), 'melhor_ciclo': colonia.melhorGlobal})
+    # Viável: nenhuma tarefa com trabalhador incapaz (o ACO só penaliza, então um ciclo alto pode esconder isso)
+    melhor = colonia.melhorFormigaGlobal
+    registro['viavel'] = melhor is not None and all(dados.tempoTarefaTrabalhador[t][melhor.trabalhadores[melhor.estacaoDaTarefa[t]]] != math.inf
+                                                    for t in range(dados.numeroTarefas))
+    registro['memoria_aco'] = memoria_pico_mb()
+
+    inicio = time.perf_counter()
+    n, k, t, G = ler_instancia_alwabp(caminho)
+    registro['leitura_modelo'] = time.perf_counter() - inicio
+    for formulacao in FORMULACOES:
+        if n <= max_tarefas_modelo:
+            inicio = time.perf_counter()
+            mip, _ = montar_modelo(n, k, t, G, formulacao)
+            registro[f'montagem_{formulacao}'] = time.perf_counter() - inicio
+            registro[f'tamanho_{formulacao}'] = mip.tamanho()
+            del mip
+        else:
+            registro[f'montagem_{formulacao}'] = float('nan')
+            registro[f'tamanho_{formulacao}'] = tamanho_formulacao_classica(n, k, G) if formulacao == 'classica' else FormulacaoApertada(n, k, t, G).tamanho()
+    registro['memoria_modelo'] = memoria_pico_mb()
+    return registro
+
+def formatar(valor, casas=3):
+    return '-' if math.isnan(valor) else f"{valor:.{casas}f}"
+
+def expoente(tamanhos, valores):
+    # Inclinação da reta log(valor) x log(tamanho) por mínimos quadrados: valor ~ tamanho^expoente
+    pontos = [(math.log(x), math.log(y)) for x, y in zip(tamanhos, valores) if x > 0 and y > 0 and not math.isnan(y)]
+    if len(pontos) < 2:
+        return float('nan')
+    media_x = sum(x for x, _ in pontos) / len(pontos)
+    media_y = sum(y for _, y in pontos) / len(pontos)
+    variancia = sum((x - media_x) ** 2 for x, _ in pontos)
+    return sum((x - media_x) * (y - media_y) for x, y in pontos) / variancia if variancia else float('nan')
+
+def rodar_escalabilidade(tamanhos=TAMANHOS_PADRAO, densidade_incapacidade=0.2, order_strength=0.1, pasta=PASTA_SINTETICAS, arquivo_saida=ARQUIVO_SAIDA,
+                         n_iteracoes=N_ITERACOES, n_formigas=N_FORMIGAS, tempo_limite=TEMPO_LIMITE_ACO, max_tarefas_modelo=MAX_TAREFAS_MODELO, semente=0):
+    """
+    Varre tamanhos [(tarefas, trabalhadores)]: gera a instância (ou reaproveita a que já está em pasta), mede num processo novo
+    e grava uma linha por tamanho em arquivo_saida. No fim, imprime o expoente empírico de cada curva em função do número de tarefas.
+    """
+    contexto = multiprocessing.get_context('spawn')
+    linhas = []
+    print(f"--- ESCALABILIDADE | {len(tamanhos)} tamanhos | Inf {densidade_incapacidade:.2f} | OS alvo {order_strength:.2f} | {n_iteracoes} iterações x {n_formigas} formigas ---")
+    for n_tarefas, n_trabalhadores in tamanhos:
+        inicio = time.time()
+        caminho, _ = gerador.gerar_arquivo(pasta, n_tarefas, n_trabalhadores, densidade_incapacidade, order_strength, semente=semente)
+        tempo_geracao = time.time() - inicio
+        with contexto.Pool(1) as pool:
+            registro = pool.apply(medir_tamanho, (caminho, n_iteracoes, n_formigas, tempo_limite, max_tarefas_modelo, semente))
+        registro.update({'tarefas': n_tarefas, 'trabalhadores': n_trabalhadores, 'geracao': tempo_geracao})
+        linhas.append(registro)
+        print(f" > {n_tarefas}x{n_trabalhadores}: iteração {registro['tempo_iteracao']:.3f}s (shift {registro['shift_iteracao']:.3f}s) | "
+              f"ciclo {registro['melhor_ciclo']:.0f}{'' if registro['viavel'] else ' (inviável)'} | leitura {registro['leitura_fria']:.2f}s | "
+              f"modelo {formatar(registro['montagem_classica'], 2)}s / {formatar(registro['montagem_apertada'], 2)}s | pico {formatar(registro['memoria_modelo'], 0)} MB", flush=True)
+
+    with open(arquivo_saida, mode='w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile, delimiter=';')
+        header = ['Tarefas', 'Trabalhadores', 'Geracao', 'Leitura_Fria', 'Leitura', 'LB', 'ACO_Iteracoes', 'ACO_T_Iteracao', 'ACO_T_Shift_Iteracao',
+                  'ACO_Ciclo', 'ACO_Viavel', 'Leitura_Modelo']
+        for formulacao in FORMULACOES:
+            header += [f'Modelo_{formulacao}_Montagem', f'Modelo_{formulacao}_Vars', f'Modelo_{formulacao}_Restricoes', f'Modelo_{formulacao}_NZ']
+        header += ['Memoria_Base_MB', 'Memoria_ACO_MB', 'Memoria_Modelo_MB']
+        writer.writerow(header)
+        for r in linhas:
+            linha = [r['tarefas'], r['trabalhadores'], f"{r['geracao']:.2f}", f"{r['leitura_fria']:.3f}", f"{r['leitura']:.3f}", r['lower_bound'], r['iteracoes'],
+                     formatar(r['tempo_iteracao'], 4), formatar(r['shift_iteracao'], 4), f"{r['melhor_ciclo']:.0f}", r['viavel'], f"{r['leitura_modelo']:.3f}"]
+            for formulacao in FORMULACOES:
+                linha += [formatar(r[f'montagem_{formulacao}']), *r[f'tamanho_{formulacao}']]
+            linha += [formatar(r['memoria_base'], 1), formatar(r['memoria_aco'], 1), formatar(r['memoria_modelo'], 1)]
+            writer.writerow(linha)
+
+    tarefas = [r['tarefas'] for r in linhas]
+    print("\n--- Expoente empírico (valor ~ tarefas^expoente) ---")
+    for rotulo, chave in (('Tempo por iteração', 'tempo_iteracao'), ('Shift por iteração', 'shift_iteracao'), ('Leitura fria', 'leitura_fria'),
+                          ('Montagem clássica', 'montagem_classica'), ('Montagem apertada', 'montagem_apertada'),
+                          ('Memória do ACO', 'memoria_aco'), ('Memória com modelo', 'memoria_modelo')):
+        print(f"   {rotulo:<20} {formatar(expoente(tarefas, [r[chave] for r in linhas]), 2)}")
+    print(f"\n--- Curvas em '{arquivo_saida}' ---")
+
+if __name__ == "__main__":
+    # python escalabilidade.py --tamanhos=100x10,500x20,2000x40 --densidade=0.2 --os=0.1 --iteracoes=5 --formigas=50 --max-modelo=1000
+    opcoes = {}
+    for argumento in sys.argv[1:]:
+        if argumento.startswith('--tamanhos='):
+            opcoes['tamanhos'] = [tuple(int(x) for x in tamanho.split('x')) for tamanho in argumento.split('=', 1)[1].split(',')]
+        if argumento.startswith('--densidade='):
+            opcoes['densidade_incapacidade'] = float(argumento.split('=', 1)[1])
+        if argumento.startswith('--os='):
+            opcoes['order_strength'] = float(argumento.split('=', 1)[1])
+        if argumento.startswith('--iteracoes='):
+            opcoes['n_iteracoes'] = int(argumento.split('=', 1)[1])
+        if argumento.startswith('--formigas='):
+            opcoes['n_formigas'] = int(argumento.split('=', 1)[1])
+        if argumento.startswith('--max-modelo='):
+            opcoes['max_tarefas_modelo'] = int(argumento.split('=', 1)[1])
+        if argumento.startswith('--pasta='):
+            opcoes['pasta'] = argumento.split('=', 1)[1]
+        if argumento.startswith('--saida='):
+            opcoes['arquivo_saida'] = argumento.split('=', 1)[1]
+    rodar_escalabilidade(**opcoes)
@@ -0,0 +1,59 @@
+import time
+
+# Contadores e tempos por fase do ACO. A colonia so mede quando recebe um EstatisticasACO (estatisticas=True no ACO);
+# desligado, o custo e um 'is not None' por fase.
+
+FASES = ('trabalhadores', # alocaTrabalhadoresAEstacoes (modo sequencial)
+         'tarefas', # alocaTarefas (modo sequencial)
+         'construcaoVetorizada', # construirColoniaVetorizada: os dois niveis da colonia inteira em lote
+         'lotesParalelos', # pool.map dos lotes (construção + shift nos processos, nProcessos > 1)
+         'shift',
+         'vnd',
+         'evaporacao',
+         'deposito',
+         'reinicio', # Reinicio do feromonio por estagnação
+         'melhorGlobal') # Copia da nova melhor formiga
+
+CONTADORES = ('iteracoes', 'formigas', 'shiftTentados', 'shiftAceitos', 'reinicios', 'melhorias',
+              'cacheShiftAcertos', 'cacheShiftFalhas', 'cacheShiftDescartes') # Do main.CacheShift (tamanhoCacheShift > 0)
+
+class EstatisticasACO:
+    """
+    Tempo acumulado (segundos, perf_counter) e número de chamadas de cada fase, mais os contadores da execução.
+    shiftTentados: pares (tarefa, estação) avaliados pelo shift; shiftAceitos: movimentos feitos.
+    cacheShift*: formigas respondidas pelo cache, formigas que passaram pelo shift e entradas descartadas pelo LRU.
+    """
+    def __init__(self):
+        self.tempos = dict.fromkeys(FASES, 0.0)
+        self.chamadas = dict.fromkeys(FASES, 0)
+        self.contadores = dict.fromkeys(CONTADORES, 0)
+        self.tempoTotal = 0.0
+
+    @staticmethod
+    def agora():
+        return time.perf_counter()
+
+    def medir(self, fase, inicio):
+        # Soma o tempo desde inicio na fase e devolve o instante atual (inicio da proxima fase)
+        agora = time.perf_counter()
+        self.tempos[fase] += agora - inicio
+        self.chamadas[fase] += 1
+        return agora
+
+    def contar(self, nome, quantidade=1):
+        self.contadores[nome] += quantidade
+
+    def somar(self, outra):
+        for fase in FASES:
+            self.tempos[fase] += outra.tempos[fase]
+            self.chamadas[fase] += outra.chamadas[fase]
+        for nome in CONTADORES:
+            self.contadores[nome] += outra.contadores[nome]
+        self.tempoTotal += outra.tempoTotal
+
+    def comoDict(self):
+        return {'tempos': dict(self.tempos), 'chamadas': dict(self.chamadas), 'contadores': dict(self.contadores), 'tempoTotal': self.tempoTotal}
+
+    def __repr__(self):
+        fases = ', '.join(f"{fase}={self.tempos[fase]:.3f}s" for fase in FASES if self.chamadas[fase])
+        return f"EstatisticasACO(total={self.tempoTotal:.3f}s, {fases}, {self.contadores})"
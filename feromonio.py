@@ -0,0 +1,67 @@
+import numpy as np
+
+class FeromonioMMAS:
+    """
+    Feromônio do ACO em arrays NumPy, atualizado no lugar, com limites MAX-MIN.
+    te: matriz [Trabalhador][Estacao]; tarefas: matriz [Estacao][Tarefa] (mesmo layout das listas do main.py).
+    tau_max = Q / (rho * melhor tempo de ciclo) e tau_min = tau_max / fatorMinimo.
+    """
+    def __init__(self, numeroTrabalhadores, numeroTarefas, inicial, rho=0.1, Q=100, fatorMinimo=None):
+        self.rho = rho
+        self.Q = Q
+        self.fatorMinimo = fatorMinimo if fatorMinimo is not None else 2 * max(numeroTarefas, 1)
+        self.te = np.full((numeroTrabalhadores, numeroTrabalhadores), float(inicial))
+        self.tarefas = np.full((numeroTrabalhadores, numeroTarefas), float(inicial))
+        self.tauMax = float(inicial)
+        self.tauMin = 0.0001 # Mesmo piso da evaporação clássica enquanto não há melhor solução
+
+    def atualizarLimites(self, melhorTempoDeCiclo):
+        if melhorTempoDeCiclo <= 0 or melhorTempoDeCiclo == float('inf'):
+            return
+        self.tauMax = self.Q / (self.rho * melhorTempoDeCiclo)
+        self.tauMin = self.tauMax / self.fatorMinimo
+
+    def limitar(self):
+        np.clip(self.te, self.tauMin, self.tauMax, out=self.te)
+        np.clip(self.tarefas, self.tauMin, self.tauMax, out=self.tarefas)
+
+    def evaporar(self):
+        self.te *= (1 - self.rho)
+        self.tarefas *= (1 - self.rho)
+        self.limitar()
+
+    def depositar(self, trabalhadores, estacaoDaTarefa, temposDeCiclo):
+        """
+        Depósito em lote (scatter-add) das soluções de elite, na forma compacta:
+        trabalhadores [Solucao][Estacao], estacaoDaTarefa [Solucao][Tarefa] (-1 = não alocada), temposDeCiclo [Solucao].
+        Cada solução deposita Q/tempoDeCiclo em todas as suas escolhas.
+        """
+        trabalhadores = np.asarray(trabalhadores, dtype=np.int64)
+        estacaoDaTarefa = np.asarray(estacaoDaTarefa, dtype=np.int64)
+        quantidade = self.Q / np.asarray(temposDeCiclo, dtype=float)
+        if len(quantidade) == 0:
+            return
+        nSolucoes, nEstacoes = trabalhadores.shape
+        estacoes = np.broadcast_to(np.arange(nEstacoes), trabalhadores.shape)
+        np.add.at(self.te, (trabalhadores.ravel(), estacoes.ravel()), np.repeat(quantidade, nEstacoes))
+
+        alocada = estacaoDaTarefa >= 0
+        tarefas = np.broadcast_to(np.arange(estacaoDaTarefa.shape[1]), estacaoDaTarefa.shape)
+        valores = np.broadcast_to(quantidade[:, None], estacaoDaTarefa.shape)
+        np.add.at(self.tarefas, (estacaoDaTarefa[alocada], tarefas[alocada]), valores[alocada])
+        self.limitar()
+
+    def reiniciarParcial(self, fracao=0.5):
+        """
+        Reinício suave: aproxima cada trilha de tau_max pela fração dada, em vez de apagar tudo.
+        As diferenças relativas entre as trilhas (o que a colônia aprendeu) são reduzidas, não perdidas.
+        """
+        self.te += fracao * (self.tauMax - self.te)
+        self.tarefas += fracao * (self.tauMax - self.tarefas)
+
+    def misturar(self, mediaTE, mediaTarefas, taxa):
+        self.te *= (1 - taxa)
+        self.te += taxa * np.asarray(mediaTE)
+        self.tarefas *= (1 - taxa)
+        self.tarefas += taxa * np.asarray(mediaTarefas)
+        self.limitar()
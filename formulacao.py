@@ -0,0 +1,402 @@
+import math
+
+import instancia
+
+BIG_M = 1000000 # Valor do 'Inf' do arquivo nos modelos (tempo de par tarefa-trabalhador incapaz)
+
+def ler_instancia_alwabp(caminho_arquivo):
+    """
+    Lê a instância pelo cache binário compartilhado com o ACO (instancia.py) e estrutura os dados.
+    Retorna: n (tarefas), k (trabalhadores), t (matriz tempos), G (matriz adjacência)
+    """
+    try:
+        with instancia.carregarInstancia(caminho_arquivo) as dados:
+            n, k = dados.n, dados.k
+            t = dados.matrizTempos(BIG_M) # Matriz de tempos (N x K); 'Inf' vira BIG_M no modelo
+
+            # Matriz de Adjacência (N x N) a partir da lista de sucessores em CSR
+            G = [[0 for _ in range(n)] for _ in range(n)]
+            for tarefa_i, filhos in enumerate(dados.sucessores()):
+                for tarefa_j in filhos:
+                    G[tarefa_i][tarefa_j] = 1
+
+        return n, k, t, G
+
+    except Exception as e:
+        print(f"Erro na leitura do arquivo {caminho_arquivo}: {e}")
+        return 0, 0, [], []
+
+def ler_alcance_alwabp(caminho_arquivo):
+    """
+    Fechamento transitivo (instancia.Alcance) já guardado no cache binário da instância, para a formulação apertada não refazer.
+    """
+    with instancia.carregarInstancia(caminho_arquivo) as dados:
+        return instancia.Alcance.deBitsets(dados.bitsets('descendentes'), dados.bitsets('ascendentes'))
+
+def fechamento(n, G):
+    """
+    Fechamento transitivo (instancia.Alcance) da matriz de adjacência, para quem não tem o do cache (ler_alcance_alwabp).
+    """
+    filhos = [[j for j in range(n) if G[i][j]] for i in range(n)]
+    pais = [sum(G[i][j] for i in range(n)) for j in range(n)]
+    return instancia.Alcance(filhos, instancia.ordenaTopologicamente(filhos, pais))
+
+class FormulacaoApertada:
+    """
+    Estrutura (independente de solver) da formulação apertada do ALWABP:
+    - x[i,s,w] só para pares tarefa-trabalhador viáveis e s dentro da janela [inicio[i], fim[i]] da tarefa;
+    - janelas pelo fechamento da precedência e por um limite superior C̄ do tempo de ciclo:
+      as estações até s(i) carregam i e todos os seus ascendentes, então s(i) >= ceil((min(i) + min(asc(i))) / C̄) - 1,
+      e do mesmo jeito para os descendentes no fim da linha;
+    - vínculo x[i,s,w] <= y[s,w] para cada x, como no modelo original, mais a capacidade carga(s, w) <= C̄ * y[s,w];
+    - precedência por atribuição acumulada: Z[i,s] = 1 se i está nas estações 0..s (Z[i,s] = Z[i,s-1] + soma_w x[i,s,w]);
+      para cada arco (i, j) da redução transitiva e cada s, Z[j,s] <= Z[i,s];
+    - quebra de simetria entre trabalhadores com a mesma coluna de tempos (o de menor índice fica na estação anterior);
+    - corte LB <= E_max <= C̄.
+    Um C̄ só é válido se existir solução com ciclo <= C̄ (ex.: solução viável do ACO).
+    alcance: fechamento da precedência (instancia.Alcance, ex.: ler_alcance_alwabp); sem ele sai de G.
+    """
+    def __init__(self, n, k, t, G, limite_superior=None, alcance=None):
+        self.n = n
+        self.k = k
+        self.t = t
+        self.capaz = [[t[i][w] < BIG_M and t[i][w] != math.inf for w in range(k)] for i in range(n)]
+        # Tarefa sem trabalhador capaz conta 0: a linha Tarefa_Unica dela fica vazia e o modelo já sai inviável
+        menores = [min((t[i][w] for w in range(k) if self.capaz[i][w]), default=0) for i in range(n)]
+        self.limiteInferior = max(math.ceil(sum(menores) / k), max(menores, default=0)) if n and k else 0
+        if limite_superior is None or limite_superior == math.inf:
+            # Sem C̄ do ACO: cada tarefa no seu trabalhador capaz mais lento (sempre alcançável se a instância for viável)
+            limite_superior = sum(max((t[i][w] for w in range(k) if self.capaz[i][w]), default=0) for i in range(n))
+        self.limiteSuperior = limite_superior
+
+        if alcance is None:
+            alcance = fechamento(n, G)
+        self.ascendentes, self.descendentes = alcance.ascendentes, alcance.descendentes
+        # Arcos da redução transitiva: (i, j) sai se j já descende de outro filho de i (a precedência continua garantida)
+        self.arcos = []
+        for i in range(n):
+            filhos = [j for j in range(n) if G[i][j]]
+            netos = 0
+            for j in filhos:
+                netos |= self.descendentes[j]
+            self.arcos.extend((i, j) for j in filhos if not (netos >> j) & 1)
+        self.inicio = [0] * n
+        self.fim = [k - 1] * n
+        if limite_superior > 0:
+            for i in range(n):
+                antes = menores[i] + sum(menores[a] for a in instancia.bitsLigados(self.ascendentes[i]))
+                depois = menores[i] + sum(menores[d] for d in instancia.bitsLigados(self.descendentes[i]))
+                self.inicio[i] = min(k - 1, max(0, math.ceil(antes / limite_superior) - 1))
+                self.fim[i] = max(self.inicio[i], min(k - 1, k - math.ceil(depois / limite_superior)))
+
+        self.indices = [(i, s, w) for i in range(n) for s in range(self.inicio[i], self.fim[i] + 1) for w in range(k) if self.capaz[i][w]]
+        self.porTarefa = [[] for _ in range(n)]
+        self.porEstacaoTrabalhador = {}
+        self.porTarefaEstacao = {}
+        for i, s, w in self.indices:
+            self.porTarefa[i].append((s, w))
+            self.porEstacaoTrabalhador.setdefault((s, w), []).append(i)
+            self.porTarefaEstacao.setdefault((i, s), []).append(w)
+
+        # Trabalhadores com colunas iguais: pares (w1, w2), w1 < w2, com estação(w1) <= estação(w2)
+        self.simetricos = []
+        for w2 in range(k):
+            for w1 in reversed(range(w2)): # O mais proximo: os iguais ficam encadeados w1 < w2 < w3 ...
+                if all(t[i][w1] == t[i][w2] for i in range(n)):
+                    self.simetricos.append((w1, w2))
+                    break
+
+    def acumuladas(self):
+        """
+        Índices (i, s) das variáveis Z: da janela de i, menos a última estação (onde Z vale 1).
+        """
+        for i in range(self.n):
+            for s in range(self.inicio[i], self.fim[i]):
+                yield i, s
+
+    def precedencias(self):
+        """
+        Linhas da precedência acumulada: (i, j, s) significa Z[j,s] <= Z[i,s].
+        Linhas triviais saem: j ainda não pode estar em 0..s, ou i já está com certeza em 0..s.
+        """
+        for i, j in self.arcos:
+            for s in range(self.inicio[j], self.fim[j]):
+                if s >= self.fim[i]:
+                    break
+                yield i, j, s
+
+    def tamanho(self):
+        """
+        Tamanho do modelo: (variáveis, restrições, não-zeros), contando igual ao Gurobi depois do update.
+        """
+        k = self.k
+        acumuladas = list(self.acumuladas())
+        variaveis = len(self.indices) + k * k + 1 + len(acumuladas)
+        restricoes = nz = 0
+        restricoes += self.n; nz += len(self.indices) # Cada tarefa uma vez
+        restricoes += 2 * k; nz += 2 * k * k # Um trabalhador por estação e uma estação por trabalhador
+        for s in range(k):
+            tarefas = sum(len(self.porEstacaoTrabalhador.get((s, w), [])) for w in range(k))
+            restricoes += 1; nz += tarefas + 1 # Carga da estação <= E_max
+        for chave, tarefas in self.porEstacaoTrabalhador.items():
+            restricoes += 1 + len(tarefas); nz += len(tarefas) + 1 + 2 * len(tarefas) # Capacidade e vínculos x <= y
+        for i, s in acumuladas: # Definição de Z
+            restricoes += 1; nz += len(self.porTarefaEstacao.get((i, s), [])) + (2 if s > self.inicio[i] else 1)
+        for _ in self.precedencias():
+            restricoes += 1; nz += 2
+        restricoes += len(self.simetricos); nz += 2 * (k - 1) * len(self.simetricos) # A estação 0 tem coeficiente zero
+        return variaveis, restricoes, nz
+
+def tamanho_formulacao_classica(n, k, G):
+    """
+    Tamanho do modelo de montar_classico: (variáveis, restrições, não-zeros).
+    """
+    arcos = sum(G[i][j] for i in range(n) for j in range(n))
+    variaveis = n * k * k + k * k + 1
+    restricoes = k + n + 2 * k + n * k * k + arcos
+    # Precedência com soma de índices: a estação 0 tem coeficiente zero e o Gurobi descarta
+    nz = k * (n * k + 1) + n * k * k + 2 * k * k + 2 * n * k * k + arcos * 2 * (k - 1) * k
+    return variaveis, restricoes, nz
+
+def mapear_solucao(trabalhadores, estacaoDaTarefa, t, G, formulacao=None):
+    """
+    Converte uma solução compacta (trabalhador de cada estação, estação de cada tarefa) nos valores das variáveis do modelo.
+    Com formulacao (FormulacaoApertada), trabalhadores de colunas iguais são trocados entre si para respeitar a
+    quebra de simetria, e o x precisa existir (par capaz, dentro da janela).
+    Retorna: (x, y, E_max, Z) com x {(i,s,w): 1}, y {(s,w): 1} e Z {(i,s): 0/1}, ou None se a solução for inviável
+    """
+    n, k = len(t), len(trabalhadores)
+    if sorted(trabalhadores) != list(range(k)) or len(estacaoDaTarefa) != n:
+        return None
+    trabalhadores = list(trabalhadores)
+    if formulacao is not None:
+        # Cada cadeia w1 < w2 < ... de iguais: os mesmos postos, com o menor índice na menor estação
+        classe = {w: w for w in range(k)}
+        for w1, w2 in formulacao.simetricos:
+            classe[w2] = classe[w1]
+        grupos = {}
+        for w in range(k):
+            grupos.setdefault(classe[w], []).append(w)
+        estacaoDe = {w: s for s, w in enumerate(trabalhadores)}
+        for grupo in grupos.values():
+            for w, s in zip(grupo, sorted(estacaoDe[w] for w in grupo)):
+                trabalhadores[s] = w
+
+    cargas = [0] * k
+    x = {}
+    for i in range(n):
+        s = estacaoDaTarefa[i]
+        if not 0 <= s < k:
+            return None
+        w = trabalhadores[s]
+        if t[i][w] >= BIG_M or t[i][w] == math.inf:
+            return None
+        cargas[s] += t[i][w]
+        x[i, s, w] = 1
+    for i in range(n):
+        for j in range(n):
+            if G[i][j] and estacaoDaTarefa[i] > estacaoDaTarefa[j]:
+                return None
+    y = {(s, w): 1 for s, w in enumerate(trabalhadores)}
+    E_max = max(cargas, default=0)
+
+    Z = {}
+    if formulacao is not None:
+        indices = set(formulacao.indices)
+        if E_max > formulacao.limiteSuperior or any(chave not in indices for chave in x):
+            return None
+        Z = {(i, s): 1 if estacaoDaTarefa[i] <= s else 0 for i, s in formulacao.acumuladas()}
+    return x, y, E_max, Z
+
+def mapear_formiga(formiga, t, G, formulacao=None):
+    """
+    mapear_solucao para uma Formiga do main.py.
+    """
+    trabalhadores, estacaoDaTarefa, _ = formiga.exportarVetores()
+    return mapear_solucao(trabalhadores, estacaoDaTarefa, t, G, formulacao)
+
+class ModeloMIP:
+    """
+    Modelo linear inteiro neutro, sem API de solver: colunas (nome, limites, tipo, custo), linhas esparsas e
+    minimização. Os backends de solver_mip.py (Gurobi, HiGHS, CBC) só traduzem esta estrutura.
+    Tipos e sentidos usam as mesmas letras do Gurobi: 'B', 'I', 'C' e '<', '=', '>'.
+    """
+    def __init__(self, nome):
+        self.nome = nome
+        self.nomes, self.lb, self.ub, self.tipos, self.custos = [], [], [], [], []
+        # Linhas em CSR: os termos da linha r ficam em colunas/coeficientes[inicioLinha[r]:inicioLinha[r + 1]]
+        self.inicioLinha = [0]
+        self.colunas, self.coeficientes = [], []
+        self.sentidos, self.rhs, self.nomesLinhas = [], [], []
+        self.x, self.y, self.E_max, self.Z = {}, {}, None, None
+        self.formulacao = None
+        self.limiteInferior = 0
+
+    def adicionarVariavel(self, nome, lb=0, ub=math.inf, tipo='C', custo=0):
+        self.nomes.append(nome)
+        self.lb.append(lb)
+        self.ub.append(ub)
+        self.tipos.append(tipo)
+        self.custos.append(custo)
+        return len(self.nomes) - 1
+
+    def adicionarVariaveis(self, prefixo, chaves, lb=0, ub=1, tipo='B'):
+        # Mesmo nome que o addVars do Gurobi daria: x[i,s,w]
+        return {chave: self.adicionarVariavel(f"{prefixo}[{','.join(map(str, chave))}]", lb, ub, tipo) for chave in chaves}
+
+    def adicionarRestricao(self, termos, sentido, rhs, nome):
+        # termos: (coluna, coeficiente); coeficiente zero sai da linha (o Gurobi também descarta)
+        for coluna, coeficiente in termos:
+            if coeficiente != 0:
+                self.colunas.append(coluna)
+                self.coeficientes.append(coeficiente)
+        self.inicioLinha.append(len(self.colunas))
+        self.sentidos.append(sentido)
+        self.rhs.append(rhs)
+        self.nomesLinhas.append(nome)
+
+    def linhas(self):
+        for r in range(len(self.sentidos)):
+            inicio, fim = self.inicioLinha[r], self.inicioLinha[r + 1]
+            yield self.colunas[inicio:fim], self.coeficientes[inicio:fim], self.sentidos[r], self.rhs[r], self.nomesLinhas[r]
+
+    def tamanho(self):
+        return len(self.nomes), len(self.sentidos), len(self.colunas)
+
+    def vetorInicial(self, valores):
+        """
+        MIP start completo (um valor por coluna) a partir de mapear_solucao: (x, y, E_max, Z).
+        """
+        x, y, E_max, Z = valores
+        inicio = [0] * len(self.nomes)
+        for chave, coluna in self.x.items():
+            inicio[coluna] = x.get(chave, 0)
+        for chave, coluna in self.y.items():
+            inicio[coluna] = y.get(chave, 0)
+        inicio[self.E_max] = E_max
+        for chave, coluna in (self.Z or {}).items():
+            inicio[coluna] = Z.get(chave, 0)
+        return inicio
+
+def montar_classico(n, k, t, G):
+    """
+    Modelo original: x[i,s,w] para toda tarefa, estação e trabalhador (incapaz entra com tempo BIG_M).
+    """
+    e = k # Número de estações = Número de trabalhadores
+    mip = ModeloMIP("ALWABP")
+
+    # --- Variáveis ---
+    # x[i,s,w] = 1 se Tarefa i na Estação s pelo Trab w; y[s,w] = 1 se Trab w alocado na Estação s
+    x = mip.adicionarVariaveis("x", [(N, E_idx, K) for N in range(n) for E_idx in range(e) for K in range(k)])
+    y = mip.adicionarVariaveis("y", [(E_idx, K) for E_idx in range(e) for K in range(k)])
+    E_max = mip.adicionarVariavel("E_max", lb=0, custo=1) # Tempo de Ciclo (Objetivo)
+
+    # --- Restrições ---
+
+    # 1. Definição do Tempo de Ciclo (Carga da Estação <= E_max)
+    for E_idx in range(e):
+        termos = [(x[N, E_idx, K], t[N][K]) for N in range(n) for K in range(k)]
+        mip.adicionarRestricao(termos + [(E_max, -1)], '<', 0, f"Carga_Estacao_{E_idx}")
+
+    # 2. Cada tarefa deve ser alocada uma única vez
+    for N in range(n):
+        mip.adicionarRestricao([(x[N, E_idx, K], 1) for E_idx in range(e) for K in range(k)], '=', 1, f"Tarefa_Unica_{N}")
+
+    # 3. Cada estação tem exatamente um trabalhador
+    for E_idx in range(e):
+        mip.adicionarRestricao([(y[E_idx, K], 1) for K in range(k)], '=', 1, f"Um_Trab_Estacao_{E_idx}")
+
+    # 4. Cada trabalhador em exatamente uma estação
+    for K in range(k):
+        mip.adicionarRestricao([(y[E_idx, K], 1) for E_idx in range(e)], '=', 1, f"Trab_{K}_Uma_Estacao")
+
+    # 5. Vínculo: Se tarefa N é feita na estação E pelo trab K, então Y[E,K] deve ser 1
+    for N in range(n):
+        for E_idx in range(e):
+            for K in range(k):
+                mip.adicionarRestricao([(x[N, E_idx, K], 1), (y[E_idx, K], -1)], '<', 0, f"Link_X_Y_{N}_{E_idx}_{K}")
+
+    # 6. Precedência: se G[i][j]=1 (i precede j), então Estação(i) <= Estação(j)
+    for i in range(n):
+        for j in range(n):
+            if G[i][j] == 1:
+                termos = [(x[i, E_idx, K], E_idx) for E_idx in range(e) for K in range(k)]
+                termos += [(x[j, E_idx, K], -E_idx) for E_idx in range(e) for K in range(k)]
+                mip.adicionarRestricao(termos, '<', 0, f"Prec_{i}_{j}")
+
+    mip.x, mip.y, mip.E_max = x, y, E_max
+    menores = [min((t[i][w] for w in range(k) if t[i][w] < BIG_M), default=0) for i in range(n)]
+    mip.limiteInferior = max(math.ceil(sum(menores) / k), max(menores, default=0)) if n and k else 0 # Só para o gap dos backends sem bound
+    return mip
+
+def montar_apertado(n, k, t, G, limite_superior=None, alcance=None):
+    """
+    Formulação apertada (ver FormulacaoApertada): sem pares incapazes, x só dentro da janela de estações de cada
+    tarefa, vínculos x <= y com capacidade por (s, w), precedência por atribuição acumulada, quebra de simetria e
+    LB <= E_max <= limite_superior.
+    """
+    f = FormulacaoApertada(n, k, t, G, limite_superior, alcance)
+    mip = ModeloMIP("ALWABP_Apertado")
+
+    # --- Variáveis ---
+    x = mip.adicionarVariaveis("x", f.indices)
+    y = mip.adicionarVariaveis("y", [(s, w) for s in range(k) for w in range(k)])
+    E_max = mip.adicionarVariavel("E_max", lb=f.limiteInferior, ub=f.limiteSuperior, custo=1) # Corte LB e C̄
+
+    # --- Restrições ---
+    for i in range(n):
+        mip.adicionarRestricao([(x[i, s, w], 1) for s, w in f.porTarefa[i]], '=', 1, f"Tarefa_Unica_{i}")
+    for s in range(k):
+        mip.adicionarRestricao([(y[s, w], 1) for w in range(k)], '=', 1, f"Um_Trab_Estacao_{s}")
+    for w in range(k):
+        mip.adicionarRestricao([(y[s, w], 1) for s in range(k)], '=', 1, f"Trab_{w}_Uma_Estacao")
+
+    for s in range(k):
+        termos = [(x[i, s, w], t[i][w]) for w in range(k) for i in f.porEstacaoTrabalhador.get((s, w), [])]
+        mip.adicionarRestricao(termos + [(E_max, -1)], '<', 0, f"Carga_Estacao_{s}")
+
+    # Vínculo por tarefa (x <= y, como no modelo original: a versão agregada por (s, w) deixa a relaxação mais fraca)
+    # e a capacidade de cada (s, w) pelo C̄
+    for (s, w), tarefas in f.porEstacaoTrabalhador.items():
+        mip.adicionarRestricao([(x[i, s, w], t[i][w]) for i in tarefas] + [(y[s, w], -f.limiteSuperior)], '<', 0, f"Cap_{s}_{w}")
+        for i in tarefas:
+            mip.adicionarRestricao([(x[i, s, w], 1), (y[s, w], -1)], '<', 0, f"Link_X_Y_{i}_{s}_{w}")
+
+    # Precedência acumulada: Z[i,s] = 1 se a tarefa i está nas estações 0..s; j só está em 0..s se i também estiver
+    Z = mip.adicionarVariaveis("Z", list(f.acumuladas()), lb=0, ub=1, tipo='C')
+    for i, s in Z:
+        termos = [(Z[i, s], 1)] + [(x[i, s, w], -1) for w in f.porTarefaEstacao.get((i, s), [])]
+        if s > f.inicio[i]:
+            termos.append((Z[i, s - 1], -1))
+        mip.adicionarRestricao(termos, '=', 0, f"Acum_{i}_{s}")
+    for i, j, s in f.precedencias():
+        mip.adicionarRestricao([(Z[j, s], 1), (Z[i, s], -1)], '<', 0, f"Prec_{i}_{j}_{s}")
+
+    for w1, w2 in f.simetricos:
+        mip.adicionarRestricao([(y[s, w1], s) for s in range(k)] + [(y[s, w2], -s) for s in range(k)], '<', 0, f"Sim_{w1}_{w2}")
+
+    mip.x, mip.y, mip.E_max, mip.Z, mip.formulacao = x, y, E_max, Z, f
+    mip.limiteInferior = f.limiteInferior
+    return mip
+
+def montar_modelo(n, k, t, G, formulacao='classica', limite_superior=None, solucao_inicial=None, alcance=None):
+    """
+    Monta o ModeloMIP da formulação pedida ('classica' ou 'apertada'; alcance só é usado pela apertada).
+    solucao_inicial: (trabalhador de cada estação, estação de cada tarefa); se for viável vira MIP start e,
+    na formulação apertada, também o limite superior.
+    Retorna: (mip, inicio), com inicio = vetor do MIP start ou None
+    """
+    valores = None
+    if solucao_inicial is not None:
+        valores = mapear_solucao(*solucao_inicial, t, G)
+        if valores is None:
+            print("[Aviso: solução inicial inviável, ignorada]")
+        elif formulacao == 'apertada':
+            limite_superior = valores[2] if limite_superior is None else min(limite_superior, valores[2])
+    if formulacao == 'apertada':
+        mip = montar_apertado(n, k, t, G, limite_superior, alcance)
+        if valores is not None:
+            valores = mapear_solucao(*solucao_inicial, t, G, mip.formulacao)
+    else:
+        mip = montar_classico(n, k, t, G)
+    return mip, (mip.vetorInicial(valores) if valores is not None else None)
@@ -0,0 +1,119 @@
+import os
+import sys
+import random
+
+from instancia import INCAPAZ, Alcance
+
+# Gerador de instâncias sintéticas do ALWABP no formato de texto das instâncias (n, n linhas de tempos com 'Inf',
+# pares de precedência terminados por '-1 -1'), para testar tamanhos que as classes do relatório não cobrem.
+# Toda instância gerada tem solução: as tarefas, em ordem topológica, são divididas em k blocos consecutivos e
+# o trabalhador sorteado para cada bloco é capaz de todas as tarefas dele.
+
+def gerar_instancia(n_tarefas, n_trabalhadores, densidade_incapacidade=0.2, order_strength=0.1, variabilidade=1.0, tempo_maximo=100, semente=0):
+    """
+    densidade_incapacidade: fração dos pares tarefa x trabalhador com 'Inf' (fora os garantidos da solução viável).
+    order_strength: OS alvo do grafo de precedência; arcos entram até o fechamento transitivo alcançar o alvo.
+    variabilidade: o tempo de cada trabalhador é sorteado em [1, (1 + variabilidade) * tempo base da tarefa].
+    Retorna: n, k, tempos (lista plana N x K com INCAPAZ no lugar de 'Inf'), arestas [(pai, filho)] indexadas em 0 e o OS obtido
+    (mesmo formato de instancia.lerTexto)
+    """
+    if n_tarefas < 1 or n_trabalhadores < 1:
+        raise ValueError(f"Instancia precisa de ao menos uma tarefa e um trabalhador: {n_tarefas} tarefas, {n_trabalhadores} trabalhadores")
+    gerador = random.Random(semente)
+    n, k = n_tarefas, n_trabalhadores
+    arestas, os_obtido = gerar_precedencias(n, order_strength, gerador)
+
+    # Solução viável garantida: bloco s das tarefas (a ordem 0..n-1 já é topológica) fica com o trabalhador garantido[s]
+    garantido = list(range(k))
+    gerador.shuffle(garantido)
+    tamanho_bloco, resto = divmod(n, k)
+    trabalhador_do_bloco = []
+    for s in range(k):
+        trabalhador_do_bloco.extend([garantido[s]] * (tamanho_bloco + (1 if s < resto else 0)))
+
+    tempos = []
+    for i in range(n):
+        base = gerador.randint(1, tempo_maximo)
+        for j in range(k):
+            if j != trabalhador_do_bloco[i] and gerador.random() < densidade_incapacidade:
+                tempos.append(INCAPAZ)
+            else:
+                tempos.append(gerador.randint(1, max(1, round((1 + variabilidade) * base))))
+    return n, k, tempos, arestas, os_obtido
+
+def gerar_precedencias(n, order_strength, gerador):
+    """
+    Arcos i -> j com i < j (a numeração já é uma ordem topológica), quase sempre entre tarefas próximas, como numa linha real.
+    O fechamento transitivo é mantido num instancia.Alcance (Alcance.adicionarArco), então cada arco novo soma exatamente as relações que cria;
+    arco já implicado pelo fechamento é descartado. Para no primeiro arco que leva o OS ao alvo.
+    Retorna: (arestas ordenadas, OS obtido)
+    """
+    if n < 2: # Sem par de tarefas não há arco possível (e randrange(n - 1) falharia)
+        return [], 0.0
+    maximo = n * (n - 1) // 2
+    alvo = order_strength * maximo
+    alcance = Alcance.deBitsets([0] * n, [0] * n) # Sem arcos
+    relacoes = 0
+    arestas = []
+    tentativas = 0
+    while relacoes < alvo and tentativas < 50 * n + 1000:
+        tentativas += 1
+        pai = gerador.randrange(n - 1)
+        filho = min(n - 1, pai + 1 + int(gerador.expovariate(1 / max(1.0, 0.02 * n)))) # Distância curta, cauda longa
+        if alcance.precede(pai, filho):
+            continue
+        tentativas = 0
+        arestas.append((pai, filho))
+        relacoes += alcance.adicionarArco(pai, filho)
+    arestas.sort()
+    return arestas, (relacoes / maximo if maximo else 0.0)
+
+def gravar_instancia(caminho_arquivo, n, k, tempos, arestas):
+    # Mesmo formato lido por instancia.lerTexto (tarefas e trabalhadores numerados a partir de 1 nos pares)
+    pasta = os.path.dirname(caminho_arquivo)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    with open(caminho_arquivo, 'w', encoding='utf-8') as arquivo:
+        arquivo.write(f"{n}\n")
+        for i in range(n):
+            arquivo.write(' '.join('Inf' if tempo == INCAPAZ else str(tempo) for tempo in tempos[i * k:(i + 1) * k]) + '\n')
+        for pai, filho in arestas:
+            arquivo.write(f"{pai + 1} {filho + 1}\n")
+        arquivo.write("-1 -1\n")
+
+def nome_da_instancia(n_tarefas, n_trabalhadores, densidade_incapacidade, order_strength, semente):
+    return f"{n_tarefas}_{n_trabalhadores}_inf{round(100 * densidade_incapacidade)}_os{round(100 * order_strength)}_s{semente}"
+
+def gerar_arquivo(pasta, n_tarefas, n_trabalhadores, densidade_incapacidade=0.2, order_strength=0.1, variabilidade=1.0, tempo_maximo=100, semente=0):
+    """
+    Gera e grava em <pasta>/<nome_da_instancia>; se o arquivo já existe (mesmos parâmetros e semente) só devolve o caminho.
+    Retorna: (caminho, OS obtido ou None se o arquivo já existia)
+    """
+    caminho = os.path.join(pasta, nome_da_instancia(n_tarefas, n_trabalhadores, densidade_incapacidade, order_strength, semente))
+    if os.path.exists(caminho):
+        return caminho, None
+    n, k, tempos, arestas, os_obtido = gerar_instancia(n_tarefas, n_trabalhadores, densidade_incapacidade, order_strength, variabilidade, tempo_maximo, semente)
+    gravar_instancia(caminho, n, k, tempos, arestas)
+    return caminho, os_obtido
+
+if __name__ == "__main__":
+    # python gerador.py --tarefas=2000 --trabalhadores=40 --densidade=0.2 --os=0.5 --semente=0 --pasta=instancias_sinteticas
+    opcoes = {'n_tarefas': 1000, 'n_trabalhadores': 20}
+    pasta = 'instancias_sinteticas'
+    for argumento in sys.argv[1:]:
+        if argumento.startswith('--tarefas='):
+            opcoes['n_tarefas'] = int(argumento.split('=', 1)[1])
+        if argumento.startswith('--trabalhadores='):
+            opcoes['n_trabalhadores'] = int(argumento.split('=', 1)[1])
+        if argumento.startswith('--densidade='):
+            opcoes['densidade_incapacidade'] = float(argumento.split('=', 1)[1])
+        if argumento.startswith('--os='):
+            opcoes['order_strength'] = float(argumento.split('=', 1)[1])
+        if argumento.startswith('--variabilidade='):
+            opcoes['variabilidade'] = float(argumento.split('=', 1)[1])
+        if argumento.startswith('--semente='):
+            opcoes['semente'] = int(argumento.split('=', 1)[1])
+        if argumento.startswith('--pasta='):
+            pasta = argumento.split('=', 1)[1]
+    caminho, os_obtido = gerar_arquivo(pasta, **opcoes)
+    print(f"Instância em '{caminho}'" + (f" (OS obtido {os_obtido:.3f})" if os_obtido is not None else " (já existia)"))
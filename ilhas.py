@@ -0,0 +1,146 @@
+import math
+import time
+import random
+import multiprocessing
+
+import main
+
+# Uma configuração por ilha: (alpha_trab, beta_trab, alpha_tar, beta_tar)
+CONFIGURACOES_PADRAO = [
+    (1.0, 3.0, 1.0, 2.0),
+    (0.5, 3.0, 1.0, 2.0),
+    (0.0, 2.5, 1.0, 2.0),
+    (1.0, 2.0, 1.0, 3.0),
+]
+
+def processoIlha(conexao, descritor, configuracao, numeroFormigas, modo, feromonio, semente, prazo):
+    """
+    Processo de uma ilha: mantém uma ColoniaACO viva e roda uma época a cada mensagem recebida.
+    A instância vem do segmento compartilhado publicado pelo ACO_Ilhas (descritor de main.publicarInstancia).
+    Mensagem: (nIteracoes, migrante, feromonioMedio, taxaMistura) ou None para encerrar.
+    Resposta: (solucaoInicial, melhorGlobal, melhorSolucaoCompacta, feromonios ou None)
+    """
+    dados, dadosVetorizados = main.anexarInstancia(descritor)
+    lowerBound = dados.lowerBound
+    colonia = main.ColoniaACO(*dados[:9], *configuracao, numeroFormigas=numeroFormigas, modo=modo, feromonio=feromonio, semente=semente,
+                              cacheHeuristico=dados.cacheHeuristico, dadosVetorizados=dadosVetorizados)
+    colonia.prazo = prazo # A construção também para no meio da colônia quando o tempo acaba
+    try:
+        while True:
+            mensagem = conexao.recv()
+            if mensagem is None:
+                break
+            nIteracoes, migrante, feromonioMedio, taxaMistura = mensagem
+
+            if migrante is not None:
+                colonia.receberSolucao(*migrante)
+            if feromonioMedio is not None:
+                colonia.misturarFeromonio(*feromonioMedio, taxaMistura)
+
+            for _ in range(nIteracoes):
+                if colonia.melhorGlobal <= lowerBound or time.time() > prazo:
+                    break
+                colonia.iterar()
+
+            melhor = colonia.melhorFormigaGlobal.exportarVetores() if colonia.melhorFormigaGlobal is not None else None
+            feromonios = (colonia.feromoniosTE, colonia.feromoniosTarefas) if taxaMistura > 0 else None # Listas ou arrays, conforme o feromonio da colonia
+            conexao.send((colonia.solucaoInicial, colonia.melhorGlobal, melhor, feromonios))
+    finally:
+        colonia.fechar()
+        conexao.close()
+
+def mediaMatrizes(matrizes):
+    n = len(matrizes)
+    return [[sum(valores) / n for valores in zip(*linhas)] for linhas in zip(*(m.tolist() if hasattr(m, 'tolist') else m for m in matrizes))]
+
+def ACO_Ilhas(tempoTarefaTrabalhador, grafo, precedencia, lowerBound, C_alvo, tempoMedioDeCadaTrabalhador, tarefasFatiadas, grafoR, orderStrenght,
+              configuracoes=None, numeroFormigas=100, intervaloMigracao=10, taxaMistura=0.0, tempoLimite=300,
+              nEpocasSemMelhoria=None, modo='sequencial', feromonio='classico', cacheHeuristico=None, semente=None):
+    """
+    Modelo de ilhas: uma ColoniaACO por processo, cada uma com seus alpha/beta (configuracoes).
+    A cada intervaloMigracao iterações as ilhas recebem a melhor solução global e, se taxaMistura > 0,
+    aproximam seu feromônio da média das ilhas. Para quando o melhor global atinge o lowerBound,
+    quando o tempoLimite (compartilhado) acaba ou após nEpocasSemMelhoria épocas sem melhora.
+    Retorna: (solucaoInicial, melhorGlobal), como o ACO.
+    """
+    if configuracoes is None:
+        configuracoes = CONFIGURACOES_PADRAO
+    if cacheHeuristico is None:
+        cacheHeuristico = main.CacheHeuristico(tempoTarefaTrabalhador, tempoMedioDeCadaTrabalhador, tarefasFatiadas, orderStrenght)
+
+    prazo = time.time() + tempoLimite
+    dados = (tempoTarefaTrabalhador, grafo, precedencia, lowerBound, C_alvo, tempoMedioDeCadaTrabalhador, tarefasFatiadas, grafoR, orderStrenght)
+    # Uma cópia da instância para todas as ilhas (no modo vetorizado, com os arrays da construção em lote já montados)
+    segmento = main.publicarInstancia(dados, main.DadosVetorizados(cacheHeuristico, grafo, precedencia) if modo == 'vetorizado' else None)
+    sorteador = random.Random(semente)
+
+    conexoes = []
+    processos = []
+    try:
+        for configuracao in configuracoes:
+            ladoPai, ladoFilho = multiprocessing.Pipe()
+            processo = multiprocessing.Process(
+                target=processoIlha,
+                args=(ladoFilho, segmento.descritor, configuracao,
+                      numeroFormigas, modo, feromonio, sorteador.getrandbits(32), prazo),
+                daemon=True)
+            processo.start()
+            ladoFilho.close()
+            conexoes.append(ladoPai)
+            processos.append(processo)
+
+        solucaoInicial = math.inf
+        melhorGlobal = math.inf
+        melhorSolucao = None
+        feromonioMedio = None
+        epocasSemMelhoria = 0
+        nEpocas = 0
+        while True:
+            for conexao in conexoes:
+                conexao.send((intervaloMigracao, melhorSolucao, feromonioMedio, taxaMistura))
+            respostas = [conexao.recv() for conexao in conexoes]
+
+            melhorou = False
+            for inicialIlha, melhorIlha, solucaoIlha, _ in respostas:
+                if nEpocas == 0:
+                    solucaoInicial = min(solucaoInicial, inicialIlha)
+                if melhorIlha < melhorGlobal:
+                    melhorGlobal = melhorIlha
+                    melhorSolucao = solucaoIlha
+                    melhorou = True
+            if taxaMistura > 0:
+                feromonioMedio = (mediaMatrizes([r[3][0] for r in respostas]), mediaMatrizes([r[3][1] for r in respostas]))
+            nEpocas += 1
+            epocasSemMelhoria = 0 if melhorou else epocasSemMelhoria + 1
+
+            if melhorGlobal <= lowerBound:
+                break
+            if time.time() > prazo:
+                print("Limite de tempo atigindo")
+                break
+            if nEpocasSemMelhoria is not None and epocasSemMelhoria >= nEpocasSemMelhoria:
+                break
+    finally:
+        for conexao in conexoes:
+            try:
+                conexao.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for processo in processos:
+            processo.join(timeout=5)
+            if processo.is_alive():
+                processo.terminate()
+        segmento.liberar()
+
+    return solucaoInicial, melhorGlobal
+
+if __name__ == "__main__":
+    nome_do_arquivo = 'instancias/wee/51_wee'
+    dados = main.ler_e_converter_dados(nome_do_arquivo)
+
+    if dados:
+        tempoTarefaTrabalhador, grafo, precedencia, lowerBound, tempoMedio, tempoMedioDeCadaTrabalhador, tarefasFatiadas, grafoR, orderStrenght, cacheHeuristico = dados
+        print(f"Iniciando ACO em ilhas... LB={lowerBound}")
+        res = ACO_Ilhas(tempoTarefaTrabalhador, grafo, precedencia, lowerBound, tempoMedio, tempoMedioDeCadaTrabalhador, tarefasFatiadas, grafoR, orderStrenght,
+                        taxaMistura=0.2, tempoLimite=60, cacheHeuristico=cacheHeuristico)
+        print(f"Resultado Final: {res}")
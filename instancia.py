@@ -0,0 +1,293 @@
+import os
+import math
+import mmap
+import struct
+import hashlib
+import tempfile
+
+# Cache binario das instancias do ALWABP, compartilhado pelo ACO (main.py) e pelo Gurobi (solver_gurobi.py).
+# O texto e lido uma unica vez; o resultado (tempos, precedencias em CSR e dados derivados) vai para
+# <pasta de cache>/<sha1 do arquivo>.bin e as proximas cargas so mapeiam esse arquivo na memoria.
+# Aqui tambem ficam a ordem topologica e o fechamento transitivo (Alcance) usados pelo ACO, pelos modelos exatos e pelo gerador.
+
+VERSAO_CACHE = 2 # 2: tempoMedioTrab com uma entrada por trabalhador (inf para quem não sabe fazer nenhuma tarefa)
+MAGICO = b'ALWABPC\0'
+INCAPAZ = -1 # Tempo 'Inf' no arquivo binario
+CABECALHO = struct.Struct('<8sIiiiiidd') # magico, versao, n, k, arestas, lowerBound, trabalhadores com tempo medio, tempoMedio, orderStrength
+PASTA_CACHE_PADRAO = os.environ.get('ALWABP_CACHE', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache_instancias'))
+
+def _alinhar(posicao):
+    return (posicao + 7) & ~7
+
+def _layout(n, k, m, kMedio):
+    # Secoes na ordem em que sao gravadas: (nome, formato, quantidade)
+    bytesBitset = (n + 7) // 8
+    secoes = [('tempos', 'i', n * k),
+              ('sucPtr', 'i', n + 1), ('sucIdx', 'i', m),
+              ('predPtr', 'i', n + 1), ('predIdx', 'i', m),
+              ('ordem', 'i', n),
+              ('tempoMedioTrab', 'd', kMedio),
+              ('descendentes', 'B', n * bytesBitset),
+              ('ascendentes', 'B', n * bytesBitset)]
+    posicao = _alinhar(CABECALHO.size)
+    layout = {}
+    for nome, formato, quantidade in secoes:
+        layout[nome] = (posicao, formato, quantidade)
+        posicao = _alinhar(posicao + quantidade * struct.calcsize(formato))
+    return layout, posicao
+
+def _csr(n, arestas, origem, destino):
+    # Contagem estavel: a ordem do arquivo e mantida dentro de cada lista
+    ptr = [0] * (n + 1)
+    for aresta in arestas:
+        ptr[aresta[origem] + 1] += 1
+    for i in range(n):
+        ptr[i + 1] += ptr[i]
+    proximo = ptr[:-1]
+    idx = [0] * len(arestas)
+    for aresta in arestas:
+        i = aresta[origem]
+        idx[proximo[i]] = aresta[destino]
+        proximo[i] += 1
+    return ptr, idx
+
+def ordenaTopologicamente(grafo, precedencia):
+    # Varre as tarefas por indice tirando as que ficaram sem pai, ate acabar. A ordem define as fatias do ACO (tarefasFatiadas).
+    # grafo: Tarefa -> filhos; precedencia: numero de pais de cada tarefa (não e alterada)
+    precedencia = list(precedencia)
+    contador = len(grafo)
+    lista = []
+    while contador > 0:
+        antes = contador
+        for i in range(len(grafo)):
+            if precedencia[i] == 0:
+                lista.append(i)
+                contador -= 1
+                precedencia[i] = -1
+                for j in grafo[i]:
+                    precedencia[j] -= 1
+        if contador == antes:
+            raise ValueError("Grafo de precedencia com ciclo")
+    return lista
+
+def bitsLigados(valor):
+    # Indices dos bits ligados de um inteiro (tarefas de uma linha do Alcance), do menor para o maior
+    while valor:
+        menor = valor & -valor
+        valor ^= menor
+        yield menor.bit_length() - 1
+
+class Alcance:
+    #Fechamento transitivo do grafo de precedencia em bitsets (um int do Python por tarefa): o bit j de descendentes[i] indica que i precede j, direta ou indiretamente
+    def __init__(self, grafo, ordemTopologica):
+        self.descendentes = [0] * len(grafo)
+        self.ascendentes = [0] * len(grafo)
+        for i in reversed(ordemTopologica): #Filhos ja estão prontos quando o pai e visitado
+            bits = 0
+            for filho in grafo[i]:
+                bits |= self.descendentes[filho] | (1 << filho)
+            self.descendentes[i] = bits
+        for i in ordemTopologica: #Mesma ideia no sentido contrario, pais antes dos filhos
+            for filho in grafo[i]:
+                self.ascendentes[filho] |= self.ascendentes[i] | (1 << i)
+
+    @classmethod
+    def deBitsets(cls, descendentes, ascendentes):
+        #Fechamento ja calculado (cache binario da instancia)
+        alcance = cls.__new__(cls)
+        alcance.descendentes = descendentes
+        alcance.ascendentes = ascendentes
+        return alcance
+
+    def precede(self, i, j):
+        return (self.descendentes[i] >> j) & 1 == 1
+
+    def numeroDescendentes(self, i):
+        return bin(self.descendentes[i]).count('1')
+
+    def numeroAscendentes(self, i):
+        return bin(self.ascendentes[i]).count('1')
+
+    def totalRelacoes(self):
+        return sum(bin(bits).count('1') for bits in self.descendentes)
+
+    def adicionarArco(self, pai, filho):
+        #Atualiza o fechamento com o arco pai -> filho sem refazer tudo. Devolve quantas relações novas o arco criou
+        descendentes, ascendentes = self.descendentes, self.ascendentes
+        novos = descendentes[filho] | (1 << filho)
+        relacoes = 0
+        for a in list(bitsLigados(ascendentes[pai])) + [pai]:
+            antes = descendentes[a]
+            if (antes >> filho) & 1: #Pelo fechamento, quem ja alcança o filho ja alcança os descendentes dele
+                continue
+            descendentes[a] |= novos
+            relacoes += bin(descendentes[a]).count('1') - bin(antes).count('1')
+        acima = ascendentes[pai] | (1 << pai)
+        for d in bitsLigados(novos):
+            if not (ascendentes[d] >> pai) & 1: #Idem no sentido contrario
+                ascendentes[d] |= acima
+        return relacoes
+
+def lerTexto(caminho_arquivo):
+    """
+    Lê o arquivo de texto no formato das instâncias (n, n linhas de tempos com 'Inf', pares de precedência até '-1 -1').
+    Retorna: n, k, tempos (lista plana N x K com INCAPAZ no lugar de 'Inf'), arestas [(pai, filho)] indexadas em 0
+    """
+    with open(caminho_arquivo, 'r', encoding='utf-8') as arquivo:
+        conteudo = [x.strip('\n') for x in arquivo.readlines()]
+    n = int(conteudo[0])
+    k = len(conteudo[1].split())
+    tempos = []
+    for i in range(n):
+        tempos.extend(INCAPAZ if valor == 'Inf' else int(valor) for valor in conteudo[i + 1].split())
+    arestas = []
+    indice = n + 1
+    while indice < len(conteudo) and conteudo[indice].strip() != '-1 -1':
+        partes = conteudo[indice].split()
+        if len(partes) >= 2:
+            arestas.append((int(partes[0]) - 1, int(partes[1]) - 1))
+        indice += 1
+    return n, k, tempos, arestas
+
+def derivar(n, k, tempos, arestas):
+    """
+    Calcula os dados derivados que o ACO usa: lower bound, tempos medios, ordem topologica,
+    fechamento transitivo (bitsets) e order strength.
+    """
+    tempoMedioDeCadaTrabalhador = [0] * k
+    tarefasValidasDoTrab = [0] * k
+    lowerBound = 0
+    tempoMedio = 0
+    for i in range(n):
+        menorDaLinha = math.inf
+        tempoMedioTarefa = 0
+        trabalhadorApto = 0
+        for j in range(k):
+            tempo = tempos[i * k + j]
+            if tempo == INCAPAZ:
+                continue
+            trabalhadorApto += 1
+            tarefasValidasDoTrab[j] += 1
+            if tempo < menorDaLinha:
+                menorDaLinha = tempo
+            tempoMedioTarefa += tempo
+            tempoMedioDeCadaTrabalhador[j] += tempo
+        lowerBound += menorDaLinha
+        tempoMedio += tempoMedioTarefa / trabalhadorApto
+    lowerBound = math.ceil(lowerBound / k)
+    # Uma entrada por trabalhador, alinhada com as colunas de tempos: quem não sabe fazer nenhuma tarefa fica com inf (heuristica global 0)
+    tempoMedioDeCadaTrabalhador = [tempoMedioDeCadaTrabalhador[j] / tarefasValidasDoTrab[j] if tarefasValidasDoTrab[j] > 0 else math.inf for j in range(k)]
+
+    grafo = [[] for _ in range(n)]
+    precedencia = [0] * n
+    for pai, filho in arestas:
+        grafo[pai].append(filho)
+        precedencia[filho] += 1
+    ordem = ordenaTopologicamente(grafo, precedencia)
+    alcance = Alcance(grafo, ordem)
+    maxPossivel = (n * (n - 1)) / 2
+    orderStrength = alcance.totalRelacoes() / maxPossivel if maxPossivel else 0
+    return lowerBound, tempoMedio, tempoMedioDeCadaTrabalhador, ordem, alcance.descendentes, alcance.ascendentes, orderStrength
+
+def gravarCache(caminho_cache, n, k, tempos, arestas):
+    lowerBound, tempoMedio, tempoMedioTrab, ordem, descendentes, ascendentes, orderStrength = derivar(n, k, tempos, arestas)
+    sucPtr, sucIdx = _csr(n, arestas, 0, 1)
+    predPtr, predIdx = _csr(n, arestas, 1, 0)
+    bytesBitset = (n + 7) // 8
+    valores = {'tempos': tempos, 'sucPtr': sucPtr, 'sucIdx': sucIdx, 'predPtr': predPtr, 'predIdx': predIdx,
+               'ordem': ordem, 'tempoMedioTrab': tempoMedioTrab,
+               'descendentes': b''.join(bits.to_bytes(bytesBitset, 'little') for bits in descendentes),
+               'ascendentes': b''.join(bits.to_bytes(bytesBitset, 'little') for bits in ascendentes)}
+    layout, tamanho = _layout(n, k, len(arestas), len(tempoMedioTrab))
+    dados = bytearray(tamanho)
+    CABECALHO.pack_into(dados, 0, MAGICO, VERSAO_CACHE, n, k, len(arestas), lowerBound, len(tempoMedioTrab), tempoMedio, orderStrength)
+    for nome, (posicao, formato, quantidade) in layout.items():
+        if formato == 'B':
+            dados[posicao:posicao + quantidade] = valores[nome]
+        else:
+            struct.pack_into(f'<{quantidade}{formato}', dados, posicao, *valores[nome])
+    # Grava num temporario e troca de nome: processos paralelos nunca leem um cache pela metade
+    pasta = os.path.dirname(caminho_cache)
+    os.makedirs(pasta, exist_ok=True)
+    descritor, temporario = tempfile.mkstemp(dir=pasta, suffix='.tmp')
+    with os.fdopen(descritor, 'wb') as arquivo:
+        arquivo.write(dados)
+    os.replace(temporario, caminho_cache)
+
+class InstanciaBinaria:
+    """
+    Instância mapeada na memória a partir do cache binário.
+    Os vetores (tempos, sucPtr/sucIdx, predPtr/predIdx, ordem, tempoMedioTrab) são memoryviews sobre o arquivo, sem cópia.
+    """
+    def __init__(self, caminho_cache):
+        self.caminho = caminho_cache
+        with open(caminho_cache, 'rb') as arquivo:
+            self._mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        magico, versao, self.n, self.k, self.numeroArestas, self.lowerBound, kMedio, self.tempoMedio, self.orderStrength = CABECALHO.unpack_from(self._mapa, 0)
+        if magico != MAGICO or versao != VERSAO_CACHE:
+            self._mapa.close()
+            raise ValueError(f"Cache de instancia invalido ou de outra versao: {caminho_cache}")
+        self._visoes = []
+        visao = memoryview(self._mapa)
+        layout, _ = _layout(self.n, self.k, self.numeroArestas, kMedio)
+        for nome, (posicao, formato, quantidade) in layout.items():
+            secao = visao[posicao:posicao + quantidade * struct.calcsize(formato)].cast(formato)
+            self._visoes.append(secao)
+            setattr(self, nome, secao)
+        self._visoes.append(visao)
+
+    def matrizTempos(self, incapaz=math.inf):
+        # Matriz [Tarefa][Trabalhador]; 'Inf' vira o valor pedido (math.inf no ACO, BIG_M no Gurobi)
+        k = self.k
+        tempos = self.tempos.tolist()
+        return [[incapaz if tempo == INCAPAZ else tempo for tempo in tempos[i * k:(i + 1) * k]] for i in range(self.n)]
+
+    def sucessores(self):
+        ptr, idx = self.sucPtr.tolist(), self.sucIdx.tolist()
+        return [idx[ptr[i]:ptr[i + 1]] for i in range(self.n)]
+
+    def predecessores(self):
+        ptr, idx = self.predPtr.tolist(), self.predIdx.tolist()
+        return [idx[ptr[i]:ptr[i + 1]] for i in range(self.n)]
+
+    def bitsets(self, nome):
+        # Linhas do fechamento transitivo ('descendentes' ou 'ascendentes') como ints do Python
+        bytesBitset = (self.n + 7) // 8
+        dados = getattr(self, nome)
+        return [int.from_bytes(dados[i * bytesBitset:(i + 1) * bytesBitset], 'little') for i in range(self.n)]
+
+    def fechar(self):
+        for visao in self._visoes:
+            visao.release()
+        self._visoes = []
+        self._mapa.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+def hashDoArquivo(caminho_arquivo):
+    # Identidade da instancia pelo conteudo (renomear ou mover o arquivo nao muda a chave)
+    with open(caminho_arquivo, 'rb') as arquivo:
+        return hashlib.sha1(arquivo.read()).hexdigest()
+
+def caminhoDoCache(caminho_arquivo, pasta_cache=None):
+    return os.path.join(pasta_cache or PASTA_CACHE_PADRAO, f'{hashDoArquivo(caminho_arquivo)}.bin')
+
+def carregarInstancia(caminho_arquivo, pasta_cache=None):
+    """
+    Carrega a instância pelo cache binário, criando-o na primeira vez.
+    A chave é o hash do conteúdo do arquivo: instância editada gera um cache novo.
+    Levanta FileNotFoundError se o arquivo de texto não existir.
+    """
+    caminho_cache = caminhoDoCache(caminho_arquivo, pasta_cache)
+    if os.path.exists(caminho_cache):
+        try:
+            return InstanciaBinaria(caminho_cache)
+        except (ValueError, struct.error):
+            pass # Cache corrompido ou de outra versao: refaz abaixo
+    n, k, tempos, arestas = lerTexto(caminho_arquivo)
+    gravarCache(caminho_cache, n, k, tempos, arestas)
+    return InstanciaBinaria(caminho_cache)
@@ -1,68 +1,140 @@
+import sys
+import json
 import math
 import random
-import copy
+import bisect
+import heapq
 import time
+import cProfile
+import multiprocessing
+from array import array
+from collections import OrderedDict, namedtuple
 
-NUMERO_TAREFAS = 0
-NUMERO_TRABALHADORES_E_MAQUINAS = 0
+import instancia
+from instancia import Alcance,ordenaTopologicamente #Fechamento transitivo e ordem topologica, compartilhados com os modelos exatos
+from estatisticas import EstatisticasACO
+from compartilhado import SegmentoCompartilhado
 
-class Estacao:
-    def __init__(self,idEstacao):
-      self.idEstacao = idEstacao
-      self.trabalhadorId = None
-      self.tarefas = []
-      self.carga = 0
+try:
+    import numpy as np # Usado apenas no modo 'vetorizado' do ACO
+except ImportError:
+    np = None
 
-    def limpar(self):
-      self.trabalhadorId = None
-      self.tarefas = []
-      self.carga = 0
+class InstanciaACO(namedtuple('InstanciaACO',['tempoTarefaTrabalhador','grafo','precedencia','lowerBound','C_alvo','tempoMedioDeCadaTrabalhador',
+                                              'tarefasFatiadas','grafoR','orderStrenght','cacheHeuristico'])):
+    #Instancia devolvida por ler_e_converter_dados, na mesma ordem da tupla antiga (desempacotar continua igual).
+    #Nada do pipeline le estado do modulo: as dimensões saem da propria matriz de tempos, então varias instancias
+    #podem ser resolvidas ao mesmo tempo no mesmo processo (threads, asyncio) sem recarregar nada.
+    #Não e imutavel: o cacheHeuristico guarda as potencias eta**beta conforme são pedidas (mesmo valor para a mesma chave,
+    #então threads dividindo a instancia no maximo calculam a mesma potencia duas vezes) e o resto são listas comuns que
+    #ninguem altera depois da leitura
+    __slots__ = ()
+
+    @property
+    def numeroTarefas(self):
+        return len(self.tempoTarefaTrabalhador)
+
+    @property
+    def numeroTrabalhadores(self):
+        return len(self.tempoTarefaTrabalhador[0]) if self.tempoTarefaTrabalhador else 0
 
 class Formiga:
-    def __init__(self,id):
-      self.id = id
-      self.estacoes = [Estacao(i) for i in range(NUMERO_TRABALHADORES_E_MAQUINAS)]
-      self.tempoDeCiclo = math.inf
+    #Solução em vetores planos: estação de cada tarefa, trabalhador de cada estação e carga de cada estação.
+    #ordemDaTarefa guarda a ordem de inserção, que define a ordem das tarefas dentro de cada estação
+    __slots__ = ('id','estacaoDaTarefa','ordemDaTarefa','trabalhadores','cargas','tempoDeCiclo','proximaOrdem')
+
+    def __init__(self,id,numeroTarefas,numeroTrabalhadores):
+        self.id = id
+        self.estacaoDaTarefa = array('i',[-1])*numeroTarefas
+        self.ordemDaTarefa = array('q',[0])*numeroTarefas
+        self.trabalhadores = array('i',[-1])*numeroTrabalhadores
+        self.cargas = array('q',[0])*numeroTrabalhadores
+        self.tempoDeCiclo = math.inf
+        self.proximaOrdem = 0
     
     def resetar(self):
         self.tempoDeCiclo = float('inf')
-        for estacao in self.estacoes:
-            estacao.limpar()
+        self.estacaoDaTarefa[:] = array('i',[-1])*len(self.estacaoDaTarefa)
+        self.trabalhadores[:] = array('i',[-1])*len(self.trabalhadores)
+        self.cargas[:] = array('q',[0])*len(self.cargas)
+        self.proximaOrdem = 0
 
     def alocarTrabalhador(self,indiceEstacao,idTrabalhador):
-        self.estacoes[indiceEstacao].trabalhadorId = idTrabalhador
+        self.trabalhadores[indiceEstacao] = idTrabalhador
 
     def alocarTarefa(self,indiceEstacao,idTarefa,tempoExecucao):
-       self.estacoes[indiceEstacao].tarefas.append(idTarefa)
-       self.estacoes[indiceEstacao].carga += tempoExecucao
+        self.estacaoDaTarefa[idTarefa] = indiceEstacao
+        self.ordemDaTarefa[idTarefa] = self.proximaOrdem
+        self.proximaOrdem += 1
+        self.cargas[indiceEstacao] += tempoExecucao
 
     def calcularTempoDeCiclo(self):
         maior = 0
-        for e in self.estacoes:
-            if(e.carga > maior):
-                maior = e.carga
+        for carga in self.cargas:
+            if(carga > maior):
+                maior = carga
         self.tempoDeCiclo = maior
         return maior
-    
+
+    def tarefasDaEstacao(self,indiceEstacao):
+        #Tarefas da estação na ordem em que foram alocadas
+        estacaoDaTarefa = self.estacaoDaTarefa
+        return sorted([t for t in range(len(estacaoDaTarefa)) if estacaoDaTarefa[t] == indiceEstacao],key=self.ordemDaTarefa.__getitem__)
+
+    def copiarDe(self,outra):
+        #Snapshot barato: copia os vetores de outra formiga de mesmo tamanho, sem alocar nada
+        self.estacaoDaTarefa[:] = outra.estacaoDaTarefa
+        self.ordemDaTarefa[:] = outra.ordemDaTarefa
+        self.trabalhadores[:] = outra.trabalhadores
+        self.cargas[:] = outra.cargas
+        self.tempoDeCiclo = outra.tempoDeCiclo
+        self.proximaOrdem = outra.proximaOrdem
+
+    def copia(self):
+        nova = Formiga(self.id,len(self.estacaoDaTarefa),len(self.trabalhadores))
+        nova.copiarDe(self)
+        return nova
+
+    def bytesUsados(self):
+        #Memoria ocupada pela solução (objeto + vetores)
+        return sys.getsizeof(self) + sum(sys.getsizeof(v) for v in (self.estacaoDaTarefa,self.ordemDaTarefa,self.trabalhadores,self.cargas))
+
+    def exportarVetores(self):
+        #Forma compacta da solução: trabalhador de cada estação e estação de cada tarefa (-1 se não foi alocada)
+        return self.trabalhadores.tolist(),self.estacaoDaTarefa.tolist(),self.tempoDeCiclo
+
+    def carregarVetores(self,trabalhadores,estacaoDaTarefa,tempoDeCiclo,tempoPenalizado,ordemDaTarefa=None):
+        #Inverso de exportarVetores. tempoPenalizado e a matriz [Tarefa][Trabalhador] do CacheHeuristico.
+        #Sem ordemDaTarefa, as tarefas de cada estação ficam em ordem de id
+        self.resetar()
+        self.trabalhadores[:] = array('i',trabalhadores)
+        self.estacaoDaTarefa[:] = array('i',estacaoDaTarefa)
+        if ordemDaTarefa is not None:
+            self.ordemDaTarefa[:] = array('q',ordemDaTarefa)
+            self.proximaOrdem = max(ordemDaTarefa)+1 if len(ordemDaTarefa) > 0 else 0
+        else:
+            self.ordemDaTarefa[:] = array('q',range(len(estacaoDaTarefa)))
+            self.proximaOrdem = len(estacaoDaTarefa)
+        cargas = self.cargas
+        for idTarefa,indiceEstacao in enumerate(estacaoDaTarefa):
+            if indiceEstacao >= 0:
+                cargas[indiceEstacao] += tempoPenalizado[idTarefa][trabalhadores[indiceEstacao]]
+        self.tempoDeCiclo = tempoDeCiclo
+
     def removerTarefa(self, indiceEstacao, idTarefa, tempoExecucao):
-        self.estacoes[indiceEstacao].tarefas.remove(idTarefa)
-        self.estacoes[indiceEstacao].carga -= tempoExecucao
-
-        if self.estacoes[indiceEstacao].carga < 0.0001:  #Evita erros de ponto flutuante
-            self.estacoes[indiceEstacao].carga = 0
-
-def calcular_order_strength(matrizAdjacencia):
-    #Algoritmo de Floyd-Warshall (ou Fechamento Transitivo), descobre as conexões indiretas: Se A->B e B->C, então marca A->C
-    for k in range(NUMERO_TAREFAS):
-        for i in range(NUMERO_TAREFAS):
-            for j in range(NUMERO_TAREFAS):
-                if matrizAdjacencia[i][k] and matrizAdjacencia[k][j]:
-                    matrizAdjacencia[i][j] = 1
-                    
-    totalRelacoes = sum(sum(linha) for linha in matrizAdjacencia)
+        self.estacaoDaTarefa[idTarefa] = -1
+        self.cargas[indiceEstacao] -= tempoExecucao
+
+        if self.cargas[indiceEstacao] < 0.0001:  #Evita erros de ponto flutuante
+            self.cargas[indiceEstacao] = 0
+
+def calcular_order_strength(alcance):
+    #O fechamento transitivo (Se A->B e B->C, então A->C) ja vem pronto no Alcance, aqui so contamos as relações
+    totalRelacoes = alcance.totalRelacoes()
 
     #Calcula qual o numero maxino de relações dado pela formiga (n(n-1))/2
-    maxPossivel = (NUMERO_TAREFAS * (NUMERO_TAREFAS - 1)) / 2 
+    numeroTarefas = len(alcance.descendentes)
+    maxPossivel = (numeroTarefas * (numeroTarefas - 1)) / 2 
 
     if maxPossivel == 0: return 0 # Evita divisão por zero
     
@@ -77,25 +149,25 @@ def auditar_solucao(formiga, grafo, tempoTarefaTrabalhador, num_tarefas):
     mapa_tarefa_estacao = {}
 
     # 1. Verifica integridade das tarefas e trabalhadores
-    for estacao in formiga.estacoes:
-        trab_id = estacao.trabalhadorId
+    for idEstacao in range(len(formiga.trabalhadores)):
+        trab_id = formiga.trabalhadores[idEstacao]
         
-        if trab_id is None:
+        if trab_id < 0:
             # Estação vazia é permitida, mas vamos avisar
             continue
             
-        for t in estacao.tarefas:
+        for t in formiga.tarefasDaEstacao(idEstacao):
             # Checa duplicidade
             if t in tarefas_alocadas:
                 print(f"[ERRO] Tarefa {t} alocada mais de uma vez!")
                 erros += 1
             tarefas_alocadas.add(t)
-            mapa_tarefa_estacao[t] = estacao.idEstacao
+            mapa_tarefa_estacao[t] = idEstacao
             
             # Checa capacidade do trabalhador
             tempo = tempoTarefaTrabalhador[t][trab_id] # CUIDADO COM OS ÍNDICES [Tarefa][Trab]
             if tempo == math.inf:
-                print(f"[ERRO] Trab {trab_id} na Est {estacao.idEstacao} NÃO sabe fazer tarefa {t}!")
+                print(f"[ERRO] Trab {trab_id} na Est {idEstacao} NÃO sabe fazer tarefa {t}!")
                 erros += 1
 
     # 2. Verifica se todas as tarefas foram feitas
@@ -120,14 +192,14 @@ def auditar_solucao(formiga, grafo, tempoTarefaTrabalhador, num_tarefas):
 
     # 4. Recalcula o Tempo na Unha (Para ver se a soma está certa)
     cmax_calculado = 0
-    for estacao in formiga.estacoes:
-        trab_id = estacao.trabalhadorId
+    for idEstacao in range(len(formiga.trabalhadores)):
+        trab_id = formiga.trabalhadores[idEstacao]
         carga_real = 0
-        for t in estacao.tarefas:
+        for t in formiga.tarefasDaEstacao(idEstacao):
             carga_real += tempoTarefaTrabalhador[t][trab_id]
         
-        if abs(carga_real - estacao.carga) > 0.1:
-            print(f"[ERRO SOMA] Est {estacao.idEstacao}: Diz {estacao.carga}, mas soma real é {carga_real}")
+        if abs(carga_real - formiga.cargas[idEstacao]) > 0.1:
+            print(f"[ERRO SOMA] Est {idEstacao}: Diz {formiga.cargas[idEstacao]}, mas soma real é {carga_real}")
             erros += 1
         
         if carga_real > cmax_calculado:
@@ -138,95 +210,101 @@ def auditar_solucao(formiga, grafo, tempoTarefaTrabalhador, num_tarefas):
     else:
         print(f">> SOLUÇÃO INVÁLIDA! Encontrados {erros} erros.")
 
-def ordenaTopologicamente(grafo,precedencia):
-    contador = NUMERO_TAREFAS
-    lista = []
-    while(contador > 0):
-        for i in range(NUMERO_TAREFAS):
-            if precedencia[i] == 0:
-                lista.append(i)
-                contador -= 1
-                precedencia[i] = -1
-                for j in grafo[i]:
-                    precedencia[j] -= 1
-    return lista
+class CacheHeuristico:
+    #Heuristicas estaticas da instancia (não dependem do feromonio). Montado uma vez em ler_e_converter_dados
+    #alcance (fechamento transitivo da precedencia, do cache binario) e o que a VND usa (IndiceVND); None quando a instancia não veio do cache
+    def __init__(self,tempoTarefaTrabalhador,tempoMedioDeCadaTrabalhador,tarefasFatiadas,orderStrength,alcance=None):
+        self.alcance = alcance
+        #Tempo com a mesma penalidade da construção: trabalhador incapaz custa 10000
+        self.capaz = [[tempo != math.inf for tempo in linha] for linha in tempoTarefaTrabalhador] #Matriz [Tarefa][Trabalhador]
+        self.trabalhadoresCapazes = [[w for w in range(len(linha)) if linha[w]] for linha in self.capaz] #Tarefa -> trabalhadores que sabem fazer
+        self.tempoPenalizado = [[10000 if tempo == math.inf else tempo for tempo in linha] for linha in tempoTarefaTrabalhador] #Matriz [Tarefa][Trabalhador]
+        self.etaTarefa = [[1/tempo for tempo in linha] for linha in self.tempoPenalizado] #Matriz [Tarefa][Trabalhador]
+
+        self.numeroTrabalhadores = len(tempoTarefaTrabalhador[0])
+        self.etaTrabalhador = [] #Matriz [Estacao][Trabalhador], heuristica posicional + global ponderada pelo OS
+        for i in range(self.numeroTrabalhadores):
+            tempoMedio = tempoMedioT(tempoTarefaTrabalhador,tarefasFatiadas,i)
+            linha = []
+            for trabalhador in range(self.numeroTrabalhadores):
+                if tempoMedio[trabalhador] == 0:
+                    tempoMedio[trabalhador] = 0.0001
+                hPosicional = orderStrength*1/(tempoMedio[trabalhador])
+                hGlobal = (1-orderStrength)*(1/tempoMedioDeCadaTrabalhador[trabalhador])
+                linha.append(hPosicional+hGlobal)
+            self.etaTrabalhador.append(linha)
+
+        self.potencias = {} #eta**beta ja calculados, chave (nome, beta)
+
+    def etaTrabalhadorPotencia(self,beta):
+        chave = ('trabalhador',beta)
+        if chave not in self.potencias:
+            self.potencias[chave] = [[eta**beta for eta in linha] for linha in self.etaTrabalhador]
+        return self.potencias[chave]
+
+    def etaTarefaPotencia(self,beta):
+        #Devolve a matriz transposta [Trabalhador][Tarefa], que e como a construção consulta (uma estação = um trabalhador)
+        chave = ('tarefa',beta)
+        if chave not in self.potencias:
+            self.potencias[chave] = [[self.etaTarefa[t][w]**beta for t in range(len(self.etaTarefa))] for w in range(self.numeroTrabalhadores)]
+        return self.potencias[chave]
+
+class TabelaScores:
+    #Scores tau**alpha * eta**beta de uma iteração. Refeita apenas quando o feromonio muda
+    def __init__(self,cache,feromoniosTE,feromoniosTarefas,alpha_trab,beta_trab,alpha_tar,beta_tar):
+        if hasattr(feromoniosTE,'tolist'): #Feromonio em array (FeromonioMMAS): consulta em listas e mais rapida
+            feromoniosTE = feromoniosTE.tolist()
+            feromoniosTarefas = feromoniosTarefas.tolist()
+        etaTrab = cache.etaTrabalhadorPotencia(beta_trab)
+        self.scoresTrabalhador = [[(feromoniosTE[w][i]**alpha_trab)*etaTrab[i][w] for w in range(len(etaTrab[i]))] for i in range(len(etaTrab))] #Matriz [Estacao][Trabalhador]
+        self.tauTarefas = [[tau**alpha_tar for tau in linha] for linha in feromoniosTarefas] #Matriz [Estacao][Tarefa]
+        self.etaTarefas = cache.etaTarefaPotencia(beta_tar) #Matriz [Trabalhador][Tarefa]
+        self.tempoPenalizado = cache.tempoPenalizado
+        self.trabalhadoresCapazes = cache.trabalhadoresCapazes
 
 def ler_e_converter_dados(caminho_arquivo):
-    tempoTarefaTrabalhador = []
+    #Os dados vem do cache binario (instancia.py): o texto so e lido na primeira vez, as proximas cargas mapeiam o arquivo .bin
+    #Retorna uma InstanciaACO (ou None se o arquivo não existir)
     try:
-        #Copia todo o arquivo do TXT  para um grande array onde cada linha e um elemento
-        with open(caminho_arquivo, 'r', encoding='utf-8') as arquivo:
-            conteudo = arquivo.readlines()
-            conteudo = [x.strip('\n') for x in conteudo]
+        dados = instancia.carregarInstancia(caminho_arquivo)
     except FileNotFoundError:
         print(f"Erro: O arquivo '{caminho_arquivo}' não foi encontrado.")
         return None
-    global NUMERO_TAREFAS
-    global NUMERO_TRABALHADORES_E_MAQUINAS
-    NUMERO_TAREFAS = int(conteudo[0]) #A primeira linha do arquivo e o numero de tarefas
-    NUMERO_TRABALHADORES_E_MAQUINAS = len(conteudo[1].split()) #Ve quantos elementos tem na segunda linha do arquivo para definir o numero de maquinas e trabalhadores
-    elementosLinha = []
-    tempoMedioDeCadaTrabalhador = [0]*NUMERO_TRABALHADORES_E_MAQUINAS
-    tarefasValidasDoTrab = [0]*NUMERO_TRABALHADORES_E_MAQUINAS 
-    lowerBound = 0
-    tempoMedio = 0
-    #Cria a matriz do tempo de cada trabalhador em cada tarefa
-    for i in range(NUMERO_TAREFAS):
-        elementosLinha = conteudo[i+1].split() #Transforma a string: '1,2,3' em um array ['1','2','2']
-        menorDaLinha = math.inf
-        tempoMedioTarefa = 0
-        trabalhadorApto = 0
-        for j in range(len(elementosLinha)): #Transforma todos os elementos de uma linha em inteiros, que sao os tempos de cada trabalhador em cada tarefa
-            if elementosLinha[j] == 'Inf':
-                elementosLinha[j] = math.inf
-            else:
-                trabalhadorApto += 1
-                tarefasValidasDoTrab[j] += 1
-                elementosLinha[j] = int(elementosLinha[j])
-                if(elementosLinha[j] < menorDaLinha):
-                    menorDaLinha = elementosLinha[j]
-                tempoMedioTarefa += elementosLinha[j]
-                tempoMedioDeCadaTrabalhador[j] += elementosLinha[j]
-                
-        tempoTarefaTrabalhador.append(elementosLinha)
-        lowerBound += menorDaLinha 
-        tempoMedio += tempoMedioTarefa/trabalhadorApto
+    with dados:
+        numeroTarefas = dados.n
+        numeroTrabalhadores = dados.k
+        tempoTarefaTrabalhador = dados.matrizTempos(math.inf) #Matriz [Tarefa][Trabalhador]
+        lowerBound = dados.lowerBound
+        tempoMedio = dados.tempoMedio
+        tempoMedioDeCadaTrabalhador = dados.tempoMedioTrab.tolist()
+        orderStrenght = dados.orderStrength
+        lista = dados.ordem.tolist()
+        alcance = Alcance.deBitsets(dados.bitsets('descendentes'),dados.bitsets('ascendentes'))
 
-    lowerBound = math.ceil(lowerBound/NUMERO_TRABALHADORES_E_MAQUINAS) #Melhor solução no cenario perfeitop
+        #Grafo de precedencia das tarefas (Tarefa -> filhos) e o inverso dele (Tarefa -> pais)
+        grafo = dados.sucessores()
+        predPtr = dados.predPtr.tolist()
+        precedencia = [predPtr[i+1]-predPtr[i] for i in range(numeroTarefas)]
+        #grafoR mantem o conteudo do leitor de texto original (a propria tarefa, uma vez por pai), que o shift usa como esta
+        grafoR = [[i]*precedencia[i] for i in range(numeroTarefas)]
 
-    tempoMedioDeCadaTrabalhador = [tempoMedioDeCadaTrabalhador[i]/tarefasValidasDoTrab[i] for i in range(len(tempoMedioDeCadaTrabalhador)) if tarefasValidasDoTrab[i] > 0]
-    
-    #Cria grafo de precedencia das tarefas (Tarefa -> filhos) e o inverso dele (Tarefa -> pais)
-    grafoR = [[]for _ in range(NUMERO_TAREFAS)]
-    grafo = [[] for _ in range(NUMERO_TAREFAS)]
-    matrizAdjacencia = [[0]*NUMERO_TAREFAS for _ in range(NUMERO_TAREFAS)]
-    precedencia = [0]*NUMERO_TAREFAS
-    indice = NUMERO_TAREFAS+1
-    while(conteudo[indice] != '-1 -1'):
-        linha = conteudo[indice].split()
-        linha[0] = int(linha[0])
-        linha[1] = int(linha[1])
-        grafo[linha[0]-1].append(linha[1]-1)
-        grafoR[linha[1]-1].append(linha[1]-1)
-        matrizAdjacencia[linha[0]-1][linha[1]-1] = 1
-        precedencia[linha[1]-1] += 1
-        indice = indice+1
-    lista = ordenaTopologicamente(grafo,precedencia[:])
-
-    tamanhoBloco = NUMERO_TAREFAS//NUMERO_TRABALHADORES_E_MAQUINAS
+    tamanhoBloco = numeroTarefas//numeroTrabalhadores
     tarefasFatiadas = [] # A ideia e deixar as tarefas com menos precedencias pras primeiras maquinas.
-    resto = NUMERO_TAREFAS%NUMERO_TRABALHADORES_E_MAQUINAS
+    resto = numeroTarefas%numeroTrabalhadores
     inicio = 0
-    for i in range(NUMERO_TRABALHADORES_E_MAQUINAS):
+    for i in range(numeroTrabalhadores):
         tamanhoAtual = tamanhoBloco +(1 if i < resto else 0)
         fim = inicio + tamanhoAtual
         lote = lista[inicio:fim]
         tarefasFatiadas.append(lote)
         inicio = fim
-    orderStrenght = calcular_order_strength(matrizAdjacencia)
-    return tempoTarefaTrabalhador,grafo,precedencia,lowerBound,tempoMedio,tempoMedioDeCadaTrabalhador,tarefasFatiadas,grafoR,orderStrenght
+    cacheHeuristico = CacheHeuristico(tempoTarefaTrabalhador,tempoMedioDeCadaTrabalhador,tarefasFatiadas,orderStrenght,alcance)
+    return InstanciaACO(tempoTarefaTrabalhador,grafo,precedencia,lowerBound,tempoMedio,tempoMedioDeCadaTrabalhador,tarefasFatiadas,grafoR,orderStrenght,cacheHeuristico)
    
 def sorteia(scores,soma,candidatos):
+    #Roleta do codigo original, usada no modo sequencial. O return de segurança esta dentro do for, então so sai o primeiro candidato
+    #(quando o score dele cobre o sorteio) ou o ultimo: não e proporcional ao score. Mantida assim para o modo sequencial reproduzir
+    #os resultados de referencia; o modo vetorizado (sorteiaEmLote) usa a roleta proporcional, então os dois modos não amostram igual
     if soma == 0:
        return candidatos[0]
    
@@ -239,22 +317,31 @@ def sorteia(scores,soma,candidatos):
         return candidatos[-1] #Segurança caso haja algum erro de float que bagunce a variavel de acumulação
 
 def tempoMedioT(tempoTarefaTrabalhador,tarefasFatiadas,estacao):
-    tempos = [0] * NUMERO_TRABALHADORES_E_MAQUINAS
-    divide = [NUMERO_TRABALHADORES_E_MAQUINAS] * NUMERO_TAREFAS
+    numeroTrabalhadores = len(tempoTarefaTrabalhador[0])
+    tempos = [0] * numeroTrabalhadores
+    divide = [numeroTrabalhadores] * numeroTrabalhadores #Um por trabalhador (com menos tarefas que trabalhadores, por tarefa estourava o indice)
     for tarefa in tarefasFatiadas[estacao]:
-        for i in range(NUMERO_TRABALHADORES_E_MAQUINAS):
+        for i in range(numeroTrabalhadores):
             if tempoTarefaTrabalhador[tarefa][i] == math.inf:
                 divide[i] -= 1
             else:
                 tempos[i]+= tempoTarefaTrabalhador[tarefa][i]
-    tempos = [tempos[i]/divide[i] if divide[i] > 0 else 999999 for i in range(NUMERO_TRABALHADORES_E_MAQUINAS)]
+    tempos = [tempos[i]/divide[i] if divide[i] > 0 else 999999 for i in range(numeroTrabalhadores)]
     return tempos
 
-def alocaTrabalhadoresAEstacoes(formiga,tempoMedioDeCadaTrabalhador,feromoniosTE,tarefasFatiadas,tempoTarefaTrabalhador,alpha,beta,orderStrength):
+def alocaTrabalhadoresAEstacoes(formiga,tempoMedioDeCadaTrabalhador,feromoniosTE,tarefasFatiadas,tempoTarefaTrabalhador,alpha,beta,orderStrength,tabela=None):
    #Sorteia um trabalhador para cada estação, com a probabilidade baseada num balanço de Feromonios depositados na escolha e o tempo medio de um trabalhador.
-   opcoes = list(range(NUMERO_TRABALHADORES_E_MAQUINAS))
+   #Com uma TabelaScores os scores sao apenas consultados, sem recalcular heuristica e potencias
+   opcoes = list(range(len(formiga.trabalhadores)))
 
-   for i in range(NUMERO_TRABALHADORES_E_MAQUINAS):
+   for i in range(len(formiga.trabalhadores)):
+      if tabela is not None:
+         linha = tabela.scoresTrabalhador[i]
+         scores = [linha[trabalhador] for trabalhador in opcoes]
+         sorteado = sorteia(scores,sum(scores),opcoes)
+         opcoes.remove(sorteado)
+         formiga.alocarTrabalhador(i,sorteado)
+         continue
       tempoMedio = tempoMedioT(tempoTarefaTrabalhador,tarefasFatiadas,i)
       scores = []
       soma = 0
@@ -276,13 +363,15 @@ def alocaTrabalhadoresAEstacoes(formiga,tempoMedioDeCadaTrabalhador,feromoniosTE
 
 def printaSolução(f):
     print(f"Formiga {f.id}:")
-    for e in f.estacoes:
-        tarefas_formatadas = ", ".join(str(t) for t in e.tarefas)
-        print(f"(Estacao: {e.idEstacao}, Trabalhador {e.trabalhadorId}) - Tarefas: {tarefas_formatadas}")
+    for idEstacao in range(len(f.trabalhadores)):
+        tarefas_formatadas = ", ".join(str(t) for t in f.tarefasDaEstacao(idEstacao))
+        print(f"(Estacao: {idEstacao}, Trabalhador {f.trabalhadores[idEstacao]}) - Tarefas: {tarefas_formatadas}")
         f.calcularTempoDeCiclo()
     print(f"Tempo de ciclo: {f.tempoDeCiclo}")
 
-def alocaTarefas(formiga,feromoniosTarefas,C_alvo,precedencia,grafo,tempoTarefaTrabalhador,alpha,beta):
+def alocaTarefas(formiga,feromoniosTarefas,C_alvo,precedencia,grafo,tempoTarefaTrabalhador,alpha,beta,tabela=None):
+    numeroTarefas = len(formiga.estacaoDaTarefa)
+    numeroTrabalhadores = len(formiga.trabalhadores)
     tarefas = []
     precedenciaLocal = precedencia[:]
     tarefasFeitas = 0
@@ -290,10 +379,33 @@ def alocaTarefas(formiga,feromoniosTarefas,C_alvo,precedencia,grafo,tempoTarefaT
     def getTempo(trabId,traId):
         return tempoTarefaTrabalhador[traId][trabId]
 
+    if tabela is not None:
+        trabalhadoresCapazes = tabela.trabalhadoresCapazes
+    else:
+        trabalhadoresCapazes = [[w for w in range(len(linha)) if linha[w] != math.inf] for linha in tempoTarefaTrabalhador]
+
+    #Conjuntos de tarefas prontas (sem predecessores pendentes), mantidos ordenados pelo id da tarefa.
+    #prontas vale para a ultima estação (aceita qualquer tarefa) e prontasPorTrab[w] so tem as tarefas que o trabalhador w sabe fazer
+    prontas = []
+    prontasPorTrab = [[] for _ in range(numeroTrabalhadores)]
+    def liberar(tarefa):
+        bisect.insort(prontas,tarefa)
+        for w in trabalhadoresCapazes[tarefa]:
+            bisect.insort(prontasPorTrab[w],tarefa)
+    def consumir(tarefa):
+        del prontas[bisect.bisect_left(prontas,tarefa)]
+        for w in trabalhadoresCapazes[tarefa]:
+            lista = prontasPorTrab[w]
+            del lista[bisect.bisect_left(lista,tarefa)]
+    for x in range(len(precedenciaLocal)):
+        if precedenciaLocal[x] == 0:
+            liberar(x)
+
 
-    for iEstacao, e in enumerate(formiga.estacoes):
-        ehUltima = (iEstacao == len(formiga.estacoes) - 1) #Flag pra saber se e a ultima tarefa
-        estacoes_restantes = NUMERO_TRABALHADORES_E_MAQUINAS - iEstacao
+    for iEstacao in range(numeroTrabalhadores):
+        trabalhadorId = formiga.trabalhadores[iEstacao]
+        ehUltima = (iEstacao == numeroTrabalhadores - 1) #Flag pra saber se e a ultima tarefa
+        estacoes_restantes = numeroTrabalhadores - iEstacao
 
         if estacoes_restantes > 0:
             cargaRestante = C_alvo - cargaAlocadaEstimada
@@ -303,14 +415,14 @@ def alocaTarefas(formiga,feromoniosTarefas,C_alvo,precedencia,grafo,tempoTarefaT
 
         #C_alvoDinamico = C_alvoDinamico*1.10 # Relaxa o limite de carga
 
-        while(tarefasFeitas < NUMERO_TAREFAS):
-            if not ehUltima and e.carga >= C_alvoDinamico: #Se nao for a ultima e ja tiver ultrapassado a carga media, va pra proxima estação
+        while(tarefasFeitas < numeroTarefas):
+            if not ehUltima and formiga.cargas[iEstacao] >= C_alvoDinamico: #Se nao for a ultima e ja tiver ultrapassado a carga media, va pra proxima estação
                 break
 
             if ehUltima: #Se for a ultima tarefa, aceita fazer mesmo com tempo infinito
-                tarefas = [x for x in range(len(precedenciaLocal)) if precedenciaLocal[x] == 0]
+                tarefas = prontas
             else: # Seleciona as tarefas podem ser realizadas neste momento
-                tarefas = [x for x in range(len(precedenciaLocal)) if precedenciaLocal[x] == 0 and getTempo(e.trabalhadorId,x) != math.inf] 
+                tarefas = prontasPorTrab[trabalhadorId]
 
             if len(tarefas) == 0: #Caso onde nao a nenhuma tarefa disponivel para ser feita 
                 break
@@ -318,36 +430,191 @@ def alocaTarefas(formiga,feromoniosTarefas,C_alvo,precedencia,grafo,tempoTarefaT
             soma = 0
             scores = [0] * len(tarefas)
 
-            for i in range(len(tarefas)): # Calcula cada score das tarefas POSSIVEIS e acumula tudo em soma
-                tarefaId = tarefas[i]
-                tempoReal = getTempo(e.trabalhadorId,tarefaId)
+            if tabela is not None: #Scores ja calculados para a iteração, apenas consulta
+                tauLinha = tabela.tauTarefas[iEstacao]
+                etaLinha = tabela.etaTarefas[trabalhadorId]
+                for i in range(len(tarefas)):
+                    scores[i] = tauLinha[tarefas[i]] * etaLinha[tarefas[i]]
+                    soma += scores[i]
+            else:
+                for i in range(len(tarefas)): # Calcula cada score das tarefas POSSIVEIS e acumula tudo em soma
+                    tarefaId = tarefas[i]
+                    tempoReal = getTempo(trabalhadorId,tarefaId)
 
-                if tempoReal == math.inf:
-                    tempoReal = 10000 #Se trabalhador nao for capaz de realizar a tarefa, a solução sera penalizada
+                    if tempoReal == math.inf:
+                        tempoReal = 10000 #Se trabalhador nao for capaz de realizar a tarefa, a solução sera penalizada
 
-                tau = feromoniosTarefas[e.idEstacao][tarefaId]
-                eta = (1/tempoReal)
-                scores[i] = (tau**alpha) * (eta**beta)
-                soma += scores[i]
+                    tau = feromoniosTarefas[iEstacao][tarefaId]
+                    eta = (1/tempoReal)
+                    scores[i] = (tau**alpha) * (eta**beta)
+                    soma += scores[i]
 
             sorteado = sorteia(scores,soma,tarefas)
-            tempoFinal = getTempo(e.trabalhadorId,sorteado) 
+            tempoFinal = getTempo(trabalhadorId,sorteado) 
             if tempoFinal == math.inf:
                 tempoFinal = 10000
-            formiga.alocarTarefa(e.idEstacao,sorteado,tempoFinal)
+            formiga.alocarTarefa(iEstacao,sorteado,tempoFinal)
             cargaAlocadaEstimada += tempoFinal
 
             precedenciaLocal[sorteado] = -1
+            consumir(sorteado)
             for j in grafo[sorteado]:
                 precedenciaLocal[j] = precedenciaLocal[j] -1
+                if precedenciaLocal[j] == 0: #Ultimo predecessor alocado, a tarefa entra nos conjuntos de prontas
+                    liberar(j)
             
             tarefasFeitas += 1
 
-    if tarefasFeitas < NUMERO_TAREFAS: #Se sair do loop e ainda sobrar tarefas, penaliza a formiga
+    if tarefasFeitas < numeroTarefas: #Se sair do loop e ainda sobrar tarefas, penaliza a formiga
         formiga.tempoDeCiclo = math.inf
     else:
         formiga.calcularTempoDeCiclo()
 
+class DadosVetorizados:
+    #Versão em arrays do CacheHeuristico e do grafo, usada pela construção em lote. Montada uma vez por execução do ACO
+    def __init__(self,cache,grafo,precedencia):
+        self.tempoPenalizado = np.array(cache.tempoPenalizado,dtype=np.int64) #Matriz [Tarefa][Trabalhador]
+        self.capaz = np.array(cache.capaz,dtype=bool)
+        self.etaTarefa = np.array(cache.etaTarefa) #Matriz [Tarefa][Trabalhador]
+        self.etaTrabalhador = np.array(cache.etaTrabalhador) #Matriz [Estacao][Trabalhador]
+        self.precedencia = np.array(precedencia,dtype=np.int32)
+        self.numeroTarefas = len(grafo)
+        self.numeroTrabalhadores = len(cache.etaTrabalhador)
+        self.filhos = np.zeros((self.numeroTarefas,self.numeroTarefas),dtype=np.int32) #Quantas vezes cada tarefa libera cada filho
+        for pai in range(self.numeroTarefas):
+            for filho in grafo[pai]:
+                self.filhos[pai][filho] += 1
+
+    @classmethod
+    def doSegmento(cls,segmento):
+        #Mesmos arrays, apontando para o segmento de publicarInstancia em vez de copias (o segmento fica vivo junto com o objeto)
+        dados = cls.__new__(cls)
+        dados.tempoPenalizado = segmento.arrayNumpy('v_tempoPenalizado')
+        dados.capaz = segmento.arrayNumpy('capaz')
+        dados.etaTarefa = segmento.arrayNumpy('v_etaTarefa')
+        dados.etaTrabalhador = segmento.arrayNumpy('v_etaTrabalhador')
+        dados.precedencia = segmento.arrayNumpy('precedencia')
+        dados.filhos = segmento.arrayNumpy('v_filhos')
+        dados.numeroTarefas,dados.numeroTrabalhadores = dados.capaz.shape
+        dados.segmento = segmento #Por ultimo: na coleta os arrays saem antes e o segmento consegue fechar
+        return dados
+
+def sorteiaEmLote(scores,candidatas,gerador):
+    #Roleta vetorizada: sorteia uma coluna por linha, proporcional ao score. Linhas com soma 0 ficam com o primeiro candidato
+    acumulado = np.cumsum(scores,axis=1)
+    soma = acumulado[:,-1]
+    sorteio = gerador.random(len(scores))*soma
+    escolhidos = np.argmax(acumulado >= sorteio[:,None],axis=1)
+    semScore = soma <= 0
+    if semScore.any():
+        escolhidos[semScore] = np.argmax(candidatas[semScore],axis=1)
+    invalidos = ~semScore & (scores[np.arange(len(scores)),escolhidos] <= 0) #Segurança contra erro de float na soma acumulada
+    if invalidos.any():
+        escolhidos[invalidos] = scores.shape[1]-1-np.argmax(scores[invalidos][:,::-1] > 0,axis=1)
+    return escolhidos
+
+TRABALHO_LOTE = 20000 #Formigas x tarefas por chamada de construirColoniaVetorizada em construirColoniaEmLotes
+FORMIGAS_MINIMAS_LOTE = 32 #Abaixo disso o custo fixo de cada passo em lote domina
+
+def construirColoniaEmLotes(formigas,dados,feromoniosTE,feromoniosTarefas,C_alvo,alpha_trab,beta_trab,alpha_tar,beta_tar,gerador,prazo=None):
+    #construirColoniaVetorizada em lotes de formigas, com o prazo conferido a cada passo: se estourar, o lote em andamento e descartado
+    #e os anteriores ficam. O tamanho do lote so depende do numero de tarefas, então a mesma semente da o mesmo resultado com ou sem prazo.
+    #Retorna quantas formigas (do inicio da lista) ficaram prontas
+    tamanhoLote = max(FORMIGAS_MINIMAS_LOTE,TRABALHO_LOTE//max(1,dados.numeroTarefas))
+    nLotes = max(1,math.ceil(len(formigas)/tamanhoLote))
+    inicio = 0
+    for i in range(nLotes):
+        fim = inicio + len(formigas)//nLotes + (1 if i < len(formigas)%nLotes else 0)
+        if not construirColoniaVetorizada(formigas[inicio:fim],dados,feromoniosTE,feromoniosTarefas,C_alvo,alpha_trab,beta_trab,alpha_tar,beta_tar,gerador,prazo):
+            return inicio
+        inicio = fim
+    return inicio
+
+def construirColoniaVetorizada(formigas,dados,feromoniosTE,feromoniosTarefas,C_alvo,alpha_trab,beta_trab,alpha_tar,beta_tar,gerador,prazo=None):
+    #Constroi todas as formigas de uma vez: cada formiga anda na sua propria estação e, a cada passo, ou escolhe uma tarefa ou fecha a estação
+    #Com prazo (time.time), passou dele no meio da construção: para e devolve False, sem mexer nas formigas
+    nFormigas = len(formigas)
+    k = dados.numeroTrabalhadores
+    n = dados.numeroTarefas
+    linhas = np.arange(nFormigas)
+
+    #1. Trabalhadores: uma roleta por estação para a colonia inteira
+    tauTE = np.asarray(feromoniosTE,dtype=float) #Matriz [Trabalhador][Estacao]
+    scoresTrab = (tauTE.T**alpha_trab)*(dados.etaTrabalhador**beta_trab) #Matriz [Estacao][Trabalhador]
+    usado = np.zeros((nFormigas,k),dtype=bool)
+    trabalhadores = np.empty((nFormigas,k),dtype=np.int64) #Matriz [Formiga][Estacao]
+    for i in range(k):
+        livres = ~usado
+        escolhidos = sorteiaEmLote(scoresTrab[i]*livres,livres,gerador)
+        trabalhadores[:,i] = escolhidos
+        usado[linhas,escolhidos] = True
+
+    #2. Tarefas: contador de precedencia [Formiga][Tarefa], cargas [Formiga][Estacao]
+    tauTarefas = np.asarray(feromoniosTarefas,dtype=float)**alpha_tar #Matriz [Estacao][Tarefa]
+    etaTarefas = (dados.etaTarefa**beta_tar).T #Matriz [Trabalhador][Tarefa]
+    precedenciaLocal = np.tile(dados.precedencia,(nFormigas,1))
+    cargas = np.zeros((nFormigas,k),dtype=np.int64)
+    estacaoDaTarefa = np.full((nFormigas,n),-1,dtype=np.int64)
+    ordemDaTarefa = np.zeros((nFormigas,n),dtype=np.int64) #Guarda a ordem de escolha para montar as listas de tarefas
+    estacaoAtual = np.zeros(nFormigas,dtype=np.int64)
+    cargaAlocadaEstimada = np.zeros(nFormigas)
+    tarefasFeitas = np.zeros(nFormigas,dtype=np.int64)
+    C_alvoDinamico = np.full(nFormigas,C_alvo/k)
+    ativa = np.ones(nFormigas,dtype=bool)
+
+    while ativa.any():
+        if prazo is not None and time.time() > prazo:
+            return False
+        f = np.flatnonzero(ativa)
+        e = estacaoAtual[f]
+        trab = trabalhadores[f,e]
+        ehUltima = e == k-1
+        terminou = tarefasFeitas[f] >= n
+
+        candidatas = (precedenciaLocal[f] == 0) & (ehUltima[:,None] | dados.capaz.T[trab]) #Na ultima aceita tarefas com tempo infinito
+        fecha = (~ehUltima & (cargas[f,e] >= C_alvoDinamico[f])) | ~candidatas.any(axis=1)
+
+        acabou = f[terminou]
+        ativa[acabou] = False
+
+        avanca = ~terminou & fecha
+        fa = f[avanca]
+        estacaoAtual[fa] += 1
+        fim = estacaoAtual[fa] >= k
+        ativa[fa[fim]] = False
+        fa = fa[~fim]
+        C_alvoDinamico[fa] = (C_alvo - cargaAlocadaEstimada[fa])/(k - estacaoAtual[fa])
+
+        escolhe = ~terminou & ~fecha
+        if not escolhe.any():
+            continue
+        fe = f[escolhe]
+        ee = e[escolhe]
+        te = trab[escolhe]
+        candidatasE = candidatas[escolhe]
+        sorteadas = sorteiaEmLote(tauTarefas[ee]*etaTarefas[te]*candidatasE,candidatasE,gerador)
+        tempoFinal = dados.tempoPenalizado[sorteadas,te]
+        cargas[fe,ee] += tempoFinal
+        cargaAlocadaEstimada[fe] += tempoFinal
+        tarefasFeitas[fe] += 1
+        estacaoDaTarefa[fe,sorteadas] = ee
+        ordemDaTarefa[fe,sorteadas] = tarefasFeitas[fe]
+        precedenciaLocal[fe] -= dados.filhos[sorteadas]
+        precedenciaLocal[fe,sorteadas] = -1
+
+    #3. Converte o resultado em lote de volta para as formigas
+    for i,formiga in enumerate(formigas):
+        formiga.trabalhadores[:] = array('i',trabalhadores[i].tolist())
+        formiga.estacaoDaTarefa[:] = array('i',estacaoDaTarefa[i].tolist())
+        formiga.ordemDaTarefa[:] = array('q',ordemDaTarefa[i].tolist())
+        formiga.cargas[:] = array('q',cargas[i].tolist())
+        formiga.proximaOrdem = int(tarefasFeitas[i])+1
+        if tarefasFeitas[i] < n:
+            formiga.tempoDeCiclo = math.inf
+        else:
+            formiga.calcularTempoDeCiclo()
+    return True
+
 def evaporacao(m1,m2):
     rho = 0.1
     for i in range(len(m1)):
@@ -368,138 +635,887 @@ def depositarFeromonios(formigas,mTE,mT):
     for f in formigas: 
         adicionado = 100/f.tempoDeCiclo
         
-        for e in f.estacoes:
-            mTE[e.trabalhadorId][e.idEstacao] += adicionado
+        for idEstacao in range(len(f.trabalhadores)):
+            mTE[f.trabalhadores[idEstacao]][idEstacao] += adicionado
         
-        for t in e.tarefas:
-            mT[e.idEstacao][t] += adicionado
+        for t in f.tarefasDaEstacao(idEstacao): #Mesmo comportamento da versão com listas: so as tarefas da ultima estação recebem deposito
+            mT[idEstacao][t] += adicionado
+
+class IndiceShift:
+    #Indice da busca local, reaproveitado entre formigas: tarefas de cada estação, heap de cargas (gargalo) e
+    #janela [maisCedo, maisTarde] de estações permitidas pela precedencia para cada tarefa
+    def __init__(self,grafo,grafoR):
+        n = len(grafo)
+        self.grafo = grafo
+        self.grafoR = grafoR
+        #Quem precisa recalcular a janela quando a tarefa y muda de estação
+        self.dependemComoFilho = [set() for _ in range(n)] #z tal que y esta em grafo[z] (afeta maisTarde[z])
+        self.dependemComoPai = [set() for _ in range(n)] #z tal que y esta em grafoR[z] (afeta maisCedo[z])
+        for z in range(n):
+            for y in grafo[z]:
+                self.dependemComoFilho[y].add(z)
+            for y in grafoR[z]:
+                self.dependemComoPai[y].add(z)
+        self.maisCedo = array('i',[0])*n
+        self.maisTarde = array('i',[0])*n
+        self.pendentes = []
+
+    def preparar(self,formiga):
+        cargas = formiga.cargas
+        estacaoDaTarefa = formiga.estacaoDaTarefa
+        self.ultimaEstacao = len(cargas)-1
+        for x in range(len(estacaoDaTarefa)):
+            self.atualizarJanela(x,estacaoDaTarefa)
+        self.tarefasPorEstacao = [set() for _ in range(len(cargas))]
+        for x in range(len(estacaoDaTarefa)):
+            if estacaoDaTarefa[x] >= 0:
+                self.tarefasPorEstacao[estacaoDaTarefa[x]].add(x)
+        self.heap = [(-cargas[e],e) for e in range(len(cargas))] #Empate na carga fica com a estação de menor indice
+        heapq.heapify(self.heap)
+        self.pendentes = []
+
+    def atualizarJanela(self,x,estacaoDaTarefa):
+        tarde = self.ultimaEstacao
+        for filho in self.grafo[x]: #Todos os sucessores devem estar em estações >= destino
+            if estacaoDaTarefa[filho] < tarde:
+                tarde = estacaoDaTarefa[filho]
+        cedo = 0
+        for pai in self.grafoR[x]: #Todos os predecessores devem estar em estações <= destino
+            if estacaoDaTarefa[pai] > cedo:
+                cedo = estacaoDaTarefa[pai]
+        self.maisTarde[x] = tarde
+        self.maisCedo[x] = cedo
+
+    def gargalo(self,cargas):
+        heap = self.heap
+        while -heap[0][0] != cargas[heap[0][1]]: #Entradas antigas sao descartadas so quando chegam no topo
+            heapq.heappop(heap)
+        return heap[0][1]
+
+    def mover(self,tarefa,origem,destino,cargas):
+        self.tarefasPorEstacao[origem].discard(tarefa)
+        self.tarefasPorEstacao[destino].add(tarefa)
+        heapq.heappush(self.heap,(-cargas[origem],origem))
+        heapq.heappush(self.heap,(-cargas[destino],destino))
+        self.pendentes.append(tarefa)
+
+    def fecharPassada(self,estacaoDaTarefa):
+        #As janelas usam as estações do inicio da passada, então os movimentos so são aplicados a elas aqui
+        for tarefa in self.pendentes:
+            for z in self.dependemComoFilho[tarefa]:
+                self.atualizarJanela(z,estacaoDaTarefa)
+            for z in self.dependemComoPai[tarefa]:
+                self.atualizarJanela(z,estacaoDaTarefa)
+        self.pendentes = []
 
-def shift(formiga,grafo,grafoR,tempoTarefaTrabalhador):
+def shift(formiga,grafo,grafoR,tempoTarefaTrabalhador,indice=None,estatisticas=None):
+    #Busca local de primeira melhora: tira tarefas da estação gargalo e coloca na primeira estação onde a carga fica menor.
+    #indice (IndiceShift) pode ser reaproveitado entre chamadas para não recriar as estruturas
+    #estatisticas (EstatisticasACO) recebe os movimentos tentados e aceitos
+    if indice is None:
+        indice = IndiceShift(grafo,grafoR)
+    indice.preparar(formiga)
     melhorou = False
+    cargas = formiga.cargas
+    trabalhadores = formiga.trabalhadores
+    ordemDaTarefa = formiga.ordemDaTarefa
+    maisCedo = indice.maisCedo
+    maisTarde = indice.maisTarde
+    tentados = aceitos = 0
     while True:
         movimentoRealizado = False
-        mapaTarefa = {}
-        maior = -1
-        estacaoGargalo = None
-        for e in formiga.estacoes: #Encontra a estacao de maior gargalo
-            if e.carga > maior:
-                maior = e.carga
-                estacaoGargalo = e
-            for t in e.tarefas: #Mapeia as tarefas em um dicionaria para checar a precedencia
-                mapaTarefa[t] = e.idEstacao
-
-        tarefasOrdenadas = sorted(estacaoGargalo.tarefas,key=lambda t :tempoTarefaTrabalhador[t][estacaoGargalo.trabalhadorId],reverse=True)
+        estacaoGargalo = indice.gargalo(cargas) #Encontra a estacao de maior gargalo
+
+        trabalhadorGargalo = trabalhadores[estacaoGargalo]
+        tarefasOrdenadas = sorted(indice.tarefasPorEstacao[estacaoGargalo],key=lambda t :(-tempoTarefaTrabalhador[t][trabalhadorGargalo],ordemDaTarefa[t]))
         for tarefa in tarefasOrdenadas:
-            tempoNaOrigem = tempoTarefaTrabalhador[tarefa][estacaoGargalo.trabalhadorId]
-            for eDestino in formiga.estacoes:
-                if(eDestino.idEstacao == estacaoGargalo.idEstacao): #Pula quando e a propria estação gargalo
+            tempoNaOrigem = tempoTarefaTrabalhador[tarefa][trabalhadorGargalo]
+            #Tarefa penalizada na ultima estação: a carga tem 10000 dela, não infinito. Muda o comportamento do codigo original, que tirava
+            #inf da carga e o removerTarefa zerava a estação inteira (as outras tarefas dela sumiam do tempo de ciclo). So faz diferença
+            #quando uma tarefa penalizada esta na estação gargalo
+            if tempoNaOrigem == math.inf:
+                tempoNaOrigem = 10000
+            for eDestino in range(max(maisCedo[tarefa],0),maisTarde[tarefa]+1): #So as estações que respeitam a precedencia
+                if(eDestino == estacaoGargalo): #Pula quando e a propria estação gargalo
                     continue
+                tentados += 1
                 
-                tempoNoDestino = tempoTarefaTrabalhador[tarefa][eDestino.trabalhadorId]
+                tempoNoDestino = tempoTarefaTrabalhador[tarefa][trabalhadores[eDestino]]
                 if tempoNoDestino == math.inf: #Verifica se o trabalhador sabe fazer a tarefa
                     continue
                 
-                novaCargaDestomp = eDestino.carga + tempoNoDestino
-                if novaCargaDestomp >= estacaoGargalo.carga: #Verifica se a mudança vai diminuir o tempo de ciclo
+                novaCargaDestomp = cargas[eDestino] + tempoNoDestino
+                if novaCargaDestomp >= cargas[estacaoGargalo]: #Verifica se a mudança vai diminuir o tempo de ciclo
                     continue
 
-                valido = True
-                for filho in grafo[tarefa]: #Todos os sucessores da tarefa devem estar em estações >= a estação destino
-                    estacaoFilho = mapaTarefa.get(filho)
-                    if estacaoFilho < eDestino.idEstacao:
-                        valido = False
-                        break
-
-                if not valido: continue
-
-                for pai in grafoR[tarefa]: #Todos os predecessores da tarefa devem estar em estações <= a estação destino
-                    estacaoPai = mapaTarefa.get(pai)
-                    if estacaoPai > eDestino.idEstacao:
-                        valido = False
-                        break
-                if not valido: continue
-
-                formiga.removerTarefa(estacaoGargalo.idEstacao,tarefa,tempoNaOrigem)
-                formiga.alocarTarefa(eDestino.idEstacao,tarefa,tempoNoDestino)
+                formiga.removerTarefa(estacaoGargalo,tarefa,tempoNaOrigem)
+                formiga.alocarTarefa(eDestino,tarefa,tempoNoDestino)
+                indice.mover(tarefa,estacaoGargalo,eDestino,cargas)
                 movimentoRealizado = True
                 melhorou = True
+                aceitos += 1
                 break #Tenta mudar algo denovo agora na nova maior estação
         if not movimentoRealizado:
                 break
+        indice.fecharPassada(formiga.estacaoDaTarefa)
     if melhorou:
         formiga.calcularTempoDeCiclo()
+    if estatisticas is not None:
+        estatisticas.contar('shiftTentados',tentados)
+        estatisticas.contar('shiftAceitos',aceitos)
 
     return melhorou
         
-def ACO(tempoTarefaTrabalhador,grafo,precedencia,lowerBound,C_alvo,tempoMedioDeCadaTrabalhador,tarefasFatiadas,grafoR,orderStrenght,alpha_trab, beta_trab, alpha_tar, beta_tar,numeroFormigas=200,nIteracoesSemMelhoria=200,tempoLimite=300):
-    startTime = time.time()
-    feromonioInicial = 100/C_alvo
-    feromoniosTE = [[feromonioInicial for _ in range(NUMERO_TRABALHADORES_E_MAQUINAS)] for _ in range(NUMERO_TRABALHADORES_E_MAQUINAS)] #Matriz [Trabalhador][Estacao]
-    feromoniosTarefas = [[feromonioInicial for _ in range(NUMERO_TAREFAS)] for _ in range(NUMERO_TRABALHADORES_E_MAQUINAS)] #Matriz [Estacao][Tarefa]
-    melhorGlobal = math.inf
-    iteracoesSemMelhoria = 0
-    iteracoesSemMelhoriaMS = 0
-    formigas = [Formiga(i) for i in range(numeroFormigas)]
-    melhorFormigaGlobal = None
-    nIteracoes = 0
-    while((iteracoesSemMelhoria < nIteracoesSemMelhoria) and (melhorGlobal > lowerBound)):
-        if time.time() - startTime > tempoLimite: 
-            print("Limite de tempo atigindo") 
-            break
-        if iteracoesSemMelhoriaMS > 50:
-            feromoniosTE = [[feromonioInicial for _ in range(NUMERO_TRABALHADORES_E_MAQUINAS)] for _ in range(NUMERO_TRABALHADORES_E_MAQUINAS)] #Matriz [Trabalhador][Estacao]
-            feromoniosTarefas = [[feromonioInicial for _ in range(NUMERO_TAREFAS)] for _ in range(NUMERO_TRABALHADORES_E_MAQUINAS)] #Matriz [Estacao][Tarefa]
-            iteracoesSemMelhoriaMS = 0
+class CacheShift:
+    #LRU limitado: impressão digital da solução construida (trabalhador de cada estação, estação de cada tarefa e a sequencia de
+    #tarefas dentro de cada estação) -> estado depois do shift. Formiga repetida (comum com a colonia convergida) recebe o resultado
+    #guardado sem refazer a descida. A sequencia entra porque o shift desempata pela ordem de inserção; como ele so compara tarefas
+    #da mesma estação e a tarefa movida vai para o fim da estação de destino, o valor absoluto da ordem não muda o resultado
+    def __init__(self,tamanho):
+        self.tamanho = tamanho
+        self.entradas = OrderedDict()
+        self.acertos = 0
+        self.falhas = 0
+        self.descartes = 0
 
-        melhorFormigaLocal = None
-        for f in formigas:
-            f.resetar() #Reseta a formiga para a nova iteração
-            alocaTrabalhadoresAEstacoes(f,tempoMedioDeCadaTrabalhador,feromoniosTE,tarefasFatiadas,tempoTarefaTrabalhador,alpha_trab, beta_trab,orderStrenght)
-            alocaTarefas(f,feromoniosTarefas,C_alvo,precedencia,grafo,tempoTarefaTrabalhador,alpha_tar, beta_tar)
+    def aplicar(self,formiga,grafo,grafoR,tempoTarefaTrabalhador,indice=None,estatisticas=None):
+        #Mesmo efeito e retorno de shift(formiga,...), consultando o cache antes
+        estacaoDaTarefa,ordemDaTarefa = formiga.estacaoDaTarefa,formiga.ordemDaTarefa
+        sequencia = array('q',sorted(range(len(estacaoDaTarefa)),key=lambda t: (estacaoDaTarefa[t],ordemDaTarefa[t])))
+        chave = formiga.trabalhadores.tobytes() + estacaoDaTarefa.tobytes() + sequencia.tobytes()
+        entrada = self.entradas.get(chave)
+        if entrada is not None:
+            self.entradas.move_to_end(chave)
+            self.acertos += 1
+            estacaoDaTarefa,ordemDaTarefa,cargas,tempoDeCiclo,proximaOrdem,melhorou = entrada
+            formiga.estacaoDaTarefa[:] = estacaoDaTarefa
+            formiga.ordemDaTarefa[:] = ordemDaTarefa
+            formiga.cargas[:] = cargas
+            formiga.tempoDeCiclo = tempoDeCiclo
+            formiga.proximaOrdem = proximaOrdem
+            return melhorou
+        self.falhas += 1
+        melhorou = shift(formiga,grafo,grafoR,tempoTarefaTrabalhador,indice,estatisticas)
+        self.entradas[chave] = (formiga.estacaoDaTarefa[:],formiga.ordemDaTarefa[:],formiga.cargas[:],formiga.tempoDeCiclo,formiga.proximaOrdem,melhorou)
+        if len(self.entradas) > self.tamanho:
+            self.entradas.popitem(last=False) #Sai a impressão usada ha mais tempo
+            self.descartes += 1
+        return melhorou
+
+class IndiceVND:
+    #Estruturas da descida em vizinhanças variaveis (VND). Com elas o novo tempo de ciclo de um movimento
+    #que mexe em duas estações sai em O(1): as duas cargas novas contra a maior carga entre as outras estações
+    #alcance: o fechamento transitivo da instancia (cacheHeuristico.alcance); sem ele e montado aqui a partir do grafo
+    def __init__(self,grafo,tempoTarefaTrabalhador,alcance=None):
+        n = len(grafo)
+        self.filhos = grafo
+        self.pais = [[] for _ in range(n)] #Predecessores diretos montados a partir do grafo
+        for pai in range(n):
+            for filho in grafo[pai]:
+                self.pais[filho].append(pai)
+        self.tempo = tempoTarefaTrabalhador
+        self.tempoPenalizado = [[10000 if t == math.inf else t for t in linha] for linha in tempoTarefaTrabalhador]
+
+        ordem = ordenaTopologicamente(grafo,[len(self.pais[x]) for x in range(n)])
+        self.alcance = alcance if alcance is not None else Alcance(grafo,ordem)
+        self.posicaoTopologica = [0]*n #Ordena as tarefas de uma estação de forma que respeite a precedencia
+        for posicao,x in enumerate(ordem):
+            self.posicaoTopologica[x] = posicao
+
+    def preparar(self,formiga):
+        k = len(formiga.cargas)
+        n = len(formiga.estacaoDaTarefa)
+        self.formiga = formiga
+        self.k = k
+        self.tarefasPorEstacao = [set() for _ in range(k)]
+        self.soma = [[0]*k for _ in range(k)] #[Estacao][Trabalhador]: carga da estação se o trabalhador fosse outro
+        self.incapazes = [[0]*k for _ in range(k)] #[Estacao][Trabalhador]: tarefas que o trabalhador não sabe fazer
+        for x in range(n):
+            e = formiga.estacaoDaTarefa[x]
+            if e < 0:
+                continue
+            self.tarefasPorEstacao[e].add(x)
+            self.somarTarefa(x,e,1)
+        self.maisCedo = [0]*n
+        self.maisTarde = [k-1]*n
+        for x in range(n):
+            self.atualizarJanela(x)
+        self.atualizarTopo()
+
+    def somarTarefa(self,x,e,sinal):
+        linhaTempo = self.tempo[x]
+        soma = self.soma[e]
+        incapazes = self.incapazes[e]
+        for w in range(self.k):
+            if linhaTempo[w] == math.inf:
+                incapazes[w] += sinal
+            else:
+                soma[w] += sinal*linhaTempo[w]
+
+    def cargaComTrabalhador(self,e,w):
+        return math.inf if self.incapazes[e][w] > 0 else self.soma[e][w]
+
+    def atualizarJanela(self,x):
+        estacaoDaTarefa = self.formiga.estacaoDaTarefa
+        cedo = 0
+        for pai in self.pais[x]:
+            if estacaoDaTarefa[pai] > cedo:
+                cedo = estacaoDaTarefa[pai]
+        tarde = self.k-1
+        for filho in self.filhos[x]:
+            if estacaoDaTarefa[filho] < tarde:
+                tarde = estacaoDaTarefa[filho]
+        self.maisCedo[x] = cedo
+        self.maisTarde[x] = tarde
+
+    def atualizarTopo(self):
+        #As 3 maiores cargas bastam para saber a maior carga fora de qualquer par de estações
+        cargas = self.formiga.cargas
+        self.topo = sorted(((cargas[e],e) for e in range(self.k)),key=lambda c:(-c[0],c[1]))[:3]
+
+    def maiorForaDe(self,a,b):
+        for carga,e in self.topo:
+            if e != a and e != b:
+                return carga
+        return 0
+
+    def aceita(self,a,b,novaA,novaB):
+        #Aceita se o tempo de ciclo cai ou, com o mesmo tempo de ciclo, se a maior das duas cargas cai (desfaz empates no gargalo)
+        cmax = self.topo[0][0]
+        novoCmax = max(novaA,novaB,self.maiorForaDe(a,b))
+        if novoCmax < cmax:
+            return True
+        cargas = self.formiga.cargas
+        return novoCmax == cmax and max(novaA,novaB) < max(cargas[a],cargas[b])
+
+    def moverTarefa(self,x,origem,destino):
+        formiga = self.formiga
+        formiga.removerTarefa(origem,x,self.tempoPenalizado[x][formiga.trabalhadores[origem]])
+        formiga.alocarTarefa(destino,x,self.tempo[x][formiga.trabalhadores[destino]])
+        self.tarefasPorEstacao[origem].discard(x)
+        self.tarefasPorEstacao[destino].add(x)
+        self.somarTarefa(x,origem,-1)
+        self.somarTarefa(x,destino,1)
+        self.atualizarJanela(x)
+        for pai in self.pais[x]:
+            self.atualizarJanela(pai)
+        for filho in self.filhos[x]:
+            self.atualizarJanela(filho)
+
+def vizinhancaTrocaTarefas(indice):
+    #Troca uma tarefa da estação gargalo com uma tarefa de outra estação
+    formiga = indice.formiga
+    cargas = formiga.cargas
+    trabalhadores = formiga.trabalhadores
+    tempo = indice.tempo
+    a = indice.topo[0][1]
+    wa = trabalhadores[a]
+    for x in sorted(indice.tarefasPorEstacao[a]):
+        for b in range(max(indice.maisCedo[x],0),indice.maisTarde[x]+1):
+            wb = trabalhadores[b]
+            if b == a or tempo[x][wb] == math.inf:
+                continue
+            base = cargas[a] - indice.tempoPenalizado[x][wa]
+            for y in sorted(indice.tarefasPorEstacao[b]):
+                if tempo[y][wa] == math.inf or not (indice.maisCedo[y] <= a <= indice.maisTarde[y]):
+                    continue
+                if indice.alcance.precede(x,y) or indice.alcance.precede(y,x): #Uma precede a outra: a troca inverteria a precedencia
+                    continue
+                novaA = base + tempo[y][wa]
+                novaB = cargas[b] - indice.tempoPenalizado[y][wb] + tempo[x][wb]
+                if indice.aceita(a,b,novaA,novaB):
+                    indice.moverTarefa(x,a,b)
+                    indice.moverTarefa(y,b,a)
+                    indice.atualizarTopo()
+                    return True
+    return False
+
+def vizinhancaTrocaTrabalhadores(indice):
+    #Troca o trabalhador da estação gargalo com o de outra estação. So as duas cargas afetadas são recalculadas
+    formiga = indice.formiga
+    trabalhadores = formiga.trabalhadores
+    a = indice.topo[0][1]
+    for b in range(indice.k):
+        if b == a:
+            continue
+        novaA = indice.cargaComTrabalhador(a,trabalhadores[b])
+        novaB = indice.cargaComTrabalhador(b,trabalhadores[a])
+        if novaA == math.inf or novaB == math.inf:
+            continue
+        if indice.aceita(a,b,novaA,novaB):
+            trabalhadores[a],trabalhadores[b] = trabalhadores[b],trabalhadores[a]
+            formiga.cargas[a] = novaA
+            formiga.cargas[b] = novaB
+            indice.atualizarTopo()
+            return True
+    return False
+
+def vizinhancaMoverBloco(indice):
+    #Move um bloco de tarefas da estação gargalo para a estação vizinha. Na ordem topologica da estação,
+    #todo sufixo pode ir para a estação seguinte e todo prefixo para a anterior sem quebrar a precedencia
+    formiga = indice.formiga
+    cargas = formiga.cargas
+    trabalhadores = formiga.trabalhadores
+    a = indice.topo[0][1]
+    wa = trabalhadores[a]
+    tarefas = sorted(indice.tarefasPorEstacao[a],key=indice.posicaoTopologica.__getitem__)
+    for destino,bloco in ((a+1,tarefas[::-1]),(a-1,tarefas)):
+        if destino < 0 or destino >= indice.k:
+            continue
+        wd = trabalhadores[destino]
+        saiDaOrigem = 0
+        entraNoDestino = 0
+        for tamanho,x in enumerate(bloco,1):
+            if indice.tempo[x][wd] == math.inf: #Blocos maiores tambem teriam essa tarefa
+                break
+            saiDaOrigem += indice.tempoPenalizado[x][wa]
+            entraNoDestino += indice.tempo[x][wd]
+            if indice.aceita(a,destino,cargas[a] - saiDaOrigem,cargas[destino] + entraNoDestino):
+                for y in bloco[:tamanho]:
+                    indice.moverTarefa(y,a,destino)
+                indice.atualizarTopo()
+                return True
+    return False
+
+def vnd(formiga,grafo,grafoR,tempoTarefaTrabalhador,indiceVND,indiceShift=None,estatisticas=None):
+    #Descida em vizinhanças variaveis: shift, troca de tarefas, troca de trabalhadores e movimento de blocos.
+    #Volta para a primeira vizinhança sempre que alguma melhora. Retorna True se a formiga mudou
+    #estatisticas (EstatisticasACO) recebe os movimentos do shift, como na chamada direta
+    if formiga.tempoDeCiclo == math.inf: #Formiga incompleta não tem como ser avaliada
+        return False
+    vizinhancas = (vizinhancaTrocaTarefas,vizinhancaTrocaTrabalhadores,vizinhancaMoverBloco)
+    melhorou = shift(formiga,grafo,grafoR,tempoTarefaTrabalhador,indiceShift,estatisticas)
+    indiceVND.preparar(formiga)
+    i = 0
+    while i < len(vizinhancas):
+        if vizinhancas[i](indiceVND):
+            melhorou = True
+            if shift(formiga,grafo,grafoR,tempoTarefaTrabalhador,indiceShift,estatisticas):
+                indiceVND.preparar(formiga)
+            i = 0
+        else:
+            i += 1
+    formiga.calcularTempoDeCiclo()
+    return melhorou
+
+def publicarInstancia(dados,dadosVetorizados=None):
+    #Publica a instancia (os 9 primeiros campos de uma InstanciaACO) num SegmentoCompartilhado, em vetores planos: tempos [Tarefa][Trabalhador]
+    #com instancia.INCAPAZ no lugar de inf, mascara de capacidade, grafo/grafoR/tarefasFatiadas em CSR, precedencia e tempo medio por trabalhador.
+    #dadosVetorizados: junta os arrays da construção em lote (inclusive filhos, N x N). Quem publica libera (segmento.liberar())
+    tempoTarefaTrabalhador,grafo,precedencia,lowerBound,C_alvo,tempoMedioDeCadaTrabalhador,tarefasFatiadas,grafoR,orderStrenght = dados[:9]
+    n = len(tempoTarefaTrabalhador)
+    k = len(tempoTarefaTrabalhador[0])
+    vetores = {
+        'tempos':('i',(n,k),array('i',[instancia.INCAPAZ if tempo == math.inf else tempo for linha in tempoTarefaTrabalhador for tempo in linha])),
+        'capaz':('?',(n,k),bytes(tempo != math.inf for linha in tempoTarefaTrabalhador for tempo in linha)),
+        'precedencia':('i',(n,),array('i',precedencia)),
+        'tempoMedioDeCadaTrabalhador':('d',(len(tempoMedioDeCadaTrabalhador),),array('d',tempoMedioDeCadaTrabalhador))}
+    for nome,listas in (('grafo',grafo),('grafoR',grafoR),('tarefasFatiadas',tarefasFatiadas)):
+        ptr = array('i',[0])
+        for lista in listas:
+            ptr.append(ptr[-1]+len(lista))
+        vetores[nome+'Ptr'] = ('i',(len(ptr),),ptr)
+        vetores[nome+'Idx'] = ('i',(ptr[-1],),array('i',[x for lista in listas for x in lista]))
+    if dadosVetorizados is not None:
+        for nome in ('tempoPenalizado','etaTarefa','etaTrabalhador','filhos'):
+            valor = np.ascontiguousarray(getattr(dadosVetorizados,nome))
+            vetores['v_'+nome] = (valor.dtype.char,valor.shape,valor)
+    return SegmentoCompartilhado.publicar(vetores,{'lowerBound':lowerBound,'C_alvo':C_alvo,'orderStrenght':orderStrenght})
+
+def anexarInstancia(descritor,comCache=True):
+    #Lado de quem usa o segmento de publicarInstancia: anexa pelo nome e remonta as listas que a construção e o shift percorrem
+    #(copia local, sem pickle, feita em paralelo em cada processo). Os arrays da construção em lote ficam no segmento, sem copia.
+    #comCache=False não monta o CacheHeuristico (o modo vetorizado não usa). Retorna (InstanciaACO, DadosVetorizados ou None)
+    segmento = SegmentoCompartilhado.anexar(descritor)
+    def copia(nome):
+        with segmento.vetor(nome) as visao: #Solta a visão na hora, senão o segmento não fecha
+            return visao.tolist()
+    tempoTarefaTrabalhador = [[math.inf if tempo == instancia.INCAPAZ else tempo for tempo in linha] for linha in copia('tempos')]
+    listas = {}
+    for nome in ('grafo','grafoR','tarefasFatiadas'):
+        ptr = copia(nome+'Ptr')
+        idx = copia(nome+'Idx')
+        listas[nome] = [idx[ptr[i]:ptr[i+1]] for i in range(len(ptr)-1)]
+    precedencia = copia('precedencia')
+    tempoMedioDeCadaTrabalhador = copia('tempoMedioDeCadaTrabalhador')
+    e = segmento.escalares
+    cacheHeuristico = CacheHeuristico(tempoTarefaTrabalhador,tempoMedioDeCadaTrabalhador,listas['tarefasFatiadas'],e['orderStrenght']) if comCache else None
+    dados = InstanciaACO(tempoTarefaTrabalhador,listas['grafo'],precedencia,e['lowerBound'],e['C_alvo'],tempoMedioDeCadaTrabalhador,
+                         listas['tarefasFatiadas'],listas['grafoR'],e['orderStrenght'],cacheHeuristico)
+    if 'v_filhos' in segmento.layout:
+        return dados,DadosVetorizados.doSegmento(segmento)
+    segmento.liberar() #As listas ja são copias locais: quem anexou so fecha
+    return dados,None
+
+FOLGA_PRAZO = 0.1 #Segundos alem do prazo que o processo principal espera os lotes do pool (os lotes tambem param no prazo)
+
+DADOS_PROCESSO = {} #Dados da instancia em cada processo do pool (preenchido por inicializarProcessoColonia)
+
+def inicializarProcessoColonia(dados):
+    #Roda uma vez em cada processo do pool: a instancia e copiada so na criação do pool, não a cada iteração.
+    #Com 'segmento' so o descritor vem por pickle e a instancia e lida do segmento compartilhado (anexarInstancia).
+    #Cada processo do pool atende uma unica colonia, então o estado por processo não mistura instancias
+    DADOS_PROCESSO.clear()
+    DADOS_PROCESSO.update(dados)
+    if 'segmento' in dados:
+        instanciaProcesso,dadosVetorizados = anexarInstancia(dados['segmento'],comCache=dados['modo'] == 'sequencial')
+        DADOS_PROCESSO.update(instanciaProcesso._asdict())
+        if dadosVetorizados is not None:
+            DADOS_PROCESSO['dadosVetorizados'] = dadosVetorizados
+    DADOS_PROCESSO['formigas'] = []
+    DADOS_PROCESSO['indiceShift'] = IndiceShift(DADOS_PROCESSO['grafo'],DADOS_PROCESSO['grafoR'])
+    DADOS_PROCESSO['cacheShift'] = CacheShift(dados['tamanhoCacheShift']) if dados['tamanhoCacheShift'] > 0 else None #Um cache por processo
+    if DADOS_PROCESSO['modo'] == 'vetorizado' and 'dadosVetorizados' not in DADOS_PROCESSO:
+        DADOS_PROCESSO['dadosVetorizados'] = DadosVetorizados(DADOS_PROCESSO['cacheHeuristico'],DADOS_PROCESSO['grafo'],DADOS_PROCESSO['precedencia'])
+
+def avaliarLoteFormigas(tarefa):
+    #Constroi e aplica o shift em um lote de formigas dentro do processo. Devolve a forma compacta de cada formiga e os contadores
+    #do lote (shift e cacheShift do processo), que o processo principal soma nas suas estatisticas.
+    #Com prazo, as formigas que ja estavam construidas quando ele passou voltam sem shift e as demais não voltam
+    tamanhoLote,feromoniosTE,feromoniosTarefas,semente,prazo = tarefa
+    d = DADOS_PROCESSO
+    random.seed(semente) #Cada lote tem sua propria sequencia, reproduzivel para o mesmo numero de processos
+    formigas = d['formigas']
+    while len(formigas) < tamanhoLote: #Formigas do processo sao reaproveitadas entre iterações
+        formigas.append(Formiga(len(formigas),len(d['tempoTarefaTrabalhador']),len(d['tempoTarefaTrabalhador'][0])))
+    formigas = formigas[:tamanhoLote]
+    est = EstatisticasACO()
+    cache = d['cacheShift']
+    if cache is not None:
+        acertos,falhas,descartes = cache.acertos,cache.falhas,cache.descartes
+
+    if d['modo'] == 'vetorizado':
+        gerador = np.random.default_rng(random.getrandbits(64))
+        construidas = construirColoniaEmLotes(formigas,d['dadosVetorizados'],feromoniosTE,feromoniosTarefas,d['C_alvo'],d['alpha_trab'],d['beta_trab'],d['alpha_tar'],d['beta_tar'],gerador,prazo)
+    else:
+        tabela = TabelaScores(d['cacheHeuristico'],feromoniosTE,feromoniosTarefas,d['alpha_trab'],d['beta_trab'],d['alpha_tar'],d['beta_tar'])
+        construidas = len(formigas)
+    resultado = []
+    for f in formigas[:construidas]:
+        noPrazo = prazo is None or time.time() <= prazo
+        if d['modo'] == 'sequencial':
+            if not noPrazo:
+                break
+            f.resetar()
+            alocaTrabalhadoresAEstacoes(f,d['tempoMedioDeCadaTrabalhador'],feromoniosTE,d['tarefasFatiadas'],d['tempoTarefaTrabalhador'],d['alpha_trab'],d['beta_trab'],d['orderStrenght'],tabela)
+            alocaTarefas(f,feromoniosTarefas,d['C_alvo'],d['precedencia'],d['grafo'],d['tempoTarefaTrabalhador'],d['alpha_tar'],d['beta_tar'],tabela)
+        if not noPrazo:
+            pass
+        elif cache is not None:
+            cache.aplicar(f,d['grafo'],d['grafoR'],d['tempoTarefaTrabalhador'],d['indiceShift'],est)
+        else:
+            shift(f,d['grafo'],d['grafoR'],d['tempoTarefaTrabalhador'],d['indiceShift'],est)
+        resultado.append(f.exportarVetores())
+    if cache is not None: #O cache vive entre lotes: so a diferença e deste lote
+        est.contar('cacheShiftAcertos',cache.acertos-acertos)
+        est.contar('cacheShiftFalhas',cache.falhas-falhas)
+        est.contar('cacheShiftDescartes',cache.descartes-descartes)
+    return resultado,est.contadores
+
+class ColoniaACO:
+    #Estado de uma colonia entre iterações (feromonios, formigas, melhor solução e contadores de estagnação).
+    #O ACO roda iterar() ate o criterio de parada; o modelo de ilhas usa a mesma colonia rodando em epocas
+    def __init__(self,tempoTarefaTrabalhador,grafo,precedencia,lowerBound,C_alvo,tempoMedioDeCadaTrabalhador,tarefasFatiadas,grafoR,orderStrenght,alpha_trab, beta_trab, alpha_tar, beta_tar,numeroFormigas=200,modo='sequencial',cacheHeuristico=None,nProcessos=1,semente=None,nFormigasVND=0,feromonio='classico',estatisticas=False,tamanhoCacheShift=0,memoriaCompartilhada=None,dadosVetorizados=None):
+        #modo: 'sequencial' constroi uma formiga por vez, 'vetorizado' constroi a colonia inteira em lote com NumPy
+        #nProcessos > 1 divide a colonia em lotes avaliados em paralelo (construção + shift); o feromonio continua no processo principal
+        #semente torna a execução reproduzivel (no modo paralelo, para o mesmo nProcessos). Ela semeia o random global do modulo,
+        #então duas colonias rodando ao mesmo tempo no mesmo processo dividem a sequencia e nenhuma das duas e reproduzivel
+        #nFormigasVND > 0 aplica a VND nas melhores formigas de cada iteração
+        #feromonio: 'classico' usa as listas e o reinicio total; 'mmas' usa o FeromonioMMAS (NumPy, limites MAX-MIN e reinicio suave)
+        #estatisticas=True mede tempo e chamadas de cada fase em self.estatisticas (EstatisticasACO); desligado fica None
+        #tamanhoCacheShift > 0 liga o CacheShift (LRU com essa quantidade de soluções) na frente do shift
+        #memoriaCompartilhada (com nProcessos > 1): a instancia vai para os processos num segmento compartilhado (publicarInstancia)
+        #em vez de ir por pickle; no modo vetorizado os arrays da construção em lote são usados direto do segmento.
+        #None escolhe: sim no vetorizado ou fora do fork; no sequencial com fork os processos ja herdam as listas sem copia
+        #dadosVetorizados: arrays da construção em lote ja montados (ex.: de anexarInstancia); senão a colonia monta
+        if modo not in ('sequencial','vetorizado'):
+            raise ValueError(f"Modo de construção desconhecido: {modo}")
+        if cacheHeuristico is None: #Quem não passou o cache de ler_e_converter_dados paga a montagem aqui
+            cacheHeuristico = CacheHeuristico(tempoTarefaTrabalhador,tempoMedioDeCadaTrabalhador,tarefasFatiadas,orderStrenght)
+        if modo == 'vetorizado' and np is None:
+            raise ImportError("O modo 'vetorizado' precisa do NumPy (pip install numpy)")
+        if feromonio not in ('classico','mmas'):
+            raise ValueError(f"Feromonio desconhecido: {feromonio}")
+        if feromonio == 'mmas' and np is None:
+            raise ImportError("O feromonio 'mmas' precisa do NumPy (pip install numpy)")
+        self.numeroTarefas = len(tempoTarefaTrabalhador)
+        self.numeroTrabalhadores = len(tempoTarefaTrabalhador[0])
+        self.tempoTarefaTrabalhador = tempoTarefaTrabalhador
+        self.grafo = grafo
+        self.grafoR = grafoR
+        self.precedencia = precedencia
+        self.lowerBound = lowerBound
+        self.C_alvo = C_alvo
+        self.tempoMedioDeCadaTrabalhador = tempoMedioDeCadaTrabalhador
+        self.tarefasFatiadas = tarefasFatiadas
+        self.orderStrenght = orderStrenght
+        self.alpha_trab = alpha_trab
+        self.beta_trab = beta_trab
+        self.alpha_tar = alpha_tar
+        self.beta_tar = beta_tar
+        self.modo = modo
+        self.cacheHeuristico = cacheHeuristico
+        self.nProcessos = nProcessos
+        self.indiceShift = IndiceShift(grafo,grafoR)
+        self.cacheShift = CacheShift(tamanhoCacheShift) if tamanhoCacheShift > 0 else None
+        self.nFormigasVND = nFormigasVND
+        if nFormigasVND > 0:
+            self.indiceVND = IndiceVND(grafo,tempoTarefaTrabalhador,cacheHeuristico.alcance)
+
+        if semente is not None:
+            random.seed(semente)
+        self.pool = None
+        self.segmento = None
+        self.lotesAbandonados = False #Algum lote do pool não voltou ate o prazo (ainda pode estar rodando)
+        if nProcessos > 1:
+            self.sementeBase = random.getrandbits(32)
+            self.tamanhosLotes = [numeroFormigas//nProcessos + (1 if i < numeroFormigas%nProcessos else 0) for i in range(nProcessos)]
+            dadosProcesso = {'alpha_trab':alpha_trab,'beta_trab':beta_trab,'alpha_tar':alpha_tar,'beta_tar':beta_tar,'modo':modo,'tamanhoCacheShift':tamanhoCacheShift}
+            if memoriaCompartilhada is None:
+                memoriaCompartilhada = modo == 'vetorizado' or multiprocessing.get_start_method() != 'fork'
+            if memoriaCompartilhada:
+                if modo == 'vetorizado' and dadosVetorizados is None:
+                    dadosVetorizados = DadosVetorizados(cacheHeuristico,grafo,precedencia) #Montado uma vez aqui, não em cada processo
+                self.segmento = publicarInstancia((tempoTarefaTrabalhador,grafo,precedencia,lowerBound,C_alvo,tempoMedioDeCadaTrabalhador,tarefasFatiadas,grafoR,orderStrenght),
+                                                  dadosVetorizados if modo == 'vetorizado' else None)
+                dadosProcesso['segmento'] = self.segmento.descritor
+            else:
+                dadosProcesso.update({
+                    'tempoTarefaTrabalhador':tempoTarefaTrabalhador,'grafo':grafo,'grafoR':grafoR,'precedencia':precedencia,'C_alvo':C_alvo,
+                    'tempoMedioDeCadaTrabalhador':tempoMedioDeCadaTrabalhador,'tarefasFatiadas':tarefasFatiadas,'orderStrenght':orderStrenght,
+                    'cacheHeuristico':cacheHeuristico})
+            self.pool = multiprocessing.Pool(nProcessos,initializer=inicializarProcessoColonia,initargs=(dadosProcesso,))
+        elif modo == 'vetorizado':
+            self.dadosVetorizados = dadosVetorizados if dadosVetorizados is not None else DadosVetorizados(cacheHeuristico,grafo,precedencia)
+            self.gerador = np.random.default_rng(random.getrandbits(64)) #Semente vem do random global para manter a reprodutibilidade
+
+        self.feromonioInicial = 100/C_alvo
+        self.feromonio = None
+        if feromonio == 'mmas': #As matrizes da colonia passam a ser os arrays do FeromonioMMAS, atualizados no lugar
+            from feromonio import FeromonioMMAS
+            self.feromonio = FeromonioMMAS(self.numeroTrabalhadores,self.numeroTarefas,self.feromonioInicial)
+            self.feromoniosTE = self.feromonio.te
+            self.feromoniosTarefas = self.feromonio.tarefas
+        else:
+            self.feromoniosTE = [[self.feromonioInicial for _ in range(self.numeroTrabalhadores)] for _ in range(self.numeroTrabalhadores)] #Matriz [Trabalhador][Estacao]
+            self.feromoniosTarefas = [[self.feromonioInicial for _ in range(self.numeroTarefas)] for _ in range(self.numeroTrabalhadores)] #Matriz [Estacao][Tarefa]
+        self.melhorGlobal = math.inf
+        self.iteracoesSemMelhoria = 0
+        self.iteracoesSemMelhoriaMS = 0
+        self.formigas = [Formiga(i,self.numeroTarefas,self.numeroTrabalhadores) for i in range(numeroFormigas)]
+        self.melhorFormigaGlobal = None
+        self.solucaoInicial = math.inf
+        self.nIteracoes = 0
+        self.estatisticas = EstatisticasACO() if estatisticas else None
+        self.prazo = None #Instante (time.time) em que a construção para no meio da colonia; None = sem prazo
+        self.interrompida = False #A ultima iteração parou no prazo
+        self.nConstruidas = numeroFormigas #Formigas completas (construção + shift) da ultima iteração
+        self.melhorIteracao = math.inf
+
+    def construirFormigas(self):
+        #Constroi a colonia inteira e aplica o shift em cada formiga
+        #Com prazo, passou dele: a iteração fica interrompida e as formigas ja construidas (self.formigas[:self.nConstruidas]) continuam
+        #valendo, so sem shift. O modo sequencial confere o relogio antes de cada formiga, o vetorizado a cada passo da construção em
+        #lotes e o paralelo espera os lotes (que tambem param no prazo) ate o prazo mais FOLGA_PRAZO
+        est = self.estatisticas
+        prazo = self.prazo
+        self.nConstruidas = len(self.formigas)
+        self.interrompida = False
+        if est is not None:
+            est.contar('formigas',len(self.formigas))
+            t0 = est.agora()
+        if self.pool is not None: #Cada lote volta ja melhorado pelo shift, so na forma compacta
+            lotes = [(self.tamanhosLotes[i],self.feromoniosTE,self.feromoniosTarefas,f"{self.sementeBase}:{self.nIteracoes}:{i}",prazo) for i in range(self.nProcessos)]
+            pendentes = [self.pool.apply_async(avaliarLoteFormigas,(lote,)) for lote in lotes]
+            resultados = []
+            for pendente in pendentes:
+                try:
+                    lote,contadores = pendente.get(None if prazo is None else max(0.0,prazo-time.time())+FOLGA_PRAZO)
+                except multiprocessing.TimeoutError: #O lote fica para tras; fechar() termina o pool em vez de esperar por ele
+                    self.lotesAbandonados = True
+                    continue
+                resultados.extend(lote)
+                if est is not None:
+                    for nome,quantidade in contadores.items():
+                        est.contar(nome,quantidade)
+            for f,(trabalhadores,estacaoDaTarefa,tempoDeCiclo) in zip(self.formigas,resultados):
+                f.carregarVetores(trabalhadores,estacaoDaTarefa,tempoDeCiclo,self.cacheHeuristico.tempoPenalizado)
+            self.nConstruidas = len(resultados)
+            self.interrompida = self.nConstruidas < len(self.formigas)
+            if est is not None:
+                est.medir('lotesParalelos',t0)
+            return
+
+        construidas = len(self.formigas)
+        if self.modo == 'sequencial': #Feromonio so muda entre iterações, então os scores sao calculados uma vez aqui
+            tabela = TabelaScores(self.cacheHeuristico,self.feromoniosTE,self.feromoniosTarefas,self.alpha_trab,self.beta_trab,self.alpha_tar,self.beta_tar)
+        else:
+            construidas = construirColoniaEmLotes(self.formigas,self.dadosVetorizados,self.feromoniosTE,self.feromoniosTarefas,self.C_alvo,self.alpha_trab,self.beta_trab,self.alpha_tar,self.beta_tar,self.gerador,prazo)
+            if est is not None:
+                t0 = est.medir('construcaoVetorizada',t0)
+        for indice,f in enumerate(self.formigas[:construidas]):
+            if prazo is not None and time.time() > prazo:
+                self.interrompida = True
+                self.nConstruidas = indice if self.modo == 'sequencial' else construidas #No vetorizado as que faltam ja estão construidas
+                return
+            if self.modo == 'sequencial':
+                f.resetar() #Reseta a formiga para a nova iteração
+                alocaTrabalhadoresAEstacoes(f,self.tempoMedioDeCadaTrabalhador,self.feromoniosTE,self.tarefasFatiadas,self.tempoTarefaTrabalhador,self.alpha_trab,self.beta_trab,self.orderStrenght,tabela)
+                if est is not None:
+                    t0 = est.medir('trabalhadores',t0)
+                alocaTarefas(f,self.feromoniosTarefas,self.C_alvo,self.precedencia,self.grafo,self.tempoTarefaTrabalhador,self.alpha_tar,self.beta_tar,tabela)
+                if est is not None:
+                    t0 = est.medir('tarefas',t0)
             #printaSolução(f)
             #Algoritmo de melhoria para a solução de cada formiga entra aqui
-            shift(f,grafo,grafoR,tempoTarefaTrabalhador)
+            if self.cacheShift is not None:
+                self.cacheShift.aplicar(f,self.grafo,self.grafoR,self.tempoTarefaTrabalhador,self.indiceShift,est)
+            else:
+                shift(f,self.grafo,self.grafoR,self.tempoTarefaTrabalhador,self.indiceShift,est)
+            if est is not None:
+                t0 = est.medir('shift',t0)
+        if construidas < len(self.formigas):
+            self.interrompida = True
+            self.nConstruidas = construidas
+        if est is not None and self.cacheShift is not None:
+            est.contadores['cacheShiftAcertos'] = self.cacheShift.acertos
+            est.contadores['cacheShiftFalhas'] = self.cacheShift.falhas
+            est.contadores['cacheShiftDescartes'] = self.cacheShift.descartes
+
+    def iterar(self):
+        est = self.estatisticas
+        if est is not None:
+            est.contar('iteracoes')
+            t0 = est.agora()
+        if self.iteracoesSemMelhoriaMS > 50:
+            if self.feromonio is not None:
+                self.feromonio.reiniciarParcial()
+            else:
+                self.feromoniosTE = [[self.feromonioInicial for _ in range(self.numeroTrabalhadores)] for _ in range(self.numeroTrabalhadores)] #Matriz [Trabalhador][Estacao]
+                self.feromoniosTarefas = [[self.feromonioInicial for _ in range(self.numeroTarefas)] for _ in range(self.numeroTrabalhadores)] #Matriz [Estacao][Tarefa]
+            self.iteracoesSemMelhoriaMS = 0
+            if est is not None:
+                est.contar('reinicios')
+                est.medir('reinicio',t0)
+
+        self.construirFormigas()
+        formigas = self.formigas[:self.nConstruidas] if self.interrompida else self.formigas
+        if not formigas:
+            return
+        if self.nFormigasVND > 0 and not self.interrompida:
+            if est is not None:
+                t0 = est.agora()
+            for f in sorted(self.formigas,key=lambda x:x.tempoDeCiclo)[:self.nFormigasVND]:
+                vnd(f,self.grafo,self.grafoR,self.tempoTarefaTrabalhador,self.indiceVND,self.indiceShift,est)
+            if est is not None:
+                est.medir('vnd',t0)
+        melhorFormigaLocal = None
+        for f in formigas:
             if  melhorFormigaLocal is None or f.tempoDeCiclo < melhorFormigaLocal.tempoDeCiclo:
                 melhorFormigaLocal = f 
+        self.melhorIteracao = melhorFormigaLocal.tempoDeCiclo
 
         #print(melhorFormigaLocal.tempoDeCiclo)
-        if melhorFormigaLocal.tempoDeCiclo < melhorGlobal:
-            #print(f"Solução melhorada de: {melhorGlobal} pra {melhorFormigaLocal.tempoDeCiclo}")
-            melhorGlobal = melhorFormigaLocal.tempoDeCiclo
-            melhorFormigaGlobal = copy.deepcopy(melhorFormigaLocal)
-            iteracoesSemMelhoria = 0
+        if melhorFormigaLocal.tempoDeCiclo < self.melhorGlobal:
+            #print(f"Solução melhorada de: {self.melhorGlobal} pra {melhorFormigaLocal.tempoDeCiclo}")
+            self.melhorGlobal = melhorFormigaLocal.tempoDeCiclo
+            if est is not None:
+                t0 = est.agora()
+            if self.melhorFormigaGlobal is None:
+                self.melhorFormigaGlobal = melhorFormigaLocal.copia()
+            else:
+                self.melhorFormigaGlobal.copiarDe(melhorFormigaLocal)
+            if est is not None:
+                est.contar('melhorias')
+                est.medir('melhorGlobal',t0)
+            self.iteracoesSemMelhoria = 0
         else:
-            iteracoesSemMelhoriaMS += 1
-            iteracoesSemMelhoria += 1
-        if nIteracoes == 0:
-            solucaoInicial = melhorGlobal
-        nIteracoes += 1
+            self.iteracoesSemMelhoriaMS += 1
+            self.iteracoesSemMelhoria += 1
+        if self.nIteracoes == 0:
+            self.solucaoInicial = self.melhorGlobal
+        self.nIteracoes += 1
+        if self.interrompida: #Acabou o tempo: a melhor formiga ja foi aproveitada, o feromonio não importa mais
+            return
         
-        evaporacao(feromoniosTE,feromoniosTarefas)
-        if melhorFormigaGlobal is not None:
-            formigasValidas = [f for f in formigas if f.tempoDeCiclo < math.inf]
+        if est is not None:
+            t0 = est.agora()
+        if self.feromonio is not None:
+            self.feromonio.atualizarLimites(self.melhorGlobal)
+            self.feromonio.evaporar()
+        else:
+            evaporacao(self.feromoniosTE,self.feromoniosTarefas)
+        if est is not None:
+            t0 = est.medir('evaporacao',t0)
+        if self.melhorFormigaGlobal is not None:
+            formigasValidas = [f for f in self.formigas if f.tempoDeCiclo < math.inf]
             formigasValidas.sort(key=lambda x:x.tempoDeCiclo)
-            qtdFormigas = max(1,int(len(formigas)*0.10)) #Pega as 10% melhores formigas
+            qtdFormigas = max(1,int(len(self.formigas)*0.10)) #Pega as 10% melhores formigas
             melhoresFormigas = formigasValidas[:qtdFormigas]
-            depositarFeromonios(melhoresFormigas,feromoniosTE,feromoniosTarefas)
-            
-    return solucaoInicial,melhorGlobal
+            self.depositar(melhoresFormigas)
+            if est is not None:
+                est.medir('deposito',t0)
 
-def exe(nomeArquivo):
-   tempoTarefaTrabalhador,grafo,precedencia,lowerBound,C_alvo,tempoMedioDeCadaTrabalhador, tarefasFatiadas = ler_e_converter_dados(nomeArquivo)
-   return ACO(tempoTarefaTrabalhador,grafo,precedencia,lowerBound,C_alvo,tempoMedioDeCadaTrabalhador,tarefasFatiadas)
+    def depositar(self,formigas):
+        if self.feromonio is not None:
+            self.feromonio.depositar([f.trabalhadores for f in formigas],[f.estacaoDaTarefa for f in formigas],[f.tempoDeCiclo for f in formigas])
+        else:
+            depositarFeromonios(formigas,self.feromoniosTE,self.feromoniosTarefas)
+
+    def misturarFeromonio(self,mediaTE,mediaTarefas,taxa):
+        #Combinação convexa com o feromonio medio de outras colonias: (1 - taxa) * proprio + taxa * media
+        if self.feromonio is not None:
+            self.feromonio.misturar(mediaTE,mediaTarefas,taxa)
+            return
+        self.feromoniosTE = [[(1-taxa)*a + taxa*b for a,b in zip(linhaA,linhaB)] for linhaA,linhaB in zip(self.feromoniosTE,mediaTE)]
+        self.feromoniosTarefas = [[(1-taxa)*a + taxa*b for a,b in zip(linhaA,linhaB)] for linhaA,linhaB in zip(self.feromoniosTarefas,mediaTarefas)]
+
+    def receberSolucao(self,trabalhadores,estacaoDaTarefa,tempoDeCiclo):
+        #Solução vinda de fora (migração entre ilhas). Se for melhor que a da colonia, vira a melhor global e reforça o feromonio
+        if tempoDeCiclo >= self.melhorGlobal:
+            return False
+        migrante = Formiga(-1,self.numeroTarefas,self.numeroTrabalhadores)
+        migrante.carregarVetores(trabalhadores,estacaoDaTarefa,tempoDeCiclo,self.cacheHeuristico.tempoPenalizado)
+        self.melhorGlobal = tempoDeCiclo
+        self.melhorFormigaGlobal = migrante
+        self.iteracoesSemMelhoria = 0
+        self.iteracoesSemMelhoriaMS = 0
+        self.depositar([migrante])
+        return True
+
+    def fechar(self):
+        if self.pool is not None:
+            if self.lotesAbandonados: #Lote que passou do prazo ainda pode estar rodando: não espera por ele
+                self.pool.terminate()
+            else:
+                self.pool.close()
+            self.pool.join()
+            self.pool = None
+        if self.segmento is not None: #So depois do join: nenhum processo usa mais o segmento
+            self.segmento.liberar()
+            self.segmento = None
+
+def iteracoesACO(colonia,lowerBound,nIteracoesSemMelhoria,tempoLimite,arquivoTraco=None,startTime=None):
+    #Laço do ACO como gerador: itera a colonia ate o criterio de parada e gera um evento a cada nova melhor solução,
+    #{'iteracao','tempo','tempoDeCiclo','trabalhadores','estacaoDaTarefa'}, com tempo em segundos desde startTime.
+    #O prazo (startTime + tempoLimite) tambem e conferido dentro da construção, então uma iteração grande não passa do limite.
+    #arquivoTraco: uma linha JSON por iteração {'iteracao','tempo','melhorIteracao','melhorGlobal','interrompida'}
+    if startTime is None:
+        startTime = time.time()
+    colonia.prazo = startTime + tempoLimite
+    traco = open(arquivoTraco,'w',encoding='utf-8') if arquivoTraco else None #Um arquivo por execução (job refeito não mistura traços)
+    try:
+        while((colonia.iteracoesSemMelhoria < nIteracoesSemMelhoria) and (colonia.melhorGlobal > lowerBound)):
+            if time.time() > colonia.prazo:
+                print("Limite de tempo atigindo")
+                break
+            anterior = colonia.melhorGlobal
+            colonia.iterar()
+            decorrido = time.time() - startTime
+            if traco is not None:
+                traco.write(json.dumps({'iteracao':colonia.nIteracoes,'tempo':decorrido,'melhorIteracao':colonia.melhorIteracao,
+                                        'melhorGlobal':colonia.melhorGlobal,'interrompida':colonia.interrompida}) + '\n')
+            if colonia.melhorGlobal < anterior:
+                trabalhadores,estacaoDaTarefa,tempoDeCiclo = colonia.melhorFormigaGlobal.exportarVetores()
+                yield {'iteracao':colonia.nIteracoes,'tempo':decorrido,'tempoDeCiclo':tempoDeCiclo,'trabalhadores':trabalhadores,'estacaoDaTarefa':estacaoDaTarefa}
+            if colonia.interrompida:
+                print("Limite de tempo atigindo")
+                break
+    finally:
+        if traco is not None:
+            traco.close()
+
+def ACOAnytime(tempoTarefaTrabalhador,grafo,precedencia,lowerBound,C_alvo,tempoMedioDeCadaTrabalhador,tarefasFatiadas,grafoR,orderStrenght,alpha_trab, beta_trab, alpha_tar, beta_tar,numeroFormigas=200,nIteracoesSemMelhoria=200,tempoLimite=300,arquivoTraco=None,**opcoes):
+    #Mesmos parametros do ACO (opcoes vai para a ColoniaACO), mas como gerador: cada nova melhor solução sai na hora
+    #(evento de iteracoesACO). Parar de consumir o gerador (break) encerra a colonia
+    colonia = ColoniaACO(tempoTarefaTrabalhador,grafo,precedencia,lowerBound,C_alvo,tempoMedioDeCadaTrabalhador,tarefasFatiadas,grafoR,orderStrenght,alpha_trab,beta_trab,alpha_tar,beta_tar,
+                         numeroFormigas=numeroFormigas,**opcoes)
+    try:
+        yield from iteracoesACO(colonia,lowerBound,nIteracoesSemMelhoria,tempoLimite,arquivoTraco)
+    finally:
+        colonia.fechar()
+
+def ACO(tempoTarefaTrabalhador,grafo,precedencia,lowerBound,C_alvo,tempoMedioDeCadaTrabalhador,tarefasFatiadas,grafoR,orderStrenght,alpha_trab, beta_trab, alpha_tar, beta_tar,numeroFormigas=200,nIteracoesSemMelhoria=200,tempoLimite=300,modo='sequencial',cacheHeuristico=None,nProcessos=1,semente=None,nFormigasVND=0,feromonio='classico',estatisticas=False,arquivoPerfil=None,aoMelhorar=None,arquivoTraco=None,tamanhoCacheShift=0,memoriaCompartilhada=None):
+    #modo, cacheHeuristico, nProcessos, semente, nFormigasVND, feromonio, tamanhoCacheShift e memoriaCompartilhada: ver ColoniaACO
+    #aoMelhorar(evento) e chamado a cada nova melhor solução (evento de iteracoesACO); se devolver True, o ACO para ali
+    #arquivoTraco: grava uma linha JSON por iteração nesse arquivo (ver iteracoesACO)
+    #estatisticas=True devolve (solucaoInicial, melhorGlobal, EstatisticasACO) com tempos e contadores por fase
+    #arquivoPerfil: roda o laço dentro do cProfile e grava o perfil nesse arquivo (abrir com pstats ou snakeviz)
+    startTime = time.time()
+    colonia = ColoniaACO(tempoTarefaTrabalhador,grafo,precedencia,lowerBound,C_alvo,tempoMedioDeCadaTrabalhador,tarefasFatiadas,grafoR,orderStrenght,alpha_trab,beta_trab,alpha_tar,beta_tar,
+                         numeroFormigas=numeroFormigas,modo=modo,cacheHeuristico=cacheHeuristico,nProcessos=nProcessos,semente=semente,nFormigasVND=nFormigasVND,feromonio=feromonio,estatisticas=estatisticas,tamanhoCacheShift=tamanhoCacheShift,
+                         memoriaCompartilhada=memoriaCompartilhada)
+    perfil = cProfile.Profile() if arquivoPerfil is not None else None
+    eventos = iteracoesACO(colonia,lowerBound,nIteracoesSemMelhoria,tempoLimite,arquivoTraco,startTime)
+    try:
+        if perfil is not None:
+            perfil.enable()
+        for evento in eventos:
+            if aoMelhorar is not None and aoMelhorar(evento): #Quem chamou ja achou bom o bastante
+                break
+    finally:
+        eventos.close()
+        if perfil is not None:
+            perfil.disable()
+            perfil.dump_stats(arquivoPerfil)
+        colonia.fechar()
+
+    if colonia.estatisticas is not None:
+        colonia.estatisticas.tempoTotal = time.time() - startTime
+        return colonia.solucaoInicial,colonia.melhorGlobal,colonia.estatisticas
+    return colonia.solucaoInicial,colonia.melhorGlobal
+
+PARAMETROS_ACO = ('alpha_trab','beta_trab','alpha_tar','beta_tar','numeroFormigas','nIteracoesSemMelhoria') #Os que o calibracao.py ajusta
+
+def carregarParametros(arquivo,classe):
+    #Parametros de uma classe de instancias no arquivo JSON do calibracao.py ({classe: {parametro: valor}}), prontos para
+    #ACO/ACOInstancia(..., **parametros). Classe ausente cai na entrada 'padrao'; sem nenhuma das duas devolve {}
+    with open(arquivo,encoding='utf-8') as f:
+        todos = json.load(f)
+    parametros = todos.get(classe,todos.get('padrao',{}))
+    return {nome: parametros[nome] for nome in PARAMETROS_ACO if nome in parametros}
+
+def ACOInstancia(dados,alpha_trab=1,beta_trab=2,alpha_tar=1,beta_tar=3,**opcoes):
+    #ACO direto de uma InstanciaACO (opcoes vai para o ACO). Tudo que a execução usa vem de dados, então varias chamadas
+    #podem rodar juntas (ThreadPoolExecutor, asyncio.to_thread) com instancias diferentes. O sorteio usa o random global:
+    #execuções concorrentes são validas mas não reproduziveis pela semente
+    opcoes.setdefault('cacheHeuristico',dados.cacheHeuristico)
+    return ACO(*dados[:9],alpha_trab,beta_trab,alpha_tar,beta_tar,**opcoes)
+
+def exe(nomeArquivo,alpha_trab=1,beta_trab=2,alpha_tar=1,beta_tar=3):
+   tempoTarefaTrabalhador,grafo,precedencia,lowerBound,C_alvo,tempoMedioDeCadaTrabalhador,tarefasFatiadas,grafoR,orderStrenght,cacheHeuristico = ler_e_converter_dados(nomeArquivo)
+   return ACO(tempoTarefaTrabalhador,grafo,precedencia,lowerBound,C_alvo,tempoMedioDeCadaTrabalhador,tarefasFatiadas,grafoR,orderStrenght,alpha_trab,beta_trab,alpha_tar,beta_tar,cacheHeuristico=cacheHeuristico)
+
+def solucaoACO(nomeArquivo,tempoLimite,nIteracoesSemMelhoria=50,numeroFormigas=100,alpha_trab=1,beta_trab=2,alpha_tar=1,beta_tar=3):
+    #Mesmo laço do ACO, mas devolve a melhor formiga na forma compacta para os solvers exatos (incumbente / MIP start)
+    #Retorna (tempoDeCiclo, trabalhadores, estacaoDaTarefa) ou None
+    dados = ler_e_converter_dados(nomeArquivo)
+    if not dados:
+        return None
+    tempoTarefaTrabalhador,grafo,precedencia,lowerBound,C_alvo,tempoMedioDeCadaTrabalhador,tarefasFatiadas,grafoR,orderStrenght,cacheHeuristico = dados
+    colonia = ColoniaACO(tempoTarefaTrabalhador,grafo,precedencia,lowerBound,C_alvo,tempoMedioDeCadaTrabalhador,tarefasFatiadas,grafoR,orderStrenght,alpha_trab,beta_trab,alpha_tar,beta_tar,
+                         numeroFormigas=numeroFormigas,cacheHeuristico=cacheHeuristico)
+    try:
+        for _ in iteracoesACO(colonia,lowerBound,nIteracoesSemMelhoria,tempoLimite): #Prazo rigido: o solver exato conta com esse tempo
+            pass
+    finally:
+        colonia.fechar()
+    if colonia.melhorFormigaGlobal is None:
+        return None
+    trabalhadores,estacaoDaTarefa,tempoDeCiclo = colonia.melhorFormigaGlobal.exportarVetores()
+    return tempoDeCiclo,trabalhadores,estacaoDaTarefa
 
 if __name__ == "__main__":
     nome_do_arquivo = 'instancias/wee/51_wee'
     dados = ler_e_converter_dados(nome_do_arquivo)
 
     if dados:
-        tempoTarefaTrabalhador, grafo, precedencia, lowerBound, tempoMedio, tempoMedioDeCadaTrabalhador,tarefasFatiadas,grafoR,orderStrenght = dados
+        tempoTarefaTrabalhador, grafo, precedencia, lowerBound, tempoMedio, tempoMedioDeCadaTrabalhador,tarefasFatiadas,grafoR,orderStrenght,cacheHeuristico = dados
         print(f"Iniciando ACO isolado... LB={lowerBound}")
         alpha_trab = 1
         beta_trab = 2
         alpha_tarefa = 1
         beta_tarefa = 3
-        res = ACO(tempoTarefaTrabalhador, grafo, precedencia, lowerBound, tempoMedio, tempoMedioDeCadaTrabalhador,tarefasFatiadas,grafoR,alpha_trab,beta_trab,alpha_tarefa,beta_tarefa,orderStrenght)
+        res = ACO(tempoTarefaTrabalhador, grafo, precedencia, lowerBound, tempoMedio, tempoMedioDeCadaTrabalhador,tarefasFatiadas,grafoR,orderStrenght,alpha_trab,beta_trab,alpha_tarefa,beta_tarefa,cacheHeuristico=cacheHeuristico)
         print(f"Resultado Final: {res}")
 
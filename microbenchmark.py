@@ -0,0 +1,217 @@
+import os
+import sys
+import json
+import time
+import random
+import platform
+import statistics
+
+import main
+
+# Microbenchmark dos kernels do main.py: cada kernel roda isolado, com as mesmas instâncias e as mesmas sementes,
+# e o tempo por chamada é comparado com a linha de base guardada em JSON. Só a chamada do kernel é cronometrada;
+# a preparação (formiga zerada, matrizes restauradas, sorteio re-semeado) fica fora do relógio.
+
+ARQUIVO_BASELINE = 'baseline_kernels.json' # {"<kernel>@<instancia>": {"segundos": ..., ...}}; vale só para a máquina em que foi gravado
+INSTANCIAS_PADRAO = ('instancias/wee/51_wee',) # Mesma instância do main.py isolado
+LIMIAR_REGRESSAO = 0.10 # Kernel mais de 10% mais lento que a linha de base é regressão
+N_RODADAS = 7 # O tempo do kernel é a melhor rodada (a menos perturbada pelo resto da máquina)
+TEMPO_MINIMO_RODADA = 0.05 # Segundos cronometrados por rodada: kernels rápidos são chamados várias vezes
+SEMENTE = 12345
+N_FORMIGAS = 20 # Formigas prontas usadas pelo shift e pelo depósito
+ALPHA_TRAB, BETA_TRAB, ALPHA_TAR, BETA_TAR = 1.0, 3.0, 1.0, 2.0 # Os parâmetros padrão do benchmark
+
+def _colonia_inicial(dados):
+    # Feromônio inicial e tabela de scores exatamente como a ColoniaACO sequencial monta
+    feromonio_inicial = 100 / dados.C_alvo
+    feromonios_te = [[feromonio_inicial] * dados.numeroTrabalhadores for _ in range(dados.numeroTrabalhadores)]
+    feromonios_tarefas = [[feromonio_inicial] * dados.numeroTarefas for _ in range(dados.numeroTrabalhadores)]
+    tabela = main.TabelaScores(dados.cacheHeuristico, feromonios_te, feromonios_tarefas, ALPHA_TRAB, BETA_TRAB, ALPHA_TAR, BETA_TAR)
+    return feromonios_te, feromonios_tarefas, tabela
+
+def _construir(formiga, dados, feromonios_te, feromonios_tarefas, tabela):
+    formiga.resetar()
+    main.alocaTrabalhadoresAEstacoes(formiga, dados.tempoMedioDeCadaTrabalhador, feromonios_te, dados.tarefasFatiadas, dados.tempoTarefaTrabalhador,
+                                     ALPHA_TRAB, BETA_TRAB, dados.orderStrenght, tabela)
+    main.alocaTarefas(formiga, feromonios_tarefas, dados.C_alvo, dados.precedencia, dados.grafo, dados.tempoTarefaTrabalhador, ALPHA_TAR, BETA_TAR, tabela)
+
+def _formigas_prontas(dados, feromonios_te, feromonios_tarefas, tabela):
+    formigas = []
+    for i in range(N_FORMIGAS):
+        random.seed(SEMENTE + i)
+        formiga = main.Formiga(i, dados.numeroTarefas, dados.numeroTrabalhadores)
+        _construir(formiga, dados, feromonios_te, feromonios_tarefas, tabela)
+        formigas.append(formiga)
+    return formigas
+
+# Cada kernel recebe (caminho, dados) e devolve (preparar(i), executar()): preparar deixa o estado da i-ésima chamada pronto
+# (a mesma em todas as rodadas) e executar é a chamada cronometrada.
+
+def kernel_ler_e_converter_dados(caminho, dados):
+    return (lambda i: None), (lambda: main.ler_e_converter_dados(caminho))
+
+def kernel_calcular_order_strength(caminho, dados):
+    # O fechamento transitivo (Alcance) entra no relógio: é ele que domina o cálculo do OS, a contagem de bits sozinha não diz nada
+    ordem = main.ordenaTopologicamente(dados.grafo, list(dados.precedencia))
+    return (lambda i: None), (lambda: main.calcular_order_strength(main.Alcance(dados.grafo, ordem)))
+
+def kernel_alocaTrabalhadoresAEstacoes(caminho, dados):
+    feromonios_te, _, tabela = _colonia_inicial(dados)
+    formiga = main.Formiga(0, dados.numeroTarefas, dados.numeroTrabalhadores)
+    def preparar(i):
+        random.seed(SEMENTE + i)
+        formiga.resetar()
+    def executar():
+        main.alocaTrabalhadoresAEstacoes(formiga, dados.tempoMedioDeCadaTrabalhador, feromonios_te, dados.tarefasFatiadas, dados.tempoTarefaTrabalhador,
+                                         ALPHA_TRAB, BETA_TRAB, dados.orderStrenght, tabela)
+    return preparar, executar
+
+def kernel_alocaTarefas(caminho, dados):
+    feromonios_te, feromonios_tarefas, tabela = _colonia_inicial(dados)
+    formiga = main.Formiga(0, dados.numeroTarefas, dados.numeroTrabalhadores)
+    def preparar(i):
+        random.seed(SEMENTE + i)
+        formiga.resetar()
+        main.alocaTrabalhadoresAEstacoes(formiga, dados.tempoMedioDeCadaTrabalhador, feromonios_te, dados.tarefasFatiadas, dados.tempoTarefaTrabalhador,
+                                         ALPHA_TRAB, BETA_TRAB, dados.orderStrenght, tabela)
+    def executar():
+        main.alocaTarefas(formiga, feromonios_tarefas, dados.C_alvo, dados.precedencia, dados.grafo, dados.tempoTarefaTrabalhador, ALPHA_TAR, BETA_TAR, tabela)
+    return preparar, executar
+
+def kernel_shift(caminho, dados):
+    prontas = _formigas_prontas(dados, *_colonia_inicial(dados))
+    formiga = main.Formiga(0, dados.numeroTarefas, dados.numeroTrabalhadores)
+    indice = main.IndiceShift(dados.grafo, dados.grafoR) # Reaproveitado entre formigas, como na colônia
+    def preparar(i):
+        formiga.copiarDe(prontas[i % len(prontas)])
+    def executar():
+        main.shift(formiga, dados.grafo, dados.grafoR, dados.tempoTarefaTrabalhador, indice)
+    return preparar, executar
+
+def _restaurador(*matrizes):
+    # preparar(i) que devolve as matrizes de feromônio aos valores atuais: sem isso elas decairiam (ou cresceriam)
+    # chamada após chamada, e a evaporação acabaria medindo números subnormais
+    iniciais = [[linha[:] for linha in matriz] for matriz in matrizes]
+    def preparar(i):
+        for matriz, inicial in zip(matrizes, iniciais):
+            for linha, valores in zip(matriz, inicial):
+                linha[:] = valores
+    return preparar
+
+def kernel_evaporacao(caminho, dados):
+    feromonios_te, feromonios_tarefas, _ = _colonia_inicial(dados)
+    return _restaurador(feromonios_te, feromonios_tarefas), (lambda: main.evaporacao(feromonios_te, feromonios_tarefas))
+
+def kernel_depositarFeromonios(caminho, dados):
+    feromonios_te, feromonios_tarefas, tabela = _colonia_inicial(dados)
+    prontas = _formigas_prontas(dados, feromonios_te, feromonios_tarefas, tabela)
+    return _restaurador(feromonios_te, feromonios_tarefas), (lambda: main.depositarFeromonios(prontas, feromonios_te, feromonios_tarefas))
+
+KERNELS = {nome[len('kernel_'):]: funcao for nome, funcao in list(globals().items()) if nome.startswith('kernel_')}
+
+def medir(preparar, executar, n_rodadas=N_RODADAS):
+    """
+    Tempo por chamada (segundos) de executar: melhor rodada e mediana das rodadas.
+    O número de chamadas por rodada dobra até a rodada somar TEMPO_MINIMO_RODADA cronometrados; toda rodada repete as
+    mesmas chamadas (preparar(0), preparar(1), ...), então todas medem o mesmo trabalho.
+    """
+    def rodada(n):
+        total = 0.0
+        for i in range(n):
+            preparar(i)
+            inicio = time.perf_counter()
+            executar()
+            total += time.perf_counter() - inicio
+        return total
+
+    n = 1
+    while rodada(n) < TEMPO_MINIMO_RODADA and n < 2 ** 20: # Também aquece caches e o cache binário da instância
+        n *= 2
+    tempos = [rodada(n) / n for _ in range(n_rodadas)]
+    return min(tempos), statistics.median(tempos), n
+
+def rodar_kernels(instancias=INSTANCIAS_PADRAO, kernels=None, n_rodadas=N_RODADAS):
+    """
+    Mede cada kernel (chaves de KERNELS, padrão todos) em cada instância.
+    Retorna: {"<kernel>@<instancia>": {'segundos': melhor rodada, 'mediana': ..., 'chamadas': chamadas por rodada}}
+    """
+    resultados = {}
+    for caminho in instancias:
+        dados = main.ler_e_converter_dados(caminho)
+        if not dados:
+            continue
+        nome_instancia = os.path.basename(caminho)
+        for kernel in (kernels or KERNELS):
+            preparar, executar = KERNELS[kernel](caminho, dados)
+            melhor, mediana, chamadas = medir(preparar, executar, n_rodadas)
+            resultados[f"{kernel}@{nome_instancia}"] = {'segundos': melhor, 'mediana': mediana, 'chamadas': chamadas}
+            print(f" > {kernel:<28} {nome_instancia:<14} {melhor * 1e6:12.1f} us  (mediana {mediana * 1e6:.1f} us, {chamadas} chamadas/rodada)", flush=True)
+    return resultados
+
+def carregar_baseline(arquivo_baseline=ARQUIVO_BASELINE):
+    if not os.path.exists(arquivo_baseline):
+        return {}
+    with open(arquivo_baseline, encoding='utf-8') as f:
+        return json.load(f)
+
+def gravar_baseline(resultados, arquivo_baseline=ARQUIVO_BASELINE):
+    # Atualiza só as chaves medidas; kernels/instâncias que não rodaram agora ficam como estavam
+    baseline = carregar_baseline(arquivo_baseline)
+    maquina = {'python': platform.python_version(), 'processador': platform.processor() or platform.machine(), 'data': time.strftime('%Y-%m-%d %H:%M:%S')}
+    for chave, resultado in resultados.items():
+        baseline[chave] = dict(resultado, **maquina)
+    with open(arquivo_baseline, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+
+def comparar(resultados, baseline, limiar=LIMIAR_REGRESSAO):
+    """
+    Compara o tempo de cada kernel com a linha de base. Chave sem linha de base não conta como regressão.
+    Retorna a lista de regressões [(chave, segundos na baseline, segundos agora)].
+    """
+    regressoes = []
+    for chave, resultado in resultados.items():
+        if chave not in baseline:
+            print(f"   {chave}: sem linha de base")
+            continue
+        antes, agora = baseline[chave]['segundos'], resultado['segundos']
+        variacao = 100 * (agora - antes) / antes if antes > 0 else 0.0
+        regrediu = agora > antes * (1 + limiar)
+        print(f"   {chave:<44} {antes * 1e6:12.1f} -> {agora * 1e6:12.1f} us ({variacao:+.1f}%){'  REGRESSÃO' if regrediu else ''}")
+        if regrediu:
+            regressoes.append((chave, antes, agora))
+    return regressoes
+
+if __name__ == "__main__":
+    # python microbenchmark.py : mede e compara com baseline_kernels.json (código de saída 1 se algum kernel regrediu)
+    # python microbenchmark.py --gravar : mede e grava (ou atualiza) a linha de base
+    # Opções: --instancias=a,b  --kernels=shift,evaporacao  --limiar=0.15  --rodadas=7  --baseline=arquivo.json
+    instancias, kernels = INSTANCIAS_PADRAO, None
+    limiar, n_rodadas, arquivo_baseline = LIMIAR_REGRESSAO, N_RODADAS, ARQUIVO_BASELINE
+    for argumento in sys.argv[1:]:
+        if argumento.startswith('--instancias='):
+            instancias = argumento.split('=', 1)[1].split(',')
+        if argumento.startswith('--kernels='):
+            kernels = argumento.split('=', 1)[1].split(',')
+        if argumento.startswith('--limiar='):
+            limiar = float(argumento.split('=', 1)[1])
+        if argumento.startswith('--rodadas='):
+            n_rodadas = int(argumento.split('=', 1)[1])
+        if argumento.startswith('--baseline='):
+            arquivo_baseline = argumento.split('=', 1)[1]
+    desconhecidos = [kernel for kernel in kernels or () if kernel not in KERNELS]
+    if desconhecidos:
+        print(f"Kernels desconhecidos: {', '.join(desconhecidos)} (disponíveis: {', '.join(KERNELS)})")
+        sys.exit(2)
+
+    print(f"--- MICROBENCHMARK DOS KERNELS | {len(instancias)} instâncias | melhor de {n_rodadas} rodadas ---")
+    resultados = rodar_kernels(instancias, kernels, n_rodadas)
+    if '--gravar' in sys.argv:
+        gravar_baseline(resultados, arquivo_baseline)
+        print(f"\n--- Linha de base gravada em '{arquivo_baseline}' ---")
+        sys.exit(0)
+    print(f"\n--- Comparação com '{arquivo_baseline}' (limiar {limiar * 100:.0f}%) ---")
+    regressoes = comparar(resultados, carregar_baseline(arquivo_baseline), limiar)
+    if regressoes:
+        print(f"\n--- {len(regressoes)} kernel(s) regrediram ---")
+        sys.exit(1)
+    print("\n--- Nenhuma regressão ---")
@@ -0,0 +1,293 @@
+import math
+import time
+
+import instancia
+
+BIG_M = 1000000 # Mesmo 'Inf' do solver_gurobi: tempo >= BIG_M conta como trabalhador incapaz
+
+class _TempoEsgotado(Exception):
+    pass
+
+class BranchAndBound:
+    """
+    Busca exata em profundidade orientada por estações para o ALWABP.
+    Para um tempo de ciclo C fixo, preenche as estações em ordem: escolhe um trabalhador livre e uma carga
+    maximal (nenhuma tarefa disponível ainda caberia) para ele. Estados parciais (tarefas feitas, trabalhadores usados)
+    que já falharam com um C maior ou igual são descartados. O ótimo sai de C = limite superior - 1 para baixo.
+    """
+    def __init__(self, n, k, t, G):
+        self.n = n
+        self.k = k
+        # Tarefas renumeradas pela ordem topologica: predecessor sempre tem indice menor
+        sucessores = [[j for j in range(n) if G[i][j]] for i in range(n)]
+        ordem = instancia.ordenaTopologicamente(sucessores, [sum(G[i][j] for i in range(n)) for j in range(n)]) # ValueError se houver ciclo
+        self.ordem = ordem # posicao -> tarefa original
+        posicao = [0]*n
+        for p, i in enumerate(ordem):
+            posicao[i] = p
+        self.predecessores = [0]*n # Mascara dos pais diretos, ja na numeração nova
+        self.filhos = [[] for _ in range(n)]
+        for i in range(n):
+            for j in sucessores[i]:
+                self.predecessores[posicao[j]] |= 1 << posicao[i]
+                self.filhos[posicao[i]].append(posicao[j])
+        self.tempo = [[math.inf if t[i][w] >= BIG_M else t[i][w] for w in range(k)] for i in ordem] #Matriz [Tarefa][Trabalhador]
+        self.todas = (1 << n) - 1
+        self.capazes = [sum(1 << i for i in range(n) if self.tempo[i][w] < math.inf) for w in range(k)] #Mascara das tarefas que cada trabalhador sabe fazer
+        self.porTempo = [sorted(range(k), key=lambda w: self.tempo[i][w]) for i in range(n)] #Trabalhadores do mais rapido ao mais lento em cada tarefa
+
+        # Trabalhadores com a mesma coluna de tempos sao intercambiaveis: so o de menor indice livre e tentado
+        self.equivalente = [w for w in range(k)]
+        for w in range(k):
+            for v in range(w):
+                if all(self.tempo[i][w] == self.tempo[i][v] for i in range(n)):
+                    self.equivalente[w] = self.equivalente[v]
+                    break
+
+        menores = [min(linha) for linha in self.tempo]
+        if math.inf in menores:
+            self.limiteInferior = math.inf # Tarefa que ninguem sabe fazer: instancia inviavel
+        else:
+            self.limiteInferior = max(math.ceil(sum(menores) / k), max(menores)) if n else 0
+        self.melhorCiclo = math.inf
+        self.melhorSolucao = None # (trabalhador de cada estação, estação de cada tarefa original)
+        self.falhas = {} # (tarefas feitas, trabalhadores usados) -> maior C em que o estado falhou
+        self.nos = 0
+        self.prazo = math.inf
+
+    def _verificarTempo(self):
+        self.nos += 1
+        if self.nos & 1023 == 0 and time.time() > self.prazo:
+            raise _TempoEsgotado()
+
+    def _limitePassa(self, feitas, usados, C):
+        # Cada tarefa restante precisa de algum trabalhador livre capaz dentro de C, e a soma dos menores tempos cabe nas estações restantes
+        # Tarefa que so um trabalhador livre sabe fazer vai para a estação dele: essas cargas tambem precisam caber em C
+        soma = 0
+        limite = (self.k - bin(usados).count('1')) * C
+        exclusivas = {}
+        restantes = self.todas & ~feitas
+        tempo = self.tempo
+        while restantes:
+            bit = restantes & -restantes
+            i = bit.bit_length() - 1
+            restantes ^= bit
+            linha = tempo[i]
+            menor = math.inf
+            capazesLivres = 0
+            for w in self.porTempo[i]:
+                if (usados >> w) & 1:
+                    continue
+                if linha[w] == math.inf:
+                    break
+                if capazesLivres == 0:
+                    menor, unico = linha[w], w
+                capazesLivres += 1
+                if capazesLivres > 1:
+                    break
+            if menor > C:
+                return False
+            soma += menor
+            if soma > limite:
+                return False
+            if capazesLivres == 1:
+                exclusivas[unico] = exclusivas.get(unico, 0) + menor
+                if exclusivas[unico] > C:
+                    return False
+        return True
+
+    def _cargasMaximais(self, feitas, w, C):
+        # Enumera cargas maximais para o trabalhador w: tarefas adicionadas em ordem topologica crescente (cada conjunto sai uma vez)
+        tempo = self.tempo
+        predecessores = self.predecessores
+        filhos = self.filhos
+        capazes = self.capazes[w]
+
+        def gerar(carga, feitasAgora, disponiveis, ultimo):
+            # disponiveis: mascara das tarefas livres (pais feitos) que w sabe fazer
+            self._verificarTempo()
+            estendeu = False
+            candidatas = disponiveis >> (ultimo + 1) << (ultimo + 1)
+            while candidatas:
+                bit = candidatas & -candidatas
+                candidatas ^= bit
+                i = bit.bit_length() - 1
+                novaCarga = carga + tempo[i][w]
+                if novaCarga > C:
+                    continue
+                estendeu = True
+                novasFeitas = feitasAgora | bit
+                novasDisponiveis = disponiveis ^ bit
+                for j in filhos[i]:
+                    if (capazes >> j) & 1 and predecessores[j] & ~novasFeitas == 0:
+                        novasDisponiveis |= 1 << j
+                yield from gerar(novaCarga, novasFeitas, novasDisponiveis, i)
+            if estendeu:
+                return
+            # Maximal so se nenhuma tarefa anterior ao ultimo tambem couber
+            anteriores = disponiveis & ((1 << max(ultimo, 0)) - 1)
+            while anteriores:
+                bit = anteriores & -anteriores
+                anteriores ^= bit
+                if carga + tempo[bit.bit_length() - 1][w] <= C:
+                    return
+            yield feitasAgora, carga
+
+        disponiveis = 0
+        restantes = self.todas & ~feitas & capazes
+        while restantes:
+            bit = restantes & -restantes
+            restantes ^= bit
+            if predecessores[bit.bit_length() - 1] & ~feitas == 0:
+                disponiveis |= bit
+        yield from gerar(0, feitas, disponiveis, -1)
+
+    def _viavel(self, feitas, usados, estacao, C, caminho):
+        self._verificarTempo()
+        if feitas == self.todas:
+            return True
+        if estacao == self.k:
+            return False
+        chave = (feitas, usados)
+        if self.falhas.get(chave, -1) >= C:
+            return False
+        if not self._limitePassa(feitas, usados, C):
+            self.falhas[chave] = C
+            return False
+        tentados = set()
+        for w in range(self.k):
+            if (usados >> w) & 1 or self.equivalente[w] in tentados:
+                continue
+            tentados.add(self.equivalente[w])
+            for novasFeitas, carga in self._cargasMaximais(feitas, w, C):
+                caminho.append((w, novasFeitas & ~feitas, carga))
+                if self._viavel(novasFeitas, usados | (1 << w), estacao + 1, C, caminho):
+                    return True
+                caminho.pop()
+        self.falhas[chave] = C
+        return False
+
+    def _guardarSolucao(self, caminho):
+        trabalhadores = [w for w, _, _ in caminho]
+        usados = set(trabalhadores)
+        trabalhadores += [w for w in range(self.k) if w not in usados] # Estações vazias no fim ficam com quem sobrou
+        estacaoDaTarefa = [0]*self.n
+        for s, (_, tarefas, _) in enumerate(caminho):
+            for p in range(self.n):
+                if (tarefas >> p) & 1:
+                    estacaoDaTarefa[self.ordem[p]] = s
+        self.melhorCiclo = max((carga for _, _, carga in caminho), default=0)
+        self.melhorSolucao = (trabalhadores, estacaoDaTarefa)
+
+    def aceitarSolucao(self, trabalhadores, estacaoDaTarefa):
+        """
+        Usa uma solução externa (ex.: a melhor formiga do ACO) como incumbente, se for viável.
+        trabalhadores: trabalhador de cada estação; estacaoDaTarefa: estação de cada tarefa (numeração original).
+        """
+        if sorted(trabalhadores) != list(range(self.k)) or len(estacaoDaTarefa) != self.n:
+            return False
+        cargas = [0]*self.k
+        for p, i in enumerate(self.ordem):
+            s = estacaoDaTarefa[i]
+            if not 0 <= s < self.k:
+                return False
+            cargas[s] += self.tempo[p][trabalhadores[s]]
+            pais = self.predecessores[p]
+            while pais:
+                bit = pais & -pais
+                pais ^= bit
+                if estacaoDaTarefa[self.ordem[bit.bit_length() - 1]] > s:
+                    return False
+        ciclo = max(cargas)
+        if ciclo == math.inf or ciclo >= self.melhorCiclo:
+            return False
+        self.melhorCiclo = ciclo
+        self.melhorSolucao = (list(trabalhadores), list(estacaoDaTarefa))
+        return True
+
+    def resolver(self, time_limit, limite_superior=None):
+        """
+        limite_superior: valor conhecido (ex.: do ACO). Serve de primeiro C; a solução e sempre reconstruída pela busca.
+        Com um incumbente já aceito (aceitarSolucao), a busca começa abaixo dele.
+        Retorna: (ObjVal, Runtime, Status, Gap) no mesmo formato de solver_gurobi.construir_e_resolver_modelo
+        """
+        inicio = time.time()
+        self.prazo = inicio + time_limit
+        if self.melhorSolucao is not None:
+            limite_superior = self.melhorCiclo - 1 if limite_superior is None else min(limite_superior, self.melhorCiclo - 1)
+        # Sem limite do ACO, começa pelo ciclo trivial: cada tarefa no seu trabalhador mais lento capaz
+        trivial = sum(max((x for x in linha if x < math.inf), default=0) for linha in self.tempo)
+        usarLimite = limite_superior is not None and limite_superior < trivial
+        C = math.floor(limite_superior) if usarLimite else trivial
+        if self.melhorSolucao is None:
+            C = max(C, self.limiteInferior) # Limite abaixo do LB (solução penalizada do ACO) ainda precisa achar alguma solução
+        try:
+            while C >= self.limiteInferior:
+                caminho = []
+                if self._viavel(0, 0, 0, C, caminho):
+                    self._guardarSolucao(caminho)
+                    C = self.melhorCiclo - 1
+                    continue
+                self.limiteInferior = C + 1 # Provado: nenhuma solução com ciclo <= C
+                if self.melhorSolucao is not None or not usarLimite:
+                    break
+                # O valor do ACO veio de uma solução penalizada (trabalhador incapaz): segue a partir do ciclo trivial
+                usarLimite = False
+                C = trivial
+        except _TempoEsgotado:
+            pass
+        if self.melhorSolucao is None:
+            return float('inf'), time.time() - inicio, "SemSolucao", 0.0
+        if self.melhorCiclo <= self.limiteInferior:
+            return self.melhorCiclo, time.time() - inicio, "OTIMO", 0.0
+        gap = 100 * (self.melhorCiclo - self.limiteInferior) / self.melhorCiclo # Em porcentagem, como o MIPGap do Gurobi
+        return self.melhorCiclo, time.time() - inicio, "LIMIT_TEMPO", gap
+
+def construir_e_resolver_bb(n, k, t, G, time_limit, limite_superior=None, solucao_inicial=None):
+    """
+    Mesma entrada de solver_gurobi.construir_e_resolver_modelo (t com BIG_M ou math.inf para 'Inf', G matriz de adjacência).
+    solucao_inicial: (trabalhador de cada estação, estação de cada tarefa), usada como incumbente se for viável.
+    Retorna: (ObjVal, Runtime, Status, Gap)
+    """
+    bb = BranchAndBound(n, k, t, G)
+    if solucao_inicial is not None:
+        bb.aceitarSolucao(*solucao_inicial)
+    return bb.resolver(time_limit, limite_superior)
+
+def resolver_bb(caminho_arquivo, time_limit=3600, tempo_aco=None):
+    """
+    Função Wrapper: Lê o arquivo, roda o ACO para ter um incumbente/limite superior e chama o branch-and-bound.
+    tempo_aco: segundos do ACO (padrão 10% do time_limit, no máximo 30); 0 desliga o ACO.
+    O Runtime devolvido inclui o tempo do ACO.
+    """
+    inicio = time.time()
+    try:
+        with instancia.carregarInstancia(caminho_arquivo) as dados:
+            n, k = dados.n, dados.k
+            t = dados.matrizTempos(math.inf)
+            G = [[0 for _ in range(n)] for _ in range(n)]
+            for tarefa_i, filhos in enumerate(dados.sucessores()):
+                for tarefa_j in filhos:
+                    G[tarefa_i][tarefa_j] = 1
+    except Exception as e:
+        print(f"Erro na leitura do arquivo {caminho_arquivo}: {e}")
+        return float('inf'), 0, "ErroLeitura", 0.0
+
+    if tempo_aco is None:
+        tempo_aco = min(30, time_limit * 0.1)
+    if tempo_aco > 0:
+        from main import solucaoACO
+        aco = solucaoACO(caminho_arquivo, tempo_aco)
+    else:
+        aco = None
+    limite_superior, solucao_inicial = (aco[0], aco[1:]) if aco else (None, None)
+
+    restante = max(0.0, time_limit - (time.time() - inicio))
+    obj, _, status, gap = construir_e_resolver_bb(n, k, t, G, restante, limite_superior, solucao_inicial)
+    return obj, time.time() - inicio, status, gap
+
+if __name__ == "__main__":
+    arquivo_teste = "instancias/hes/1_hes"
+    print(f"Testando branch-and-bound com {arquivo_teste}...")
+    res = resolver_bb(arquivo_teste, time_limit=10)
+    print(f"Resultado: {res}")
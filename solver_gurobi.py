@@ -1,135 +1,73 @@
 import gurobipy as gp
 from gurobipy import Model, GRB
 
-def ler_instancia_alwabp(caminho_arquivo):
+from formulacao import ler_instancia_alwabp, ler_alcance_alwabp, montar_classico, montar_apertado, montar_modelo
+from solver_mip import aquecer_com_aco, comparar_formulacoes as comparar_formulacoes_mip
+
+THREADS_GUROBI = 4 # Threads reservadas por resolução (benchmark.THREADS_GUROBI precisa acompanhar este valor)
+
+def configurar_modelo(nome, time_limit, threads=THREADS_GUROBI):
+    modelo = Model(nome)
+    
+    # Configurações do Solver
+    modelo.setParam('OutputFlag', 0)         # 0 = Silencioso, 1 = Verboso
+    modelo.setParam('TimeLimit', time_limit) # Tempo máximo em segundos
+    modelo.setParam('Threads', threads)
+    return modelo
+
+def traduzir_modelo(mip, time_limit, threads=THREADS_GUROBI):
     """
-    Lê o arquivo de texto e estrutura os dados.
-    Retorna: n (tarefas), k (trabalhadores), t (matriz tempos), G (matriz adjacência)
+    Constrói o modelo do Gurobi a partir de um formulacao.ModeloMIP (tipos e sentidos já usam as letras do Gurobi).
+    Retorna o modelo do Gurobi, ainda sem otimizar.
     """
-    t = [] # Matriz de tempos (N x K)
-    G = [] # Matriz de Adjacência (N x N)
-    n = 0
-    k = 0
-    
-    try:
-        with open(caminho_arquivo, 'r') as f:
-            # Lê número de tarefas
-            linha = f.readline()
-            if not linha: return 0, 0, [], []
-            n = int(linha.strip())
-
-            # Inicializa grafo vazio
-            G = [[0 for _ in range(n)] for _ in range(n)]
-
-            # Lê primeira linha de tempos para descobrir K (número de trabalhadores)
-            linha = f.readline().strip()
-            partes = linha.split()
-            k = len(partes)
-            
-            BIG_M = 1000000 
-
-            def processar_tempo(valor):
-                if valor == "Inf": return BIG_M
-                return int(valor)
-
-            # Adiciona primeira linha de tempos
-            t.append([processar_tempo(x) for x in partes])
-            
-            # Lê o restante das tarefas
-            for _ in range(n - 1):
-                linha = f.readline().strip()
-                partes = linha.split()
-                t.append([processar_tempo(x) for x in partes])
-
-            # Leitura das Precedências
-            while True:
-                linha = f.readline()
-                if not linha: break
-                
-                partes = list(map(int, linha.strip().split()))
-                
-                # Condição de parada (-1 -1)
-                if len(partes) < 2 or partes[0] == -1:
-                    break
-                
-                # Ajuste de índice (Arquivo começa em 1, Python em 0)
-                tarefa_i = partes[0] - 1
-                tarefa_j = partes[1] - 1
-                
-                G[tarefa_i][tarefa_j] = 1
-
-        return n, k, t, G
-
-    except Exception as e:
-        print(f"Erro na leitura do arquivo {caminho_arquivo}: {e}")
-        return 0, 0, [], []
-
-def construir_e_resolver_modelo(n, k, t, G, time_limit):
+    modelo = configurar_modelo(mip.nome, time_limit, threads)
+    variaveis = modelo.addVars(len(mip.nomes), lb=mip.lb, ub=mip.ub, obj=mip.custos, vtype=mip.tipos, name=mip.nomes)
+    modelo.ModelSense = GRB.MINIMIZE
+    for colunas, coeficientes, sentido, rhs, nome in mip.linhas():
+        modelo.addLConstr(gp.LinExpr(coeficientes, [variaveis[j] for j in colunas]), sentido, rhs, name=nome)
+    modelo._mip, modelo._variaveis = mip, variaveis # Para o MIP start (aplicar_solucao_inicial)
+    return modelo
+
+def montar_modelo_classico(n, k, t, G, time_limit):
     """
-    Recebe os dados estruturados e roda o Gurobi.
-    Retorna: (ObjVal, Runtime, Status, Gap)
+    Monta o modelo original (formulacao.montar_classico) no Gurobi, ainda sem otimizar.
     """
-    e = k # Número de estações = Número de trabalhadores
+    return traduzir_modelo(montar_classico(n, k, t, G), time_limit)
 
-    try:
-        modelo = Model("ALWABP")
-        
-        # Configurações do Solver
-        modelo.setParam('OutputFlag', 0)         # 0 = Silencioso, 1 = Verboso
-        modelo.setParam('TimeLimit', time_limit) # Tempo máximo em segundos
-        modelo.setParam('Threads', 4)
-
-        # --- Variáveis ---
-        # x[i,s,w] = 1 se Tarefa i na Estação s pelo Trab w
-        x = modelo.addVars(n, e, k, vtype=GRB.BINARY, name="x")
-        
-        # y[s,w] = 1 se Trab w alocado na Estação s
-        y = modelo.addVars(e, k, vtype=GRB.BINARY, name="y")
-        
-        # Tempo de Ciclo (Objetivo)
-        E_max = modelo.addVar(lb=0, vtype=GRB.CONTINUOUS, name="E_max")
-
-        modelo.setObjective(E_max, GRB.MINIMIZE)
-
-        # --- Restrições ---
-
-        # 1. Definição do Tempo de Ciclo (E_max >= Carga da Estação)
-        for E_idx in range(e):
-            carga_estacao = gp.quicksum(x[N, E_idx, K] * t[N][K] for N in range(n) for K in range(k))
-            modelo.addConstr(carga_estacao <= E_max, name=f"Carga_Estacao_{E_idx}")
-
-        # 2. Cada tarefa deve ser alocada uma única vez
-        for N in range(n):
-            soma_x = gp.quicksum(x[N, E_idx, K] for E_idx in range(e) for K in range(k))
-            modelo.addConstr(soma_x == 1, name=f"Tarefa_Unica_{N}")
-
-        # 3. Cada estação tem exatamente um trabalhador
-        for E_idx in range(e):
-            soma_trabalhadores = gp.quicksum(y[E_idx, K] for K in range(k))
-            modelo.addConstr(soma_trabalhadores == 1, name=f"Um_Trab_Estacao_{E_idx}")
-
-        # 4. Cada trabalhador em exatamente uma estação
-        for K in range(k):
-            soma_estacoes = gp.quicksum(y[E_idx, K] for E_idx in range(e))
-            modelo.addConstr(soma_estacoes == 1, name=f"Trab_{K}_Uma_Estacao")
-
-        # 5. Vínculo: Se tarefa N é feita na estação E pelo trab K, então Y[E,K] deve ser 1
-        for N in range(n):
-            for E_idx in range(e):
-                for K in range(k):
-                    modelo.addConstr(x[N, E_idx, K] <= y[E_idx, K], name=f"Link_X_Y_{N}_{E_idx}_{K}")
-
-        # 6. Precedência
-        # Se G[i][j]=1 (i precede j), então Estação(i) <= Estação(j)
-        for i in range(n):
-            for j in range(n):
-                if G[i][j] == 1: 
-                    posicao_i = gp.quicksum(E_idx * x[i, E_idx, K] for E_idx in range(e) for K in range(k))
-                    posicao_j = gp.quicksum(E_idx * x[j, E_idx, K] for E_idx in range(e) for K in range(k))
-                    modelo.addConstr(posicao_i <= posicao_j, name=f"Prec_{i}_{j}")
+def montar_modelo_apertado(n, k, t, G, time_limit, limite_superior=None, alcance=None):
+    """
+    Monta a formulação apertada (formulacao.montar_apertado) no Gurobi, ainda sem otimizar.
+    limite_superior: ciclo de uma solução viável conhecida (ex.: ACO); sem ele, usa um limite trivial.
+    alcance: fechamento da precedência do cache da instância (formulacao.ler_alcance_alwabp).
+    """
+    return traduzir_modelo(montar_apertado(n, k, t, G, limite_superior, alcance), time_limit)
+
+def aplicar_solucao_inicial(modelo, inicio):
+    """
+    Carrega um MIP start completo no modelo: inicio é o vetor de ModeloMIP.vetorInicial (um valor por coluna).
+    """
+    for coluna, valor in enumerate(inicio):
+        modelo._variaveis[coluna].Start = valor
 
+def resolver_modelo(modelo, cutoff=None):
+    """
+    Otimiza um modelo montado.
+    cutoff: ciclo de uma solução viável conhecida; o Gurobi descarta nós que não melhoram esse valor.
+    Se ele terminar com status CUTOFF, nada é melhor que a solução conhecida, então ela é a ótima.
+    Retorna: (ObjVal, Runtime, Status, Gap)
+    """
+    try:
+        if cutoff is not None:
+            modelo.setParam('Cutoff', cutoff)
         modelo.optimize()
 
+        if modelo.SolCount == 0 and cutoff is not None:
+            if modelo.status == GRB.CUTOFF:
+                return cutoff, modelo.Runtime, "OTIMO", 0.0
+            # Parou no tempo sem melhorar: o incumbente é a solução conhecida
+            gap_interno = 100 * (cutoff - modelo.ObjBound) / cutoff if cutoff > 0 else 0.0
+            return cutoff, modelo.Runtime, "LIMIT_TEMPO", max(gap_interno, 0.0)
+
         if modelo.SolCount > 0:
             status_str = "OTIMO" if modelo.status == GRB.OPTIMAL else "LIMIT_TEMPO"
             gap_interno = modelo.MIPGap * 100 # Em porcentagem
@@ -141,19 +79,64 @@ def construir_e_resolver_modelo(n, k, t, G, time_limit):
         print(f"Erro no Solver Gurobi: {e}")
         return float('inf'), 0, "ErroSolver", 0.0
 
-def resolver_gurobi(caminho_arquivo, time_limit=3600):
+def construir_e_resolver_modelo(n, k, t, G, time_limit, formulacao='classica', limite_superior=None, solucao_inicial=None, usar_cutoff=False, alcance=None):
+    """
+    Recebe os dados estruturados e roda o Gurobi.
+    formulacao: 'classica' (modelo original) ou 'apertada' (montar_modelo_apertado, usa limite_superior).
+    solucao_inicial: (trabalhador de cada estação, estação de cada tarefa), carregada como MIP start se for viável;
+    na formulação apertada o ciclo dela também vira o limite superior. usar_cutoff passa esse ciclo como Cutoff.
+    alcance: fechamento da precedência para a formulação apertada (formulacao.ler_alcance_alwabp).
+    Retorna: (ObjVal, Runtime, Status, Gap)
+    """
+    mip, inicio = montar_modelo(n, k, t, G, formulacao, limite_superior, solucao_inicial, alcance)
+    try:
+        modelo = traduzir_modelo(mip, time_limit)
+        if inicio is not None:
+            aplicar_solucao_inicial(modelo, inicio)
+    except gp.GurobiError as e:
+        print(f"Erro no Solver Gurobi: {e}")
+        return float('inf'), 0, "ErroSolver", 0.0
+    cutoff = inicio[mip.E_max] if inicio is not None and usar_cutoff else None
+    return resolver_modelo(modelo, cutoff)
+
+def resolver_gurobi(caminho_arquivo, time_limit=3600, formulacao='classica', limite_superior=None, solucao_inicial=None, tempo_aco=0, usar_cutoff=True):
     """
     Função Wrapper: Lê o arquivo e chama o modelo.
+    tempo_aco > 0: roda o ACO (main.solucaoACO) antes e usa a melhor formiga como MIP start e, com usar_cutoff, como Cutoff.
+    O tempo do ACO sai do time_limit e entra no Runtime devolvido.
     """
     n, k, t, G = ler_instancia_alwabp(caminho_arquivo)
     
     if n == 0:
         return float('inf'), 0, "ErroLeitura", 0.0
+
+    tempo_heuristica = 0.0
+    if tempo_aco > 0 and solucao_inicial is None:
+        solucao_inicial, tempo_heuristica = aquecer_com_aco(caminho_arquivo, tempo_aco)
     
-    return construir_e_resolver_modelo(n, k, t, G, time_limit)
+    alcance = ler_alcance_alwabp(caminho_arquivo) if formulacao == 'apertada' else None
+    obj, runtime, status, gap = construir_e_resolver_modelo(n, k, t, G, max(1.0, time_limit - tempo_heuristica), formulacao, limite_superior,
+                                                            solucao_inicial, usar_cutoff and solucao_inicial is not None, alcance)
+    return obj, runtime + tempo_heuristica, status, gap
+
+def resolver_gurobi_aquecido(caminho_arquivo, time_limit=3600, formulacao='classica'):
+    """
+    ACO antes (10% do tempo, no máximo 30 s) como MIP start e Cutoff. A formulação padrão é a clássica: a apertada só
+    passa a ser o padrão quando uma comparação (comparar_formulacoes) nas classes do benchmark mostrar que ela ganha.
+    """
+    return resolver_gurobi(caminho_arquivo, time_limit, formulacao=formulacao, tempo_aco=min(30, 0.1 * time_limit))
+
+def comparar_formulacoes(caminho_arquivo, time_limit=3600, limite_superior=None):
+    """
+    solver_mip.comparar_formulacoes no backend do Gurobi.
+    Retorna: {formulacao: {'montagem', 'variaveis', 'restricoes', 'nao_zeros', 'obj', 'tempo', 'status', 'gap'}}
+    """
+    return comparar_formulacoes_mip(caminho_arquivo, time_limit, limite_superior, backend='gurobi', threads=THREADS_GUROBI)
 
 if __name__ == "__main__":
     arquivo_teste = "instancias/23_wee.txt" 
     print(f"Testando Gurobi com {arquivo_teste}...")
     res = resolver_gurobi(arquivo_teste, time_limit=10)
-    print(f"Resultado: {res}")
\ No newline at end of file
+    print(f"Resultado: {res}")
+    for formulacao, medidas in comparar_formulacoes(arquivo_teste, time_limit=10).items():
+        print(f"{formulacao}: {medidas}")
@@ -0,0 +1,230 @@
+import time
+from abc import ABC, abstractmethod
+
+from formulacao import ler_instancia_alwabp, ler_alcance_alwabp, montar_modelo
+
+# Backends de MIP para o modelo exato: o modelo é montado uma vez (formulacao.ModeloMIP) e cada backend só
+# traduz e resolve. Gurobi precisa de licença; HiGHS (highspy) e CBC (pulp) rodam em qualquer máquina.
+
+THREADS_MIP = 4 # Mesmo valor de solver_gurobi.THREADS_GUROBI: todos os backends rodam com as mesmas threads
+
+class BackendMIP(ABC):
+    """
+    Interface dos backends: resolver(mip, time_limit, threads, inicio=None, cutoff=None) -> (ObjVal, Runtime, Status, Gap).
+    inicio: MIP start (ModeloMIP.vetorInicial). cutoff: ciclo de uma solução viável conhecida; o solver descarta nós que
+    não melhoram esse valor, e se nada melhor aparecer a solução conhecida é devolvida (ver sem_solucao).
+    Status: 'OTIMO', 'LIMIT_TEMPO', 'SemSolucao' ou 'ErroSolver'; Gap em porcentagem, como o MIPGap do Gurobi.
+    """
+    nome = ''
+
+    @abstractmethod
+    def resolver(self, mip, time_limit, threads=THREADS_MIP, inicio=None, cutoff=None):
+        ...
+
+    @staticmethod
+    def sem_solucao(runtime, cutoff, provado, limite_inferior):
+        """
+        Resultado quando o solver termina sem solução própria. Com cutoff, nada melhor que a solução conhecida foi achado:
+        ela é a ótima se o solver provou isso (provado), senão é o incumbente com gap contra limite_inferior.
+        """
+        if cutoff is None:
+            return float('inf'), runtime, "SemSolucao", 0.0
+        if provado:
+            return cutoff, runtime, "OTIMO", 0.0
+        gap_interno = 100 * (cutoff - limite_inferior) / cutoff if cutoff > 0 else 0.0
+        return cutoff, runtime, "LIMIT_TEMPO", max(gap_interno, 0.0)
+
+class BackendGurobi(BackendMIP):
+    nome = 'gurobi'
+
+    def resolver(self, mip, time_limit, threads=THREADS_MIP, inicio=None, cutoff=None):
+        import solver_gurobi # Só importa o gurobipy se este backend for usado
+        try:
+            modelo = solver_gurobi.traduzir_modelo(mip, time_limit, threads)
+            if inicio is not None:
+                solver_gurobi.aplicar_solucao_inicial(modelo, inicio)
+        except solver_gurobi.gp.GurobiError as e:
+            print(f"Erro no Solver Gurobi: {e}")
+            return float('inf'), 0, "ErroSolver", 0.0
+        return solver_gurobi.resolver_modelo(modelo, cutoff)
+
+class BackendHighs(BackendMIP):
+    nome = 'highs'
+
+    def resolver(self, mip, time_limit, threads=THREADS_MIP, inicio=None, cutoff=None):
+        import highspy
+        import numpy as np
+
+        h = highspy.Highs()
+        h.setOptionValue('output_flag', False)
+        h.setOptionValue('time_limit', float(time_limit))
+        h.setOptionValue('threads', threads)
+        h.setOptionValue('mip_rel_gap', 1e-4) # Mesmo MIPGap padrão do Gurobi
+        if cutoff is not None:
+            h.setOptionValue('objective_bound', float(cutoff)) # Equivalente ao Cutoff do Gurobi
+
+        inf = highspy.kHighsInf
+        nColunas = len(mip.nomes)
+        lb = np.array([-inf if v == -float('inf') else v for v in mip.lb], dtype=np.float64)
+        ub = np.array([inf if v == float('inf') else v for v in mip.ub], dtype=np.float64)
+        h.addVars(nColunas, lb, ub)
+        h.changeColsCost(nColunas, np.arange(nColunas, dtype=np.int32), np.array(mip.custos, dtype=np.float64))
+        inteiras = np.array([j for j, tipo in enumerate(mip.tipos) if tipo != 'C'], dtype=np.int32)
+        h.changeColsIntegrality(len(inteiras), inteiras, np.array([highspy.HighsVarType.kInteger] * len(inteiras)))
+
+        # Linhas direto do CSR do ModeloMIP: '<' vira [-inf, rhs], '=' vira [rhs, rhs], '>' vira [rhs, inf]
+        rhs = np.array(mip.rhs, dtype=np.float64)
+        sentidos = np.array(mip.sentidos)
+        inferior = np.where(sentidos == '<', -inf, rhs)
+        superior = np.where(sentidos == '>', inf, rhs)
+        h.addRows(len(rhs), inferior, superior, len(mip.colunas), np.array(mip.inicioLinha[:-1], dtype=np.int32),
+                  np.array(mip.colunas, dtype=np.int32), np.array(mip.coeficientes, dtype=np.float64))
+
+        if inicio is not None:
+            solucao = highspy.HighsSolution()
+            solucao.col_value = [float(v) for v in inicio]
+            solucao.value_valid = True
+            h.setSolution(solucao)
+
+        h.run()
+        info = h.getInfo()
+        status = h.getModelStatus()
+        # 2 = kSolutionStatusFeasible. Com objective_bound o HiGHS ainda pode devolver uma solução pior que ele,
+        # que conta como sem solução
+        if info.primal_solution_status != 2 or (cutoff is not None and info.objective_function_value > cutoff):
+            provado = status in (highspy.HighsModelStatus.kOptimal, highspy.HighsModelStatus.kInfeasible,
+                                 highspy.HighsModelStatus.kObjectiveBound)
+            return self.sem_solucao(h.getRunTime(), cutoff, provado, max(info.mip_dual_bound, mip.limiteInferior))
+        status_str = "OTIMO" if status == highspy.HighsModelStatus.kOptimal else "LIMIT_TEMPO"
+        return info.objective_function_value, h.getRunTime(), status_str, info.mip_gap * 100
+
+class BackendCBC(BackendMIP):
+    nome = 'cbc'
+
+    def resolver(self, mip, time_limit, threads=THREADS_MIP, inicio=None, cutoff=None):
+        import pulp
+
+        problema = pulp.LpProblem(mip.nome, pulp.LpMinimize)
+        categorias = {'B': pulp.LpBinary, 'I': pulp.LpInteger, 'C': pulp.LpContinuous}
+        variaveis = [pulp.LpVariable(f"v{j}", lowBound=mip.lb[j], upBound=None if mip.ub[j] == float('inf') else mip.ub[j],
+                                     cat=categorias[mip.tipos[j]]) for j in range(len(mip.nomes))]
+        problema += pulp.lpSum(custo * variaveis[j] for j, custo in enumerate(mip.custos) if custo)
+        for r, (colunas, coeficientes, sentido, rhs, _) in enumerate(mip.linhas()):
+            expressao = pulp.LpAffineExpression(zip([variaveis[j] for j in colunas], coeficientes))
+            if sentido == '<':
+                problema += expressao <= rhs, f"r{r}"
+            elif sentido == '>':
+                problema += expressao >= rhs, f"r{r}"
+            else:
+                problema += expressao == rhs, f"r{r}"
+        if inicio is not None:
+            for variavel, valor in zip(variaveis, inicio):
+                variavel.setInitialValue(valor)
+
+        opcoes = [f"cutoff {cutoff}"] if cutoff is not None else []
+        solver = pulp.PULP_CBC_CMD(msg=False, timeLimit=time_limit, threads=threads, warmStart=inicio is not None, options=opcoes)
+        comeco = time.time()
+        try:
+            problema.solve(solver)
+        except pulp.PulpSolverError as e:
+            print(f"Erro no Solver CBC: {e}")
+            return float('inf'), 0, "ErroSolver", 0.0
+        runtime = time.time() - comeco
+        if problema.sol_status not in (pulp.LpSolutionOptimal, pulp.LpSolutionIntegerFeasible):
+            # O pulp não devolve o bound do CBC: sem prova, o gap é contra o limite inferior do próprio modelo
+            return self.sem_solucao(runtime, cutoff, problema.status == pulp.LpStatusInfeasible, mip.limiteInferior)
+        obj = pulp.value(problema.objective)
+        if problema.sol_status == pulp.LpSolutionOptimal:
+            return obj, runtime, "OTIMO", 0.0
+        # O pulp não devolve o bound do CBC: gap contra o limite inferior do próprio modelo
+        gap_interno = 100 * (obj - mip.limiteInferior) / obj if obj > 0 else 0.0
+        return obj, runtime, "LIMIT_TEMPO", gap_interno
+
+BACKENDS = {backend.nome: backend for backend in (BackendGurobi, BackendHighs, BackendCBC)}
+
+def aquecer_com_aco(caminho_arquivo, tempo_aco):
+    """
+    Roda o ACO (main.solucaoACO) por tempo_aco segundos.
+    Retorna: (solucao_inicial, tempo gasto), com solucao_inicial = (trabalhador de cada estação, estação de cada tarefa) ou None
+    """
+    from main import solucaoACO
+    inicio = time.time()
+    aco = solucaoACO(caminho_arquivo, tempo_aco)
+    return (aco[1:] if aco is not None else None), time.time() - inicio
+
+def construir_e_resolver_mip(n, k, t, G, time_limit, backend='highs', formulacao='classica', limite_superior=None,
+                             solucao_inicial=None, threads=THREADS_MIP, alcance=None, usar_cutoff=False):
+    """
+    Mesma entrada e saída de solver_gurobi.construir_e_resolver_modelo, com o backend escolhido (chave de BACKENDS).
+    usar_cutoff: o ciclo da solucao_inicial vira o cutoff do backend, como o Cutoff do Gurobi.
+    Retorna: (ObjVal, Runtime, Status, Gap)
+    """
+    mip, inicio = montar_modelo(n, k, t, G, formulacao, limite_superior, solucao_inicial, alcance)
+    cutoff = inicio[mip.E_max] if inicio is not None and usar_cutoff else None
+    try:
+        resolvedor = BACKENDS[backend]()
+        return resolvedor.resolver(mip, time_limit, threads, inicio, cutoff)
+    except ImportError as e:
+        print(f"Backend '{backend}' indisponível: {e}")
+        return float('inf'), 0, "ErroSolver", 0.0
+
+def resolver_mip(caminho_arquivo, time_limit=3600, backend='highs', formulacao='classica', limite_superior=None,
+                 solucao_inicial=None, tempo_aco=0, threads=THREADS_MIP, usar_cutoff=True):
+    """
+    Função Wrapper: Lê o arquivo e resolve o modelo exato no backend pedido ('gurobi', 'highs' ou 'cbc').
+    tempo_aco > 0: a melhor formiga do ACO entra como MIP start e, com usar_cutoff, como cutoff; o tempo do ACO sai do
+    time_limit e entra no Runtime.
+    """
+    n, k, t, G = ler_instancia_alwabp(caminho_arquivo)
+
+    if n == 0:
+        return float('inf'), 0, "ErroLeitura", 0.0
+
+    tempo_heuristica = 0.0
+    if tempo_aco > 0 and solucao_inicial is None:
+        solucao_inicial, tempo_heuristica = aquecer_com_aco(caminho_arquivo, tempo_aco)
+
+    alcance = ler_alcance_alwabp(caminho_arquivo) if formulacao == 'apertada' else None
+    obj, runtime, status, gap = construir_e_resolver_mip(n, k, t, G, max(1.0, time_limit - tempo_heuristica), backend, formulacao,
+                                                         limite_superior, solucao_inicial, threads, alcance,
+                                                         usar_cutoff and solucao_inicial is not None)
+    return obj, runtime + tempo_heuristica, status, gap
+
+def comparar_formulacoes(caminho_arquivo, time_limit=3600, limite_superior=None, backend='highs', threads=THREADS_MIP):
+    """
+    Monta e resolve as duas formulações na mesma instância, no backend pedido (chave de BACKENDS).
+    Retorna: {formulacao: {'montagem', 'variaveis', 'restricoes', 'nao_zeros', 'obj', 'tempo', 'status', 'gap'}}
+    """
+    n, k, t, G = ler_instancia_alwabp(caminho_arquivo)
+    if n == 0:
+        return {}
+    resolvedor = BACKENDS[backend]()
+    resultados = {}
+    for formulacao in ('classica', 'apertada'):
+        inicio = time.time()
+        alcance = ler_alcance_alwabp(caminho_arquivo) if formulacao == 'apertada' else None
+        mip, _ = montar_modelo(n, k, t, G, formulacao, limite_superior, alcance=alcance)
+        montagem = time.time() - inicio
+        variaveis, restricoes, nao_zeros = mip.tamanho()
+        try:
+            obj, tempo, status, gap = resolvedor.resolver(mip, time_limit, threads)
+        except ImportError as e:
+            print(f"Backend '{backend}' indisponível: {e}")
+            return {}
+        resultados[formulacao] = {'montagem': montagem, 'variaveis': variaveis, 'restricoes': restricoes,
+                                  'nao_zeros': nao_zeros, 'obj': obj, 'tempo': tempo, 'status': status, 'gap': gap}
+    return resultados
+
+def resolver_highs(caminho_arquivo, time_limit=3600):
+    return resolver_mip(caminho_arquivo, time_limit, backend='highs')
+
+def resolver_cbc(caminho_arquivo, time_limit=3600):
+    return resolver_mip(caminho_arquivo, time_limit, backend='cbc')
+
+if __name__ == "__main__":
+    arquivo_teste = "instancias/23_wee.txt"
+    for backend in ('highs', 'cbc'):
+        print(f"Testando {backend} com {arquivo_teste}...")
+        print(f"Resultado: {resolver_mip(arquivo_teste, time_limit=10, backend=backend)}")
+        for formulacao, medidas in comparar_formulacoes(arquivo_teste, time_limit=10, backend=backend).items():
+            print(f"{formulacao}: {medidas}")
@@ -0,0 +1,59 @@
+import os
+import sys
+import random
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+import gerador
+import instancia
+
+# Instâncias pequenas geradas na hora (gerador.py), com o cache binário numa pasta temporária do teste.
+
+@pytest.fixture
+def gerar(tmp_path, monkeypatch):
+    """
+    gerar(n_tarefas, n_trabalhadores, densidade_incapacidade, order_strength, semente) -> caminho do arquivo de texto.
+    """
+    monkeypatch.setattr(instancia, 'PASTA_CACHE_PADRAO', str(tmp_path / 'cache'))
+    def _gerar(n_tarefas=30, n_trabalhadores=5, densidade_incapacidade=0.2, order_strength=0.3, semente=0):
+        caminho, _ = gerador.gerar_arquivo(str(tmp_path / 'instancias'), n_tarefas, n_trabalhadores, densidade_incapacidade, order_strength, semente=semente)
+        return caminho
+    return _gerar
+
+@pytest.fixture
+def dados(gerar):
+    return main.ler_e_converter_dados(gerar())
+
+def construir_formigas(dados, quantidade, semente):
+    """
+    Formigas só construídas (sem shift), com o feromônio inicial da colônia.
+    """
+    random.seed(semente)
+    colonia = main.ColoniaACO(*dados[:9], 1, 3, 1, 2, numeroFormigas=quantidade, cacheHeuristico=dados.cacheHeuristico)
+    tabela = main.TabelaScores(dados.cacheHeuristico, colonia.feromoniosTE, colonia.feromoniosTarefas, 1, 3, 1, 2)
+    for formiga in colonia.formigas:
+        formiga.resetar()
+        main.alocaTrabalhadoresAEstacoes(formiga, dados.tempoMedioDeCadaTrabalhador, colonia.feromoniosTE, dados.tarefasFatiadas,
+                                         dados.tempoTarefaTrabalhador, 1, 3, dados.orderStrenght, tabela)
+        main.alocaTarefas(formiga, colonia.feromoniosTarefas, dados.C_alvo, dados.precedencia, dados.grafo, dados.tempoTarefaTrabalhador, 1, 2, tabela)
+    return colonia.formigas
+
+def conferir_formiga(formiga, dados):
+    """
+    Invariantes de uma solução completa: toda tarefa numa estação, precedência respeitada, cargas (com a penalidade
+    10000 da construção) iguais às recalculadas e tempo de ciclo igual à maior carga.
+    """
+    k = dados.numeroTrabalhadores
+    assert sorted(formiga.trabalhadores) == list(range(k))
+    assert all(0 <= s < k for s in formiga.estacaoDaTarefa)
+    for pai in range(dados.numeroTarefas):
+        for filho in dados.grafo[pai]:
+            assert formiga.estacaoDaTarefa[pai] <= formiga.estacaoDaTarefa[filho]
+    cargas = [0] * k
+    for tarefa, s in enumerate(formiga.estacaoDaTarefa):
+        cargas[s] += dados.cacheHeuristico.tempoPenalizado[tarefa][formiga.trabalhadores[s]]
+    assert cargas == pytest.approx(list(formiga.cargas))
+    assert formiga.tempoDeCiclo == pytest.approx(max(cargas))
@@ -0,0 +1,124 @@
+import pytest
+
+import main
+from estatisticas import EstatisticasACO
+from conftest import construir_formigas, conferir_formiga
+
+def alcancaveis(grafo, origem):
+    # Busca em profundidade simples, para comparar com os bitsets
+    vistos = set()
+    pilha = list(grafo[origem])
+    while pilha:
+        tarefa = pilha.pop()
+        if tarefa not in vistos:
+            vistos.add(tarefa)
+            pilha.extend(grafo[tarefa])
+    return vistos
+
+def test_alcance_igual_a_busca_no_grafo(dados):
+    n = dados.numeroTarefas
+    precedencia = list(dados.precedencia)
+    alcance = main.Alcance(dados.grafo, main.ordenaTopologicamente(dados.grafo, precedencia))
+    for i in range(n):
+        descendentes = alcancaveis(dados.grafo, i)
+        assert {j for j in range(n) if alcance.precede(i, j)} == descendentes
+        assert alcance.numeroDescendentes(i) == len(descendentes)
+        assert alcance.numeroAscendentes(i) == sum(1 for j in range(n) if i in alcancaveis(dados.grafo, j))
+    relacoes = sum(len(alcancaveis(dados.grafo, i)) for i in range(n))
+    assert alcance.totalRelacoes() == relacoes
+    assert main.calcular_order_strength(alcance) == pytest.approx(relacoes / (n * (n - 1) / 2))
+    assert main.calcular_order_strength(alcance) == pytest.approx(dados.orderStrenght) # O valor do cache binário
+
+def test_alcance_incremental_igual_ao_completo(dados):
+    n = dados.numeroTarefas
+    completo = main.Alcance(dados.grafo, main.ordenaTopologicamente(dados.grafo, dados.precedencia))
+    incremental = main.Alcance.deBitsets([0] * n, [0] * n)
+    relacoes = sum(incremental.adicionarArco(pai, filho) for pai in reversed(range(n)) for filho in dados.grafo[pai])
+    assert (incremental.descendentes, incremental.ascendentes) == (completo.descendentes, completo.ascendentes)
+    assert relacoes == completo.totalRelacoes()
+
+def test_ordem_topologica_recusa_ciclo():
+    with pytest.raises(ValueError):
+        main.ordenaTopologicamente([[1], [2], [0]], [1, 1, 1])
+
+def test_shift_com_indice_reaproveitado_igual_ao_indice_novo(dados):
+    formigas = construir_formigas(dados, 15, semente=4)
+    copias = [f.copia() for f in formigas]
+    indice = main.IndiceShift(dados.grafo, dados.grafoR)
+    for formiga, copia in zip(formigas, copias):
+        antes = formiga.tempoDeCiclo
+        main.shift(formiga, dados.grafo, dados.grafoR, dados.tempoTarefaTrabalhador, indice)
+        main.shift(copia, dados.grafo, dados.grafoR, dados.tempoTarefaTrabalhador) # Índice novo a cada chamada
+        assert formiga.exportarVetores() == copia.exportarVetores()
+        assert list(formiga.ordemDaTarefa) == list(copia.ordemDaTarefa)
+        assert formiga.tempoDeCiclo <= antes
+        conferir_formiga(formiga, dados)
+
+def test_vnd_mantem_a_solucao_valida_e_nao_piora(dados):
+    formigas = construir_formigas(dados, 10, semente=5)
+    indiceShift = main.IndiceShift(dados.grafo, dados.grafoR)
+    indiceVND = main.IndiceVND(dados.grafo, dados.tempoTarefaTrabalhador)
+    for formiga in formigas:
+        main.shift(formiga, dados.grafo, dados.grafoR, dados.tempoTarefaTrabalhador, indiceShift)
+        antes = formiga.tempoDeCiclo
+        main.vnd(formiga, dados.grafo, dados.grafoR, dados.tempoTarefaTrabalhador, indiceVND, indiceShift)
+        assert formiga.tempoDeCiclo <= antes
+        conferir_formiga(formiga, dados)
+
+def test_vnd_conta_os_movimentos_do_shift(dados):
+    # Só formigas sem tarefa penalizada: nelas o gargalo tem para onde mandar tarefas
+    formigas = [f for f in construir_formigas(dados, 30, semente=6) if f.tempoDeCiclo < 10000]
+    copias = [f.copia() for f in formigas]
+    indiceShift = main.IndiceShift(dados.grafo, dados.grafoR)
+    indiceVND = main.IndiceVND(dados.grafo, dados.tempoTarefaTrabalhador)
+    viaVND, direto = EstatisticasACO(), EstatisticasACO()
+    for formiga, copia in zip(formigas, copias):
+        main.vnd(formiga, dados.grafo, dados.grafoR, dados.tempoTarefaTrabalhador, indiceVND, indiceShift, viaVND)
+        main.shift(copia, dados.grafo, dados.grafoR, dados.tempoTarefaTrabalhador, indiceShift, direto)
+    # O VND começa pelo mesmo shift e pode rodá-lo de novo depois de cada vizinhança que melhora
+    assert viaVND.contadores['shiftTentados'] >= direto.contadores['shiftTentados'] > 0
+    assert viaVND.contadores['shiftAceitos'] >= direto.contadores['shiftAceitos']
+
+def test_cache_shift_devolve_o_mesmo_que_o_shift(dados):
+    formigas = construir_formigas(dados, 10, semente=6)
+    indice = main.IndiceShift(dados.grafo, dados.grafoR)
+    cache = main.CacheShift(100)
+    for formiga in formigas:
+        repetida = formiga.copia()
+        referencia = formiga.copia()
+        melhorou = main.shift(referencia, dados.grafo, dados.grafoR, dados.tempoTarefaTrabalhador, indice)
+        assert cache.aplicar(formiga, dados.grafo, dados.grafoR, dados.tempoTarefaTrabalhador, indice) == melhorou
+        acertos = cache.acertos
+        assert cache.aplicar(repetida, dados.grafo, dados.grafoR, dados.tempoTarefaTrabalhador, indice) == melhorou
+        assert cache.acertos == acertos + 1 # A mesma solução construída volta pelo cache
+        for resultado in (formiga, repetida):
+            assert resultado.exportarVetores() == referencia.exportarVetores()
+            assert list(resultado.ordemDaTarefa) == list(referencia.ordemDaTarefa)
+            assert list(resultado.cargas) == list(referencia.cargas)
+
+def test_cache_shift_descarta_a_entrada_mais_antiga(dados):
+    primeira, segunda = [f for f in construir_formigas(dados, 2, semente=7)]
+    indice = main.IndiceShift(dados.grafo, dados.grafoR)
+    cache = main.CacheShift(1)
+    repetida = primeira.copia()
+    cache.aplicar(primeira, dados.grafo, dados.grafoR, dados.tempoTarefaTrabalhador, indice)
+    cache.aplicar(segunda, dados.grafo, dados.grafoR, dados.tempoTarefaTrabalhador, indice)
+    assert (cache.falhas, cache.descartes, len(cache.entradas)) == (2, 1, 1)
+    cache.aplicar(repetida, dados.grafo, dados.grafoR, dados.tempoTarefaTrabalhador, indice) # Já saiu do cache
+    assert (cache.acertos, cache.falhas) == (0, 3)
+
+def test_cache_shift_separa_ordens_diferentes_na_estacao(dados):
+    formiga = construir_formigas(dados, 1, semente=8)[0]
+    cache = main.CacheShift(10)
+    trocada = formiga.copia()
+    estacao = max(range(dados.numeroTrabalhadores), key=lambda s: sum(1 for e in formiga.estacaoDaTarefa if e == s))
+    a, b = [t for t, e in enumerate(formiga.estacaoDaTarefa) if e == estacao][:2]
+    trocada.ordemDaTarefa[a], trocada.ordemDaTarefa[b] = trocada.ordemDaTarefa[b], trocada.ordemDaTarefa[a] # Mesma alocação, outra sequência
+    deslocada = formiga.copia()
+    for t in range(dados.numeroTarefas):
+        deslocada.ordemDaTarefa[t] += 100 # Mesma sequência em cada estação, outros valores
+    deslocada.proximaOrdem += 100
+    indice = main.IndiceShift(dados.grafo, dados.grafoR)
+    for f in (formiga, trocada, deslocada):
+        cache.aplicar(f, dados.grafo, dados.grafoR, dados.tempoTarefaTrabalhador, indice)
+    assert (cache.acertos, cache.falhas) == (1, 2)
@@ -0,0 +1,61 @@
+import pytest
+
+import main
+from formulacao import ler_instancia_alwabp, mapear_formiga, montar_classico, montar_apertado
+
+def conferir_inicio(mip, inicio):
+    """
+    O MIP start satisfaz limites, integralidade e todas as linhas do modelo. Retorna o valor do objetivo.
+    """
+    assert len(inicio) == len(mip.nomes)
+    for coluna, valor in enumerate(inicio):
+        assert mip.lb[coluna] - 1e-9 <= valor <= mip.ub[coluna] + 1e-9, mip.nomes[coluna]
+        if mip.tipos[coluna] in ('B', 'I'):
+            assert valor == int(valor), mip.nomes[coluna]
+    for colunas, coeficientes, sentido, rhs, nome in mip.linhas():
+        soma = sum(coeficiente * inicio[coluna] for coluna, coeficiente in zip(colunas, coeficientes))
+        if sentido == '<':
+            assert soma <= rhs + 1e-6, nome
+        elif sentido == '>':
+            assert soma >= rhs - 1e-6, nome
+        else:
+            assert soma == pytest.approx(rhs), nome
+    return sum(custo * valor for custo, valor in zip(mip.custos, inicio))
+
+def formigas_viaveis(caminho, semente):
+    # Formigas de uma colonia depois do shift, sem tarefa com trabalhador incapaz
+    dados = main.ler_e_converter_dados(caminho)
+    colonia = main.ColoniaACO(*dados[:9], 1, 3, 1, 2, numeroFormigas=20, cacheHeuristico=dados.cacheHeuristico, semente=semente)
+    viaveis = []
+    for _ in range(3):
+        colonia.iterar()
+        viaveis.extend(f.copia() for f in colonia.formigas
+                       if all(dados.tempoTarefaTrabalhador[t][f.trabalhadores[s]] != float('inf') for t, s in enumerate(f.estacaoDaTarefa)))
+    colonia.fechar()
+    return viaveis
+
+@pytest.mark.parametrize('densidade', [0.0, 0.2])
+def test_formiga_vira_inicio_viavel_nas_duas_formulacoes(gerar, densidade):
+    caminho = gerar(n_tarefas=14, n_trabalhadores=4, densidade_incapacidade=densidade, semente=8)
+    n, k, t, G = ler_instancia_alwabp(caminho)
+    formigas = formigas_viaveis(caminho, semente=8)
+    assert formigas
+    classico = montar_classico(n, k, t, G)
+    for formiga in formigas[:5]:
+        valores = mapear_formiga(formiga, t, G)
+        assert valores is not None
+        assert conferir_inicio(classico, classico.vetorInicial(valores)) == formiga.tempoDeCiclo
+
+        apertado = montar_apertado(n, k, t, G, limite_superior=formiga.tempoDeCiclo) # C̄ do próprio ACO, como no montar_modelo
+        valores = mapear_formiga(formiga, t, G, apertado.formulacao)
+        assert valores is not None
+        assert conferir_inicio(apertado, apertado.vetorInicial(valores)) == formiga.tempoDeCiclo
+
+def test_formiga_que_fura_a_precedencia_nao_vira_inicio(gerar):
+    caminho = gerar(n_tarefas=14, n_trabalhadores=4, densidade_incapacidade=0.0, semente=9)
+    n, k, t, G = ler_instancia_alwabp(caminho)
+    formiga = formigas_viaveis(caminho, semente=9)[0]
+    pai, filho = next((i, j) for i in range(n) for j in range(n) if G[i][j])
+    formiga.estacaoDaTarefa[pai] = k - 1
+    formiga.estacaoDaTarefa[filho] = 0
+    assert mapear_formiga(formiga, t, G) is None
@@ -0,0 +1,39 @@
+import random
+
+import pytest
+
+import gerador
+import main
+from instancia import INCAPAZ
+
+@pytest.mark.parametrize('order_strength', [0.0, 0.5, 1.0])
+def test_uma_tarefa_sem_arcos(order_strength):
+    assert gerador.gerar_precedencias(1, order_strength, random.Random(0)) == ([], 0.0)
+    n, k, tempos, arestas, os_obtido = gerador.gerar_instancia(1, 3, order_strength=order_strength)
+    assert (n, k, arestas, os_obtido) == (1, 3, [], 0.0)
+    assert any(tempo != INCAPAZ for tempo in tempos)
+
+@pytest.mark.parametrize('n_tarefas, n_trabalhadores', [(0, 3), (5, 0), (-1, 2)])
+def test_tamanho_invalido(n_tarefas, n_trabalhadores):
+    with pytest.raises(ValueError):
+        gerador.gerar_instancia(n_tarefas, n_trabalhadores)
+
+@pytest.mark.parametrize('n_tarefas, n_trabalhadores', [(2, 1), (3, 5), (40, 6)])
+def test_toda_tarefa_tem_trabalhador_capaz(n_tarefas, n_trabalhadores):
+    n, k, tempos, arestas, _ = gerador.gerar_instancia(n_tarefas, n_trabalhadores, densidade_incapacidade=0.9, order_strength=0.5, semente=4)
+    assert len(tempos) == n * k
+    assert all(any(tempo != INCAPAZ for tempo in tempos[i * k:(i + 1) * k]) for i in range(n))
+    assert all(0 <= pai < filho < n for pai, filho in arestas)
+
+@pytest.mark.parametrize('n_tarefas, n_trabalhadores, densidade', [(1, 3, 0.9), (3, 5, 0.5), (6, 4, 0.2)])
+@pytest.mark.parametrize('modo', ['sequencial', 'vetorizado'])
+def test_instancia_pequena_roda_no_aco(gerar, n_tarefas, n_trabalhadores, densidade, modo):
+    # Menos tarefas que trabalhadores e trabalhadores que não sabem fazer nenhuma tarefa, do arquivo até a solução
+    dados = main.ler_e_converter_dados(gerar(n_tarefas, n_trabalhadores, densidade, 0.5, semente=5))
+    assert (dados.numeroTarefas, dados.numeroTrabalhadores) == (n_tarefas, n_trabalhadores)
+    assert len(dados.tempoMedioDeCadaTrabalhador) == n_trabalhadores
+    for w in range(n_trabalhadores):
+        capazes = [linha[w] for linha in dados.tempoTarefaTrabalhador if linha[w] != float('inf')]
+        assert dados.tempoMedioDeCadaTrabalhador[w] == (sum(capazes) / len(capazes) if capazes else float('inf'))
+    _, melhor = main.ACOInstancia(dados, numeroFormigas=10, nIteracoesSemMelhoria=5, tempoLimite=5, modo=modo, semente=1)
+    assert melhor < 10000 # Nenhuma tarefa com trabalhador incapaz
@@ -0,0 +1,46 @@
+import os
+
+import pytest
+
+import main
+import gerador
+import instancia
+from formulacao import ler_instancia_alwabp, BIG_M
+
+def test_cache_binario_ida_e_volta(gerar, tmp_path):
+    caminho = gerar(semente=1)
+    n, k, tempos, arestas = instancia.lerTexto(caminho)
+    pasta = str(tmp_path / 'outro_cache')
+    with instancia.carregarInstancia(caminho, pasta) as criada: # Primeira carga: lê o texto e grava o cache
+        primeira = (criada.n, criada.k, criada.tempos.tolist(), criada.sucessores(), criada.predecessores(), criada.lowerBound, criada.orderStrength)
+    assert os.path.exists(instancia.caminhoDoCache(caminho, pasta))
+    with instancia.carregarInstancia(caminho, pasta) as mapeada: # Segunda: só mapeia o arquivo .bin
+        segunda = (mapeada.n, mapeada.k, mapeada.tempos.tolist(), mapeada.sucessores(), mapeada.predecessores(), mapeada.lowerBound, mapeada.orderStrength)
+    assert primeira == segunda
+    assert (primeira[0], primeira[1], primeira[2]) == (n, k, tempos)
+    sucessores = [[] for _ in range(n)]
+    predecessores = [[] for _ in range(n)]
+    for pai, filho in arestas:
+        sucessores[pai].append(filho)
+        predecessores[filho].append(pai)
+    assert primeira[3] == sucessores
+    assert primeira[4] == predecessores
+
+def test_cache_corrompido_e_refeito(gerar, tmp_path):
+    caminho = gerar(semente=2)
+    pasta = str(tmp_path / 'outro_cache')
+    instancia.carregarInstancia(caminho, pasta).fechar()
+    with open(instancia.caminhoDoCache(caminho, pasta), 'wb') as arquivo:
+        arquivo.write(b'lixo' * 20)
+    with instancia.carregarInstancia(caminho, pasta) as dados:
+        assert dados.tempos.tolist() == instancia.lerTexto(caminho)[2]
+
+def test_leitores_do_aco_e_do_modelo_concordam(gerar):
+    caminho = gerar(semente=3)
+    dados = main.ler_e_converter_dados(caminho)
+    n, k, t, G = ler_instancia_alwabp(caminho)
+    assert (dados.numeroTarefas, dados.numeroTrabalhadores) == (n, k)
+    for i in range(n):
+        assert [BIG_M if tempo == float('inf') else tempo for tempo in dados.tempoTarefaTrabalhador[i]] == t[i]
+        assert sorted(dados.grafo[i]) == [j for j in range(n) if G[i][j]]
+    assert dados.orderStrenght == pytest.approx(gerador.gerar_instancia(30, 5, 0.2, 0.3, semente=3)[4])